@@ -0,0 +1,337 @@
+"""
+Benchmark the pathfinding strategies and engines over seeded grids.
+
+Run it from the repository root, for instance::
+
+    python -m benchmarks.run --sizes 100 500 --output bench.json
+    python -m benchmarks.run --sizes 100 500 --baseline bench.json
+
+Each case records the wall time, the nodes expanded, the heap pushes, the
+peak traced memory and the path cost, and the results are written as
+JSON so that runs can be compared against a baseline.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    SearchResult,
+    astar_search,
+    bidirectional_search,
+    dijkstra_search,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+from pathfinding_challenge.utils import get_random_edge_position
+from pathfinding_challenge.utils.generator import generate_grid
+
+DEFAULT_SIZES = (100, 500, 1000, 2000, 5000)
+NODE_GRID_MAX_SIZE = 500
+
+Pair = Tuple[int, int]
+
+
+@dataclass(slots=True)
+class Case:
+    """
+    One measured query.
+
+    Attributes:
+        engine (str): The engine name.
+        size (int): The side of the square grid.
+        pair (int): The index of the start/end pair.
+        seconds (float): The wall time of the query.
+        expanded (Optional[int]): Nodes expanded, when the engine counts it.
+        pushes (Optional[int]): Heap pushes, when the engine counts it.
+        peak_bytes (Optional[int]): Peak traced memory of the query.
+        cost (float): The path cost.
+    """
+
+    engine: str
+    size: int
+    pair: int
+    seconds: float
+    expanded: Optional[int]
+    pushes: Optional[int]
+    peak_bytes: Optional[int]
+    cost: float
+
+
+def node_engine(strategy) -> Callable:
+    """Wrap a strategy working on List[List[Node]] grids."""
+
+    def run(grid: TerrainGrid, nodes, source: int, target: int):
+        start = nodes[source // grid.m][source % grid.m]
+        end = nodes[target // grid.m][target % grid.m]
+        stats = SearchStats()
+        path = strategy.find_path(nodes, start, end, stats=stats)
+        return stats.expanded, stats.pushes, path.cost
+
+    return run
+
+
+def indexed_engine(search: Callable[..., SearchResult]) -> Callable:
+    """Wrap an engine working on TerrainGrid cell indices."""
+
+    def run(grid: TerrainGrid, nodes, source: int, target: int):
+        result = search(grid, source, target)
+        return result.stats.expanded, result.stats.pushes, result.cost
+
+    return run
+
+
+ENGINES: Dict[str, Tuple[Callable, bool]] = {
+    'astar_nodes': (node_engine(AStarStrategy), True),
+    'dijkstra_nodes': (node_engine(DijkstraStrategy), True),
+    'astar_indexed': (
+        indexed_engine(
+            lambda grid, source, target: astar_search(
+                grid, source, target, AStarStrategy.steps
+            )
+        ),
+        False,
+    ),
+    'astar_bidirectional': (
+        indexed_engine(
+            lambda grid, source, target: bidirectional_search(
+                grid,
+                source,
+                target,
+                AStarStrategy.steps,
+                Heuristic.for_grid(grid, AStarStrategy.steps),
+            )
+        ),
+        False,
+    ),
+    'dijkstra_binary_heap': (
+        indexed_engine(
+            lambda grid, source, target: dijkstra_search(
+                grid, source, target, DijkstraStrategy.steps
+            )
+        ),
+        False,
+    ),
+    'dijkstra_indexed_heap': (
+        indexed_engine(
+            lambda grid, source, target: dijkstra_search(
+                grid, source, target, DijkstraStrategy.steps, True
+            )
+        ),
+        False,
+    ),
+    'dijkstra_bidirectional': (
+        indexed_engine(
+            lambda grid, source, target: bidirectional_search(
+                grid, source, target, DijkstraStrategy.steps
+            )
+        ),
+        False,
+    ),
+}
+
+
+def make_grid(size: int, seed: int) -> TerrainGrid:
+    """
+    Build the seeded benchmark grid of a given size.
+
+    The grid holds the same terrains ``create_grid(size, size)`` would
+    produce after ``random.seed(seed)``, without building its nodes.
+    """
+    random.seed(seed)
+    return generate_grid(size, size, seed=random.getrandbits(64))
+
+
+def make_pairs(size: int, seed: int, count: int) -> List[Pair]:
+    """Pick fixed start/end edge cells with ``get_random_edge_position``."""
+    random.seed(seed)
+    pairs = []
+    while len(pairs) < count:
+        start = get_random_edge_position(size, size)
+        end = get_random_edge_position(size, size)
+        if start != end:
+            pairs.append((
+                start.x * size + start.y,
+                end.x * size + end.y,
+            ))
+    return pairs
+
+
+def measure(
+    run: Callable, grid: TerrainGrid, nodes, pair: Pair, memory: bool
+) -> Tuple[float, Optional[int], Optional[int], Optional[int], float]:
+    """Time one query, then trace its peak memory in a second run."""
+    started = time.perf_counter()
+    expanded, pushes, cost = run(grid, nodes, *pair)
+    seconds = time.perf_counter() - started
+
+    peak_bytes = None
+    if memory:
+        tracemalloc.start()
+        run(grid, nodes, *pair)
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return seconds, expanded, pushes, peak_bytes, cost
+
+
+@dataclass(slots=True)
+class Config:
+    """
+    What to benchmark.
+
+    Attributes:
+        sizes (List[int]): Sides of the square grids.
+        engines (List[str]): Names of the engines to run.
+        seed (int): Seed of the grids and of the start/end pairs.
+        pairs (int): Number of start/end pairs per grid.
+        memory (bool): Also trace the peak memory of each query.
+        node_grid_max_size (int): Largest grid on which the engines needing
+            a List[List[Node]] grid are run.
+    """
+
+    sizes: List[int] = field(default_factory=lambda: list(DEFAULT_SIZES))
+    engines: List[str] = field(default_factory=lambda: list(ENGINES))
+    seed: int = 0
+    pairs: int = 3
+    memory: bool = True
+    node_grid_max_size: int = NODE_GRID_MAX_SIZE
+
+
+def run_benchmarks(config: Config) -> List[Case]:
+    """
+    Run every engine over every grid size.
+
+    Args:
+        config (Config): What to benchmark.
+
+    Returns:
+        List[Case]: The measured cases.
+    """
+    cases = []
+    for size in config.sizes:
+        grid = make_grid(size, config.seed)
+        pairs = make_pairs(size, config.seed, config.pairs)
+        nodes = None
+        for name in config.engines:
+            run, needs_nodes = ENGINES[name]
+            if needs_nodes:
+                if size > config.node_grid_max_size:
+                    continue
+                if nodes is None:
+                    nodes = grid.to_nodes()
+            for index, pair in enumerate(pairs):
+                seconds, expanded, pushes, peak_bytes, cost = measure(
+                    run, grid, nodes, pair, config.memory
+                )
+                cases.append(
+                    Case(
+                        name,
+                        size,
+                        index,
+                        seconds,
+                        expanded,
+                        pushes,
+                        peak_bytes,
+                        cost,
+                    )
+                )
+    return cases
+
+
+def compare(
+    cases: List[Case], baseline: List[dict], max_slowdown: float
+) -> List[str]:
+    """
+    Compare cases against a baseline run.
+
+    Args:
+        cases (List[Case]): The current cases.
+        baseline (List[dict]): The cases of the baseline JSON report.
+        max_slowdown (float): Largest accepted ratio of wall times.
+
+    Returns:
+        List[str]: One message per regression: a slower run, or a path
+        cost that changed.
+    """
+    reference = {
+        (case['engine'], case['size'], case['pair']): case for case in baseline
+    }
+    regressions = []
+    for case in cases:
+        previous = reference.get((case.engine, case.size, case.pair))
+        if previous is None:
+            continue
+        ratio = case.seconds / max(previous['seconds'], 1e-9)
+        label = f'{case.engine} size={case.size} pair={case.pair}'
+        if ratio > max_slowdown:
+            regressions.append(f'{label}: {ratio:.2f}x slower')
+        if not math.isclose(case.cost, previous['cost'], rel_tol=1e-6):
+            regressions.append(
+                f'{label}: cost {case.cost} != {previous["cost"]}'
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES)
+    )
+    parser.add_argument(
+        '--engines', nargs='+', choices=list(ENGINES), default=list(ENGINES)
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pairs', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true')
+    parser.add_argument(
+        '--node-grid-max-size', type=int, default=NODE_GRID_MAX_SIZE
+    )
+    parser.add_argument('--output', help='Write the JSON report here.')
+    parser.add_argument('--baseline', help='JSON report to compare with.')
+    parser.add_argument('--max-slowdown', type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    cases = run_benchmarks(
+        Config(
+            args.sizes,
+            args.engines,
+            args.seed,
+            args.pairs,
+            not args.no_memory,
+            args.node_grid_max_size,
+        )
+    )
+    report = {
+        'python': platform.python_version(),
+        'seed': args.seed,
+        'cases': [asdict(case) for case in cases],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)['cases']
+        regressions = compare(cases, baseline, args.max_slowdown)
+        for regression in regressions:
+            print(regression, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
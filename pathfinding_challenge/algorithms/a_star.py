@@ -1,10 +1,23 @@
 import heapq
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
 
+from pathfinding_challenge.algorithms.cancel import CancelToken
+from pathfinding_challenge.algorithms.grid_search import (
+    SearchResult,
+    astar_search,
+    dijkstra_search_many,
+    path_nodes,
+    step_table,
+    trace_nodes,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
 from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.algorithms.path_stream import PathStream
+from pathfinding_challenge.algorithms.stats import SearchStats
 from pathfinding_challenge.entities.node import Node
 from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
 
 
 class AStarStrategy(PathfindingStrategy):
@@ -14,12 +27,14 @@ class AStarStrategy(PathfindingStrategy):
         Position(0, 1),
         Position(1, 0),
     ]
+    steps = step_table(allowed_directions)
 
     @staticmethod
     def heuristic(node1: Node, node2: Node) -> float:
         """
         Heuristic function estimating the cost from node1 to node2.
-        Using the Manhattan distance.
+        Using the Manhattan distance. ``find_path`` uses a ``Heuristic``
+        instead, which also accounts for the terrain weights.
 
         Args:
             node1 (Node): The starting node.
@@ -44,15 +59,13 @@ class AStarStrategy(PathfindingStrategy):
         Returns:
             List[Node]: A list of neighboring nodes.
         """
-        neighbors = []
-        for direction in AStarStrategy.allowed_directions:
-            new_position = node.position + direction
-            if (0 <= new_position.x < len(grid)) and (
-                0 <= new_position.y < len(grid[0])
-            ):
-                neighbor_node = grid[new_position.x][new_position.y]
-                neighbors.append(neighbor_node)
-        return neighbors
+        rows, columns = len(grid), len(grid[0])
+        x, y = node.position.x, node.position.y
+        return [
+            grid[x + dx][y + dy]
+            for dx, dy, _ in AStarStrategy.steps
+            if 0 <= x + dx < rows and 0 <= y + dy < columns
+        ]
 
     @staticmethod
     def calculate_distance(node1: Node, node2: Node) -> float:
@@ -78,55 +91,223 @@ class AStarStrategy(PathfindingStrategy):
 
     @staticmethod
     def find_path(
-        grid: List[List[Node]], start: Node, end: Node
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+        heuristic: Optional[Heuristic] = None,
     ) -> List[Node]:
         """
         Find the shortest path from the start node to the end node using
         the A* algorithm.
 
         Args:
-            grid (List[List[Node]]): The grid containing all nodes.
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
             start (Node): The starting node.
             end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+            heuristic (Optional[Heuristic]): The cost estimate towards the
+                end node. Defaults to None, which picks the tightest
+                admissible one for the terrains of a compact grid. Grids of
+                nodes cannot cache their lightest terrain, so their default
+                only bounds the move lengths: pass ``Heuristic.for_grid``,
+                built once, to also bound the weights.
 
         Returns:
             List[Node]: The list of nodes representing the shortest path.
                         If no path is found, returns an empty list.
         """
-        open_set: List[Tuple[float, Node]] = [(0, start)]
-        came_from: Dict[Node, Node] = {}
+        if isinstance(grid, TerrainGrid):
+            return AStarStrategy._find_path_on_grid(
+                grid, start, end, stats, heuristic
+            )
+        if heuristic is None:
+            heuristic = Heuristic.for_moves(AStarStrategy.steps)
 
+        counters = SearchStats(pushes=1)
+        # Equal f scores go to the larger g, i.e. the smaller estimate, then
+        # to the first pushed, so nodes are never compared
+        open_set: List[Tuple[float, float, int, Node]] = [(0, 0, 0, start)]
+        came_from: Dict[Node, Node] = {}
         g_score: Dict[Node, float] = {start: 0}
-        f_score: Dict[Node, float] = {
-            start: AStarStrategy.heuristic(start, end)
-        }
-
-        while open_set:
-            _, current = heapq.heappop(open_set)
-
-            if current == end:  # Edge case: reach the end
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.reverse()
-                return path
-
-            for neighbor in AStarStrategy.get_neighbors(grid, current):
-                tentative_g_score = g_score[
-                    current
-                ] + AStarStrategy.calculate_distance(current, neighbor)
-
-                if (
-                    neighbor not in g_score
-                    or tentative_g_score < g_score[neighbor]
-                ):
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = (
-                        tentative_g_score
-                        + AStarStrategy.heuristic(neighbor, end)
-                    )
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-
-        return []
+        # Re-expansions are only detected when stats are collected
+        expanded_nodes: Optional[Set[Node]] = None if stats is None else set()
+
+        with counters.phase('search'):
+            while open_set:
+                _, _, _, current = heapq.heappop(open_set)
+                counters.pops += 1
+
+                if current == end:  # Edge case: reach the end
+                    break
+
+                counters.expanded += 1
+                if expanded_nodes is not None:
+                    if current in expanded_nodes:
+                        counters.reopened += 1
+                    expanded_nodes.add(current)
+
+                for neighbor in AStarStrategy.get_neighbors(grid, current):
+                    tentative_g_score = g_score[
+                        current
+                    ] + AStarStrategy.calculate_distance(current, neighbor)
+
+                    if (
+                        neighbor not in g_score
+                        or tentative_g_score < g_score[neighbor]
+                    ):
+                        came_from[neighbor] = current
+                        g_score[neighbor] = tentative_g_score
+                        estimate = heuristic.between(neighbor, end)
+                        heapq.heappush(
+                            open_set,
+                            (
+                                tentative_g_score + estimate,
+                                estimate,
+                                counters.pushes,
+                                neighbor,
+                            ),
+                        )
+                        counters.pushes += 1
+                counters.max_open_size = max(
+                    counters.max_open_size, counters.pushes - counters.pops
+                )
+
+        # An exhausted open set leaves current on another node than the end
+        return trace_nodes(
+            came_from,
+            end if current == end else None,
+            g_score.get(end, math.inf),
+            counters,
+            stats,
+        )
+
+    @staticmethod
+    def _find_path_on_grid(
+        grid: TerrainGrid,
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+        heuristic: Optional[Heuristic] = None,
+    ) -> List[Node]:
+        """
+        Run the integer-indexed A* engine on a compact grid.
+
+        Nodes are only built for the returned path.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to.
+            heuristic (Optional[Heuristic]): The cost estimate towards the
+                end node.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        result = astar_search(
+            grid,
+            grid.index(start.position.x, start.position.y),
+            grid.index(end.position.x, end.position.y),
+            AStarStrategy.steps,
+            heuristic,
+        )
+        return path_nodes(grid, result, stats)
+
+    @staticmethod
+    def search(
+        grid: TerrainGrid,
+        source: int,
+        target: int,
+        cancel: Optional[CancelToken] = None,
+    ) -> SearchResult:
+        """
+        Run the engine of ``find_path`` between two cell indices.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            target (int): The destination cell index.
+            cancel (Optional[CancelToken]): Token the search polls to stop
+                early. Defaults to None.
+
+        Returns:
+            SearchResult: The cost, parent pointers and stats of the search.
+
+        Raises:
+            SearchCancelled: If the cancel token fired.
+        """
+        return astar_search(
+            grid, source, target, AStarStrategy.steps, cancel=cancel
+        )
+
+    @staticmethod
+    def stream_path(
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+        heuristic: Optional[Heuristic] = None,
+    ) -> PathStream:
+        """
+        Find the same path as ``find_path``, as a stream of positions.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes. Grids of nodes are packed into a compact grid.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+            heuristic (Optional[Heuristic]): The cost estimate towards the
+                end node. Defaults to None, which picks the tightest
+                admissible one for the grid terrains.
+
+        Returns:
+            PathStream: The path, read from the parents of the search.
+        """
+        if not isinstance(grid, TerrainGrid):
+            grid = TerrainGrid.from_nodes(grid)
+        if heuristic is None:
+            heuristic = Heuristic.for_grid(grid, AStarStrategy.steps)
+        result = astar_search(
+            grid,
+            grid.index(start.position.x, start.position.y),
+            grid.index(end.position.x, end.position.y),
+            AStarStrategy.steps,
+            heuristic,
+        )
+        if stats is not None:
+            stats.merge(result.stats)
+        return PathStream(grid, result)
+
+    @staticmethod
+    def search_many(
+        grid: TerrainGrid, source: int, targets: Sequence[int]
+    ) -> List[SearchResult]:
+        """
+        Search from one source cell to several target cells.
+
+        A single target runs A*; several targets share one Dijkstra
+        search over the same 4-connected moves and edge costs.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            targets (Sequence[int]): The destination cell indices.
+
+        Returns:
+            List[SearchResult]: One result per target, in the same order.
+        """
+        if len(targets) == 1:
+            return [
+                astar_search(grid, source, targets[0], AStarStrategy.steps)
+            ]
+        return dijkstra_search_many(grid, source, targets, AStarStrategy.steps)
@@ -0,0 +1,423 @@
+import heapq
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    NO_PARENT,
+    Direction,
+    SearchResult,
+    path_nodes,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.path import Path
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+from pathfinding_challenge.utils import path_costs_from_arrays
+
+DEFAULT_INFLATION = 3.0
+DEFAULT_INFLATION_STEP = 0.5
+# Expansions between two reads of the clock
+BUDGET_CHECK_INTERVAL = 256
+
+Entry = Tuple[float, int, int, float]
+
+
+class BoundedPath(Path):
+    """
+    Path whose cost is within a known factor of the optimal cost.
+
+    Attributes:
+        bound (float): The cost is at most ``bound`` times the optimal
+            cost. 1 means the path is optimal.
+    """
+
+    __slots__ = ('bound',)
+
+    def __init__(
+        self,
+        nodes: Iterable[Node] = (),
+        cost: float = 0.0,
+        bound: float = 1.0,
+    ):
+        super().__init__(nodes, cost)
+        self.bound = bound
+
+    def copy(self) -> 'BoundedPath':
+        """Return a shallow copy keeping the cost and bound."""
+        return BoundedPath(self, self.cost, self.bound)
+
+    def __reduce__(self):
+        return (BoundedPath, (list(self), self.cost, self.bound))
+
+
+@dataclass(slots=True)
+class AnytimePlanner:
+    """
+    Anytime Repairing A* (ARA*) between two cells of a grid.
+
+    Each round is a weighted A* whose estimates are inflated by
+    ``inflation``, which finds a path costing at most ``inflation`` times
+    the optimal one while expanding far fewer cells. The next round
+    lowers the inflation and reuses the costs found so far: only the
+    cells whose cost improved after being expanded, kept in
+    ``inconsistent``, are searched again.
+
+    Attributes:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        target (int): The destination cell index.
+        moves (List[Direction]): The allowed moves.
+        heuristic (Heuristic): The consistent estimate towards the target.
+        inflation (float): The factor of the estimates this round.
+        proven (float): The bound of the last completed round.
+        g_score (array): The best known cost of each cell.
+        parents (array): The parent index of each reached cell.
+        closed (bytearray): The cells expanded this round.
+        queue (List[Entry]): The open set, as (f, counter, cell, g)
+            entries. Entries whose g is outdated are stale.
+        inconsistent (Dict[int, None]): Closed cells whose cost improved,
+            in insertion order.
+        stats (SearchStats): Counters of every round so far.
+    """
+
+    grid: TerrainGrid
+    source: int
+    target: int
+    moves: List[Direction]
+    heuristic: Heuristic
+    inflation: float
+    g_score: array
+    parents: array
+    closed: bytearray
+    proven: float = math.inf
+    queue: List[Entry] = field(default_factory=list)
+    inconsistent: Dict[int, None] = field(default_factory=dict)
+    stats: SearchStats = field(default_factory=SearchStats)
+    _counter: int = 0
+
+    @classmethod
+    def start(
+        cls,
+        grid: TerrainGrid,
+        source: int,
+        target: int,
+        moves: Iterable[Direction],
+        inflation: float,
+    ) -> 'AnytimePlanner':
+        """
+        Set up a planner with only the source queued.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            target (int): The destination cell index.
+            moves (Iterable[Direction]): The allowed moves, as built by
+                ``step_table``.
+            inflation (float): The factor of the estimates of the first
+                round.
+
+        Returns:
+            AnytimePlanner: The planner.
+        """
+        moves = list(moves)
+        size = grid.n * grid.m
+        planner = cls(
+            grid,
+            source,
+            target,
+            moves,
+            Heuristic.for_grid(grid, moves),
+            inflation,
+            array('d', [math.inf]) * size,
+            array('i', [NO_PARENT]) * size,
+            bytearray(size),
+        )
+        planner.g_score[source] = 0.0
+        planner.push(source)
+        return planner
+
+    @property
+    def found(self) -> bool:
+        """Whether a path to the target is known."""
+        return self.g_score[self.target] != math.inf
+
+    def estimate(self, cell: int) -> float:
+        """Return the uninflated estimate from a cell to the target."""
+        x, y = divmod(cell, self.grid.m)
+        target_x, target_y = divmod(self.target, self.grid.m)
+        return self.heuristic.estimate(x - target_x, y - target_y)
+
+    def push(self, cell: int):
+        """Queue a cell under its inflated key."""
+        g = self.g_score[cell]
+        self._counter += 1
+        heapq.heappush(
+            self.queue,
+            (g + self.inflation * self.estimate(cell), self._counter, cell, g),
+        )
+        self.stats.pushes += 1
+
+    def improve(self, deadline: float, expansions: float) -> bool:
+        """
+        Run the current round until its path is settled or the budget
+        runs out. The budget is only enforced once a path is known.
+
+        Args:
+            deadline (float): The ``time.perf_counter`` value to stop at.
+            expansions (float): The total expansions to stop at.
+
+        Returns:
+            bool: Whether the round completed.
+        """
+        target, g_score, closed = self.target, self.g_score, self.closed
+        queue, stats = self.queue, self.stats
+
+        while queue:
+            key, _, cell, g = queue[0]
+            if closed[cell] or g != g_score[cell]:
+                heapq.heappop(queue)
+                stats.pops += 1
+                stats.stale_pops += 1
+                continue
+            if key >= g_score[target]:
+                break
+            if g_score[target] != math.inf and (
+                stats.expanded >= expansions
+                or (
+                    not stats.expanded % BUDGET_CHECK_INTERVAL
+                    and time.perf_counter() >= deadline
+                )
+            ):
+                return False
+            heapq.heappop(queue)
+            stats.pops += 1
+            closed[cell] = 1
+            stats.expanded += 1
+            self.relax(cell, g)
+            stats.max_open_size = max(stats.max_open_size, len(queue))
+
+        self.proven = self.inflation
+        return True
+
+    def relax(self, cell: int, g: float):
+        """
+        Lower the cost of the neighbors of an expanded cell.
+
+        Improved neighbors are queued, or set aside for the next round if
+        they were already expanded in this one.
+
+        Args:
+            cell (int): The expanded cell.
+            g (float): The cost of the cell.
+        """
+        grid = self.grid
+        n, m = grid.n, grid.m
+        codes, weights = grid.codes, grid.weights
+        g_score, parents, closed = self.g_score, self.parents, self.closed
+
+        x, y = divmod(cell, m)
+        for dx, dy, step in self.moves:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= n or ny < 0 or ny >= m:
+                continue
+            neighbor = nx * m + ny
+            candidate = g + step + weights[codes[neighbor]]
+            if candidate < g_score[neighbor]:
+                g_score[neighbor] = candidate
+                parents[neighbor] = cell
+                if closed[neighbor]:
+                    self.inconsistent[neighbor] = None
+                else:
+                    self.push(neighbor)
+
+    def tighten(self, inflation: float):
+        """
+        Start a new round with a lower inflation.
+
+        Args:
+            inflation (float): The factor of the estimates, at least 1.
+        """
+        g_score, closed = self.g_score, self.closed
+        cells = dict.fromkeys(
+            cell
+            for _, _, cell, g in self.queue
+            if not closed[cell] and g == g_score[cell]
+        )
+        cells.update(self.inconsistent)
+        self.inconsistent.clear()
+        self.closed = bytearray(len(closed))
+        self.inflation = inflation
+        counter = self._counter
+        self.queue = [
+            (
+                g_score[cell] + inflation * self.estimate(cell),
+                counter + order,
+                cell,
+                g_score[cell],
+            )
+            for order, cell in enumerate(cells, 1)
+        ]
+        heapq.heapify(self.queue)
+        self._counter += len(cells)
+        self.stats.pushes += len(cells)
+
+    def bound(self) -> float:
+        """
+        Return the suboptimality bound of the current path.
+
+        Returns:
+            float: The factor the path cost is within of the optimal cost,
+            ``math.inf`` if no path is known yet.
+        """
+        cost = self.g_score[self.target]
+        if cost == math.inf:
+            return math.inf
+        g_score = self.g_score
+        cells = [
+            cell
+            for _, _, cell, g in self.queue
+            if not self.closed[cell] and g == g_score[cell]
+        ]
+        lowest = min(
+            (
+                g_score[cell] + self.estimate(cell)
+                for cell in (*cells, *self.inconsistent)
+            ),
+            default=math.inf,
+        )
+        ratio = cost / lowest if lowest > 0 else math.inf
+        return max(1.0, min(self.proven, ratio))
+
+    def result(self) -> SearchResult:
+        """
+        Return the current path as a search result.
+
+        Returns:
+            SearchResult: The exact cost of the path the parent pointers
+            hold, which may be below the recorded cost of the target in
+            the middle of a round.
+        """
+        if not self.found:
+            return SearchResult(
+                self.source, self.target, math.inf, array('i'), self.stats
+            )
+        cells = [self.source]
+        cell = self.target
+        while cell != self.source:
+            cells.append(cell)
+            cell = self.parents[cell]
+        cells[1:] = cells[:0:-1]
+        xs, ys = np.divmod(np.asarray(cells), self.grid.m)
+        weights = np.asarray(self.grid.weights)[
+            np.frombuffer(self.grid.codes, np.uint8)[cells]
+        ]
+        cost = float(path_costs_from_arrays(xs, ys, weights)[0])
+        return SearchResult(
+            self.source, self.target, cost, self.parents, self.stats
+        )
+
+
+class AnytimeStrategy(AStarStrategy):
+    """
+    ARA* with the moves and costs of ``AStarStrategy``.
+
+    A first path, at most ``inflation`` times costlier than the optimal
+    one, is found by a weighted A*. While the budget lasts, the inflation
+    is lowered by ``step`` and the path improved, down to the optimal one.
+    The budget is only checked once a path is known, so a path is always
+    returned when one exists.
+
+    The returned ``BoundedPath`` reports the bound reached, which is also
+    kept as ``bound`` until the next call.
+
+    Attributes:
+        inflation (float): The inflation of the first round.
+        step (float): How much each round lowers the inflation.
+        time_budget (Optional[float]): Seconds a call may spend. Defaults
+            to None, which runs to the optimal path.
+        expansion_budget (Optional[int]): Cells a call may expand.
+            Defaults to None, which runs to the optimal path.
+        bound (float): The bound of the last path found.
+    """
+
+    def __init__(
+        self,
+        inflation: float = DEFAULT_INFLATION,
+        step: float = DEFAULT_INFLATION_STEP,
+        time_budget: Optional[float] = None,
+        expansion_budget: Optional[int] = None,
+    ):
+        if inflation < 1:
+            raise ValueError('Inflation must be at least 1')
+        if step <= 0:
+            raise ValueError('Inflation step must be positive')
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError('Time budget must be positive')
+        if expansion_budget is not None and expansion_budget < 1:
+            raise ValueError('Expansion budget must be at least 1')
+        self.inflation = inflation
+        self.step = step
+        self.time_budget = time_budget
+        self.expansion_budget = expansion_budget
+        self.bound = math.inf
+
+    def find_path(
+        self,
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> BoundedPath:
+        """
+        Find a path from the start node to the end node, as close to the
+        shortest one as the budget allows.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the counters of every
+                round and the timings are added to. Defaults to None,
+                which collects nothing.
+
+        Returns:
+            BoundedPath: The nodes representing the path, with its cost and
+            suboptimality bound. If no path is found, returns an empty
+            path with an infinite cost and bound.
+        """
+        started = time.perf_counter()
+        deadline = math.inf
+        if self.time_budget is not None:
+            deadline = started + self.time_budget
+        expansions = self.expansion_budget or math.inf
+        compact = grid
+        if not isinstance(compact, TerrainGrid):
+            compact = TerrainGrid.from_nodes(grid)
+        planner = AnytimePlanner.start(
+            compact,
+            compact.index(start.position.x, start.position.y),
+            compact.index(end.position.x, end.position.y),
+            AStarStrategy.steps,
+            self.inflation,
+        )
+        searching = time.perf_counter()
+        while planner.improve(deadline, expansions) and planner.found:
+            if planner.inflation <= 1 or time.perf_counter() >= deadline:
+                break
+            planner.tighten(max(1.0, planner.inflation - self.step))
+
+        self.bound = planner.bound()
+        result = planner.result()
+        result.stats.add_timing('setup', searching - started)
+        result.stats.add_timing('search', time.perf_counter() - searching)
+        path = path_nodes(grid, result, stats)
+        return BoundedPath(path, path.cost, self.bound)
@@ -0,0 +1,107 @@
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pathfinding_challenge.algorithms.parallel import SharedGridPool
+from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+BatchAnswer = Tuple[List[Node], float]
+
+
+def group_by_source(
+    grid: TerrainGrid, pairs: Sequence[Tuple[Node, Node]]
+) -> Dict[int, List[int]]:
+    """
+    Group start/end pairs by their source cell.
+
+    Args:
+        grid (TerrainGrid): The compact grid the pairs refer to.
+        pairs (Sequence[Tuple[Node, Node]]): The start/end node pairs.
+
+    Returns:
+        Dict[int, List[int]]: The distinct target indices of each source
+        index, in order of first appearance. Pairs with a node outside the
+        grid are left out.
+    """
+    groups: Dict[int, Dict[int, None]] = {}
+    for start, end in pairs:
+        source, target = _cell(grid, start), _cell(grid, end)
+        if source is not None and target is not None:
+            groups.setdefault(source, {})[target] = None
+    return {source: list(targets) for source, targets in groups.items()}
+
+
+def solve_batch(
+    strategy: PathfindingStrategy,
+    grid: TerrainGrid,
+    pairs: Sequence[Tuple[Node, Node]],
+    pool: Optional[SharedGridPool] = None,
+) -> List[BatchAnswer]:
+    """
+    Answer many start/end queries with one search per distinct source.
+
+    Args:
+        strategy (PathfindingStrategy): A strategy providing
+            ``search_many``.
+        grid (TerrainGrid): The compact grid.
+        pairs (Sequence[Tuple[Node, Node]]): The start/end node pairs.
+        pool (Optional[SharedGridPool]): Worker processes started on the
+            same grid and strategy, running independent sources in
+            parallel. Defaults to None, which runs in-process, as does a
+            batch with a single source.
+
+    Returns:
+        List[BatchAnswer]: The path and cost of each pair, in input order.
+        Pairs with a node outside the grid are unreachable, like in
+        ``Context.run``: an empty path costing ``math.inf``.
+    """
+    groups = group_by_source(grid, pairs)
+    answers: Dict[Tuple[int, int], Tuple[List[int], float]] = {}
+    if pool is None or len(groups) <= 1:
+        for source, targets in groups.items():
+            results = _solve_source(strategy, grid, source, targets)
+            for target, result in zip(targets, results):
+                answers[source, target] = result
+    else:
+        queries = [
+            (source, target)
+            for source, targets in groups.items()
+            for target in targets
+        ]
+        for query, (path, cost) in zip(queries, pool.solve(queries)):
+            answers[query] = (
+                (path[:, 0] * grid.m + path[:, 1]).tolist(),
+                cost,
+            )
+
+    batch = []
+    for start, end in pairs:
+        query = (_cell(grid, start), _cell(grid, end))
+        if query in answers:
+            indices, cost = answers[query]
+            batch.append((grid.nodes(indices), cost))
+        else:
+            batch.append(([], math.inf))
+    return batch
+
+
+def _cell(grid: TerrainGrid, node: Node) -> Optional[int]:
+    """Return the linear index of the cell of a node, None off the grid."""
+    x, y = node.position.x, node.position.y
+    if 0 <= x < grid.n and 0 <= y < grid.m:
+        return grid.index(x, y)
+    return None
+
+
+def _solve_source(
+    strategy: PathfindingStrategy,
+    grid: TerrainGrid,
+    source: int,
+    targets: List[int],
+) -> List[Tuple[List[int], float]]:
+    """Run one single-source search and keep only compact answers."""
+    return [
+        (result.indices(), result.cost)
+        for result in strategy.search_many(grid, source, targets)
+    ]
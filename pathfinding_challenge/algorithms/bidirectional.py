@@ -0,0 +1,116 @@
+from typing import List, Optional, Union
+
+from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    Direction,
+    SearchResult,
+    bidirectional_search,
+    path_nodes,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+
+def _find_path(
+    grid: Union[List[List[Node]], TerrainGrid],
+    start: Node,
+    end: Node,
+    directions: List[Direction],
+    heuristic: Optional[Heuristic],
+) -> SearchResult:
+    """Run the bidirectional engine, converting node grids first."""
+    if not isinstance(grid, TerrainGrid):
+        grid = TerrainGrid.from_nodes(grid)
+    return bidirectional_search(
+        grid,
+        grid.index(start.position.x, start.position.y),
+        grid.index(end.position.x, end.position.y),
+        directions,
+        heuristic,
+    )
+
+
+class BidirectionalAStarStrategy(AStarStrategy):
+    """
+    A* searching from both the start and the end node at once.
+
+    Long queries, such as edge to edge ones, meet halfway instead of
+    sweeping most of the grid from one side. Moves and costs are the same
+    as ``AStarStrategy``.
+    """
+
+    @staticmethod
+    def find_path(
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+        heuristic: Optional[Heuristic] = None,
+    ) -> List[Node]:
+        """
+        Find the shortest path from the start node to the end node using
+        a bidirectional A* search.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+            heuristic (Optional[Heuristic]): The cost estimate guiding both
+                sides. Defaults to None, which picks the tightest admissible
+                one for the grid terrains.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        compact = grid
+        if not isinstance(compact, TerrainGrid):
+            compact = TerrainGrid.from_nodes(grid)
+        if heuristic is None:
+            heuristic = Heuristic.for_grid(compact, AStarStrategy.steps)
+        result = _find_path(
+            compact, start, end, AStarStrategy.steps, heuristic
+        )
+        return path_nodes(grid, result, stats)
+
+
+class BidirectionalDijkstraStrategy(DijkstraStrategy):
+    """
+    Dijkstra searching from both the start and the end node at once.
+
+    Moves and costs are the same as ``DijkstraStrategy``.
+    """
+
+    @staticmethod
+    def find_path(
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Node]:
+        """
+        Find the shortest path from the start node to the end node using
+        a bidirectional Dijkstra search.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        result = _find_path(grid, start, end, DijkstraStrategy.steps, None)
+        return path_nodes(grid, result, stats)
@@ -0,0 +1,88 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, List, Optional, Tuple
+
+from pathfinding_challenge.entities.node import Node
+
+DEFAULT_CACHE_SIZE = 128
+
+
+@dataclass(slots=True)
+class ResultCache:
+    """
+    Bounded cache of found paths, with LRU eviction and an optional TTL.
+
+    Attributes:
+        max_size (int): The most paths kept. Storing one more evicts the
+            least recently used. Defaults to 128.
+        ttl (Optional[float]): Seconds a path stays valid after being
+            stored. Defaults to None, which keeps paths until evicted.
+        clock (Callable[[], float]): The time source, in seconds.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups not found, or found expired.
+        evictions (int): Paths dropped to make room.
+        expirations (int): Paths dropped because their TTL ran out.
+    """
+
+    max_size: int = DEFAULT_CACHE_SIZE
+    ttl: Optional[float] = None
+    clock: Callable[[], float] = time.monotonic
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    _entries: 'OrderedDict[Hashable, Tuple[float, List[Node]]]' = field(
+        default_factory=OrderedDict, repr=False
+    )
+
+    def __post_init__(self):
+        if self.max_size < 1:
+            raise ValueError('Cache size must be at least 1')
+        if self.ttl is not None and self.ttl <= 0:
+            raise ValueError('Cache TTL must be positive')
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[List[Node]]:
+        """
+        Look up a path and mark it as recently used.
+
+        Args:
+            key (Hashable): The query key.
+
+        Returns:
+            Optional[List[Node]]: A copy of the cached path, or None on a
+            miss.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1].copy()
+
+    def put(self, key: Hashable, path: List[Node]):
+        """
+        Store a path, evicting the least recently used one if full.
+
+        Args:
+            key (Hashable): The query key.
+            path (List[Node]): The path found for the query.
+        """
+        expires = float('inf') if self.ttl is None else self.clock() + self.ttl
+        self._entries[key] = (expires, path.copy())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every path, keeping the counters."""
+        self._entries.clear()
@@ -0,0 +1,54 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# Expansions between two checks of a token, so that searching stays cheap
+CHECK_INTERVAL = 1024
+
+
+class SearchCancelled(Exception):
+    """Raised from inside a search whose cancel token fired."""
+
+
+@dataclass(slots=True)
+class CancelToken:
+    """
+    Flag a running search polls to stop early.
+
+    Engines given a token call ``check`` every ``CHECK_INTERVAL``
+    expansions, so cancelling from another thread stops the search within
+    a bounded amount of work instead of letting it run to the end.
+
+    Attributes:
+        deadline (Optional[float]): The clock time after which the search
+            stops on its own. Defaults to None, which never expires.
+        cancelled (bool): Whether ``cancel`` was called.
+        clock (Callable[[], float]): The time source, in seconds.
+    """
+
+    deadline: Optional[float] = None
+    cancelled: bool = False
+    clock: Callable[[], float] = time.monotonic
+
+    @classmethod
+    def after(
+        cls, timeout: float, clock: Callable[[], float] = time.monotonic
+    ) -> 'CancelToken':
+        """Return a token expiring ``timeout`` seconds from now."""
+        return cls(clock() + timeout, clock=clock)
+
+    def cancel(self):
+        """Ask the search to stop at its next check."""
+        self.cancelled = True
+
+    def check(self):
+        """
+        Stop the search if the token was cancelled or has expired.
+
+        Raises:
+            SearchCancelled: If the search should stop.
+        """
+        if self.cancelled:
+            raise SearchCancelled('Search cancelled')
+        if self.deadline is not None and self.clock() >= self.deadline:
+            raise SearchCancelled('Search deadline expired')
@@ -1,14 +1,41 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import (
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
+import numpy as np
+
+from pathfinding_challenge.algorithms.batch import BatchAnswer, solve_batch
+from pathfinding_challenge.algorithms.cache import ResultCache
 from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.algorithms.parallel import SharedGridPool
 from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.algorithms.path_stream import PathStream
+from pathfinding_challenge.algorithms.stats import (
+    SearchStats,
+    StatsHook,
+    resolve_stats_hook,
+)
 from pathfinding_challenge.entities.down_hill import DownHill
 from pathfinding_challenge.entities.node import Node
 from pathfinding_challenge.entities.plateau import Plateau
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
 from pathfinding_challenge.entities.up_hill import UpHill
 from pathfinding_challenge.entities.valley import Valley
 
+# Terrains that cannot be followed by another one, rightwards or downwards
+FORBIDDEN_NEIGHBORS: Tuple[Tuple[Type[Node], Type[Node]], ...] = (
+    (UpHill, Valley),
+    (DownHill, Plateau),
+)
+
 
 @dataclass(slots=True)
 class Context:
@@ -17,30 +44,74 @@ class Context:
 
     Attributes:
         _strategy (PathfindingStrategy): The pathfinding strategy to use.
-        _grid (List[List[Node]]): The grid of nodes representing the map.
+        _grid (Union[List[List[Node]], TerrainGrid]): The grid of nodes
+        representing the map, either as nodes or as a compact grid.
         _start (Node): The starting node for pathfinding.
         _end (Node): The ending node for pathfinding.
+        _terrain_grid (Optional[TerrainGrid]): Compact copy of the grid
+        reused across batch runs, reset by the grid setter.
+        _cache (Optional[ResultCache]): Cache of the paths found by run,
+        or None to always search.
+        _grid_version (int): Counter bumped by the grid setter, part of
+        the cache keys.
+        _validation (bool): Whether the grid setter rejects grids with
+        forbidden adjacent terrains. Defaults to True.
+        _pool (Optional[SharedGridPool]): Worker processes kept by
+        run_batch between calls, closed when the grid changes.
+        _pool_key (Optional[Hashable]): The grid version, strategy and
+        number of processes the pool was started for.
 
     Methods:
         grid: Property to get or set the grid of nodes.
         start: Property to get or set the starting node.
         end: Property to get or set the ending node.
         strategy: Property to get or set the pathfinding strategy.
+        cache: Property to get or set the result cache.
+        validation: Property to turn grid validation on assignment on or
+        off.
+        revalidate: Checks the cells around cells edited in place.
         run: Executes the pathfinding strategy on the current grid, start,
-        and end nodes.
+        and end nodes, optionally collecting search stats.
+        stream: Executes the pathfinding strategy and streams the path
+        positions.
+        run_batch: Answers many start/end pairs with one search per source.
+        close: Stops the worker processes kept by run_batch.
         _validate_grid: Validates the grid for disallowed node configurations.
+        _validate_cells: Validates the neighborhood of some cells.
         _validate_adjacent_nodes: Checks and raises an error for forbidden
         adjacent node configurations.
     """
 
     _strategy: PathfindingStrategy = field(default_factory=DijkstraStrategy)
-    _grid: List[List[Node]] = field(
+    _grid: Union[List[List[Node]], TerrainGrid] = field(
         default_factory=lambda: [
             [Valley() for _ in range(3)] for _ in range(3)
         ]
     )
     _start: Node = field(default_factory=Valley)
     _end: Node = field(default_factory=Valley)
+    _terrain_grid: Optional[TerrainGrid] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _cache: Optional[ResultCache] = field(
+        default=None, repr=False, compare=False
+    )
+    _grid_version: int = field(
+        default=0, init=False, repr=False, compare=False
+    )
+    _validation: bool = field(default=True, repr=False, compare=False)
+    _pool: Optional[SharedGridPool] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _pool_key: Optional[Hashable] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __enter__(self) -> 'Context':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     @property
     def grid(self):
@@ -48,22 +119,34 @@ class Context:
         Property to get or set the grid of nodes.
 
         Returns:
-            List[List[Node]]: The current grid of nodes.
+            Union[List[List[Node]], TerrainGrid]: The current grid of nodes.
 
         Raises:
-            TypeError: If the new grid is not a list or a list of lists.
-            ValueError: If the grid contains forbidden adjacent node
-            configurations.
+            TypeError: If the new grid is not a TerrainGrid, a list or a
+            list of lists.
+            ValueError: If validation is on and the grid contains
+            forbidden adjacent node configurations.
         """
         return self._grid
 
     @grid.setter
-    def grid(self, new_grid: List[List[Node]]):
-        if not isinstance(new_grid, list):
-            raise TypeError('Grid must be a list')
-        if not all(isinstance(row, list) for row in new_grid):
-            raise TypeError('Grid must be a list of lists')
+    def grid(self, new_grid: Union[List[List[Node]], TerrainGrid]):
+        if not isinstance(new_grid, TerrainGrid):
+            if not isinstance(new_grid, list):
+                raise TypeError('Grid must be a list')
+            if not all(isinstance(row, list) for row in new_grid):
+                raise TypeError('Grid must be a list of lists')
+        terrain_grid = None
+        if self._validation:
+            terrain_grid = self._validate_grid(new_grid)
+            if terrain_grid is new_grid:
+                terrain_grid = None
         self._grid = new_grid
+        self._terrain_grid = terrain_grid
+        self._grid_version += 1
+        self.close()
+        if self._cache is not None:
+            self._cache.clear()
 
     @property
     def start(self):
@@ -115,11 +198,91 @@ class Context:
             )
         self._strategy = new_strategy
 
-    def run(self):
+    @property
+    def cache(self):
+        """
+        Property to get or set the result cache used by run.
+
+        Paths are cached per grid version, start and end positions and
+        strategy instance. Setting the grid, even to the same object, or
+        calling ``revalidate`` starts a new version, so report cells edited
+        in place through either. Compact grids are also keyed by their own
+        version, which ``TerrainGrid.set_node`` bumps.
+
+        Returns:
+            Optional[ResultCache]: The current cache, or None when run
+            always searches.
+
+        Raises:
+            TypeError: If the new cache is neither a ResultCache nor None.
+        """
+        return self._cache
+
+    @cache.setter
+    def cache(self, new_cache: Optional[ResultCache]):
+        if new_cache is not None and not isinstance(new_cache, ResultCache):
+            raise TypeError('Cache must be a ResultCache or None')
+        self._cache = new_cache
+
+    @property
+    def validation(self):
+        """
+        Property to turn grid validation on assignment on or off.
+
+        On by default, the grid setter then rejects grids with forbidden
+        adjacent terrains. The check runs on the terrain-code plane, so it
+        stays cheap on large grids; turn it off only for grids known to be
+        valid. Turning it back on does not check the current grid.
+
+        Returns:
+            bool: Whether the grid setter validates new grids.
+        """
+        return self._validation
+
+    @validation.setter
+    def validation(self, enabled: bool):
+        self._validation = bool(enabled)
+
+    def revalidate(self, cells: Iterable[Tuple[int, int]]):
+        """
+        Report cells of the current grid edited in place, and check them.
+
+        Only the pairs of neighbors the cells belong to are checked. The
+        compact copy used by batch runs takes the new terrains, and cached
+        results are dropped.
+
+        Args:
+            cells (Iterable[Tuple[int, int]]): The (x, y) positions of the
+            edited cells.
+
+        Raises:
+            ValueError: If an edited cell is in a forbidden adjacent node
+            configuration.
+        """
+        cells = list(cells)
+        terrain_grid = self._compact_grid()
+        if terrain_grid is not self._grid:
+            for x, y in cells:
+                terrain_grid.set_node(x, y, self._grid[x][y])
+        terrain_grid.invalidate()
+        self._grid_version += 1
+        self.close()
+        if self._cache is not None:
+            self._cache.clear()
+        self._validate_cells(terrain_grid, cells)
+
+    def run(self, stats: Optional[StatsHook] = None):
         """
         Executes the pathfinding strategy on the current grid, start,
         and end nodes.
 
+        Args:
+            stats (Optional[StatsHook]): A SearchStats collector the
+            search counters and timings are added to, or a callback
+            called with them once the search is over. Defaults to None,
+            which collects nothing. A path answered by the cache adds
+            nothing to the collector.
+
         Returns:
             List[Node]: The list of nodes representing the path from
             start to end.
@@ -132,29 +295,262 @@ class Context:
             raise NotImplementedError(
                 'Strategy must implement the find_path method'
             )
-        return self._strategy.find_path(self.grid, self.start, self.end)
+        key = None
+        if self._cache is not None:
+            key = self._cache_key()
+            path = self._cache.get(key)
+            if path is not None:
+                if stats is not None and not isinstance(stats, SearchStats):
+                    stats(SearchStats())
+                return path
+        if stats is None:
+            path = self._strategy.find_path(self.grid, self.start, self.end)
+        else:
+            collector = resolve_stats_hook(stats)
+            path = self._strategy.find_path(
+                self.grid, self.start, self.end, stats=collector
+            )
+            if collector is not stats:
+                stats(collector)
+        if key is not None:
+            self._cache.put(key, path)
+        return path
+
+    def stream(self) -> PathStream:
+        """
+        Executes the pathfinding strategy and streams the path positions
+        instead of building its nodes. Streams are not cached.
+
+        Returns:
+            PathStream: The path from start to end.
+
+        Raises:
+            NotImplementedError: If the strategy does not implement the
+            stream_path method.
+        """
+        if not hasattr(self._strategy, 'stream_path'):
+            raise NotImplementedError(
+                'Strategy must implement the stream_path method'
+            )
+        return self._strategy.stream_path(
+            self._compact_grid(), self.start, self.end
+        )
+
+    def _cache_key(self) -> Hashable:
+        """
+        Returns the cache key of the current query.
+
+        Returns:
+            Hashable: The grid versions, the start and end positions, and
+            the strategy. Strategies are compared by identity, so two
+            instances configured differently never share paths.
+        """
+        grid_version = None
+        if isinstance(self._grid, TerrainGrid):
+            grid_version = self._grid.version
+        start, end = self._start.position, self._end.position
+        return (
+            self._grid_version,
+            grid_version,
+            (start.x, start.y),
+            (end.x, end.y),
+            self._strategy,
+        )
+
+    def run_batch(
+        self,
+        pairs: Sequence[Tuple[Node, Node]],
+        processes: Optional[int] = None,
+    ) -> List[BatchAnswer]:
+        """
+        Executes the pathfinding strategy for many start/end pairs.
+
+        The grid is converted to a compact grid once and reused across
+        calls, and pairs sharing a start node are answered by a single
+        search from that node.
+
+        Worker processes are started on the first parallel call and kept
+        for the next ones, until the grid, the strategy or the number of
+        processes changes. Call ``close``, or use the context in a
+        ``with`` block, to stop them.
+
+        Args:
+            pairs (Sequence[Tuple[Node, Node]]): The start/end node pairs.
+            processes (Optional[int]): Number of worker processes used to
+            search independent sources in parallel. Defaults to None,
+            which searches in the current process, as does 1.
+
+        Returns:
+            List[BatchAnswer]: The path and cost of each pair, in input
+            order.
+
+        Raises:
+            NotImplementedError: If the strategy does not implement the
+            search_many method.
+        """
+        if not hasattr(self._strategy, 'search_many'):
+            raise NotImplementedError(
+                'Strategy must implement the search_many method'
+            )
+        pool = None
+        if processes is not None and processes > 1:
+            pool = self._worker_pool(processes)
+        return solve_batch(self._strategy, self._compact_grid(), pairs, pool)
 
-    def _validate_grid(self, grid: List[List[Node]]):
+    def close(self):
+        """Stops the worker processes kept by run_batch, if any."""
+        if self._pool is not None:
+            self._pool.close()
+        self._pool = None
+        self._pool_key = None
+
+    def _worker_pool(self, processes: int) -> SharedGridPool:
+        """
+        Returns the worker pool for the current grid and strategy.
+
+        Args:
+            processes (int): The number of worker processes.
+
+        Returns:
+            SharedGridPool: The pool kept from a previous call, or a new
+            one if the grid, the strategy or the number of processes
+            changed since.
+        """
+        grid = self._compact_grid()
+        key = (self._grid_version, grid.version, self._strategy, processes)
+        if self._pool is None or self._pool_key != key:
+            self.close()
+            self._pool = SharedGridPool(grid, self._strategy, processes)
+            self._pool_key = key
+        return self._pool
+
+    def _compact_grid(self) -> TerrainGrid:
+        """
+        Returns the grid as a TerrainGrid, converting it only once.
+
+        Returns:
+            TerrainGrid: The compact version of the current grid.
+        """
+        if isinstance(self._grid, TerrainGrid):
+            return self._grid
+        if self._terrain_grid is None:
+            self._terrain_grid = TerrainGrid.from_nodes(self._grid)
+        return self._terrain_grid
+
+    def _validate_grid(
+        self, grid: Union[List[List[Node]], TerrainGrid]
+    ) -> TerrainGrid:
         """
         Validates the grid for disallowed node configurations.
 
+        Each rule compares the terrain-code plane with itself shifted by
+        one column and by one row, instead of checking pairs of nodes. The
+        reported configuration is the first one a row-major scan of the
+        pairs would find.
+
         Args:
-            grid (List[List[Node]]): The grid to validate.
+            grid (Union[List[List[Node]], TerrainGrid]): The grid to
+            validate.
+
+        Returns:
+            TerrainGrid: The grid as a compact grid.
 
         Raises:
             ValueError: If the grid contains forbidden adjacent
             node configurations.
         """
-        for i, row in enumerate(grid):
-            for j, node in enumerate(row):
-                # Check horizontally
-                if j < len(row) - 1:
-                    right_node = row[j + 1]
-                    self._validate_adjacent_nodes(node, right_node)
-                # Check vertically
-                if i < len(grid) - 1:
-                    bottom_node = grid[i + 1][j]
-                    self._validate_adjacent_nodes(node, bottom_node)
+        if not isinstance(grid, TerrainGrid):
+            grid = TerrainGrid.from_nodes(grid)
+        codes = grid.as_array()
+        rules = self._rule_flags(grid)
+        # One plane per check, in the order a cell runs them: each rule
+        # rightwards, then each rule downwards
+        found = np.zeros((2 * len(rules), grid.n, grid.m), dtype=bool)
+        for index, (_, _, is_first, is_second) in enumerate(rules):
+            before, after = is_first[codes], is_second[codes]
+            found[index, :, :-1] = before[:, :-1] & after[:, 1:]
+            found[len(rules) + index, :-1] = before[:-1] & after[1:]
+        flat = found.reshape(len(found), -1)
+        cells = flat.any(axis=0)
+        if cells.any():
+            first, second, _, _ = rules[
+                int(np.argmax(flat[:, np.argmax(cells)])) % len(rules)
+            ]
+            raise ValueError(
+                f'{first.__name__} cannot be adjacent to {second.__name__}'
+            )
+        return grid
+
+    def _validate_cells(
+        self, grid: TerrainGrid, cells: Sequence[Tuple[int, int]]
+    ):
+        """
+        Validates the pairs of neighbors some cells belong to.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            cells (Sequence[Tuple[int, int]]): The (x, y) positions of the
+            cells.
+
+        Raises:
+            ValueError: If a cell is in a forbidden adjacent node
+            configuration.
+        """
+        positions = np.array(cells, dtype=np.int64).reshape(-1, 2)
+        # Each cell is the second cell of a pair with the one before it,
+        # rightwards or downwards, and the first cell of a pair with the
+        # one after it
+        firsts = np.concatenate([
+            positions - (0, 1),
+            positions - (1, 0),
+            positions,
+            positions,
+        ])
+        seconds = np.concatenate([
+            positions,
+            positions,
+            positions + (0, 1),
+            positions + (1, 0),
+        ])
+        shape = np.array((grid.n, grid.m))
+        inside = np.all((firsts >= 0) & (seconds < shape), axis=1)
+        codes = grid.as_array()
+        before = codes[firsts[inside, 0], firsts[inside, 1]]
+        after = codes[seconds[inside, 0], seconds[inside, 1]]
+        for first, second, is_first, is_second in self._rule_flags(grid):
+            if np.any(is_first[before] & is_second[after]):
+                raise ValueError(
+                    f'{first.__name__} cannot be adjacent to {second.__name__}'
+                )
+
+    @staticmethod
+    def _rule_flags(
+        grid: TerrainGrid,
+    ) -> List[Tuple[Type[Node], Type[Node], np.ndarray, np.ndarray]]:
+        """
+        Flags the palette codes concerned by each forbidden configuration.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+
+        Returns:
+            List[Tuple[Type[Node], Type[Node], np.ndarray, np.ndarray]]:
+            Each rule with, per palette code, whether its terrain is the
+            first or the second terrain of the rule.
+        """
+        return [
+            (
+                first,
+                second,
+                np.array(
+                    [issubclass(t, first) for t in grid.terrains], dtype=bool
+                ),
+                np.array(
+                    [issubclass(t, second) for t in grid.terrains], dtype=bool
+                ),
+            )
+            for first, second in FORBIDDEN_NEIGHBORS
+        ]
 
     @staticmethod
     def _validate_adjacent_nodes(node1: Node, node2: Node):
@@ -169,7 +565,8 @@ class Context:
         Raises:
             ValueError: If the nodes are in a forbidden configuration.
         """
-        if isinstance(node1, UpHill) and isinstance(node2, Valley):
-            raise ValueError('UpHill cannot be adjacent to Valley')
-        if isinstance(node1, DownHill) and isinstance(node2, Plateau):
-            raise ValueError('DownHill cannot be adjacent to Plateau')
+        for first, second in FORBIDDEN_NEIGHBORS:
+            if isinstance(node1, first) and isinstance(node2, second):
+                raise ValueError(
+                    f'{first.__name__} cannot be adjacent to {second.__name__}'
+                )
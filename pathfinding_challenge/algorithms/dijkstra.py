@@ -1,10 +1,24 @@
 import heapq
 import math
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+from pathfinding_challenge.algorithms.cancel import CancelToken
+from pathfinding_challenge.algorithms.grid_search import (
+    DistanceField,
+    SearchResult,
+    dijkstra_search,
+    dijkstra_search_many,
+    path_nodes,
+    step_table,
+    trace_nodes,
+)
+from pathfinding_challenge.algorithms.neighbors import NeighborTable
 from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.algorithms.path_stream import PathStream
+from pathfinding_challenge.algorithms.stats import SearchStats
 from pathfinding_challenge.entities.node import Node
 from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
 
 
 class DijkstraStrategy(PathfindingStrategy):
@@ -18,6 +32,8 @@ class DijkstraStrategy(PathfindingStrategy):
         Position(1, 0),
         Position(1, 1),
     ]
+    steps = step_table(cardinal_directions)
+    neighbor_table = NeighborTable.from_directions(cardinal_directions)
 
     @staticmethod
     def get_neighbors(grid: List[List[Node]], node: Node) -> List[Node]:
@@ -31,15 +47,13 @@ class DijkstraStrategy(PathfindingStrategy):
         Returns:
             List[Node]: A list of neighboring nodes.
         """
-        neighbors = []
-        for direction in DijkstraStrategy.cardinal_directions:
-            new_position = node.position + direction
-            if (0 <= new_position.x < len(grid)) and (
-                0 <= new_position.y < len(grid[0])
-            ):
-                neighbor_node = grid[new_position.x][new_position.y]
-                neighbors.append(neighbor_node)
-        return neighbors
+        rows, columns = len(grid), len(grid[0])
+        x, y = node.position.x, node.position.y
+        return [
+            grid[x + dx][y + dy]
+            for dx, dy, _ in DijkstraStrategy.steps
+            if 0 <= x + dx < rows and 0 <= y + dy < columns
+        ]
 
     @staticmethod
     def calculate_distance(node1: Node, node2: Node) -> float:
@@ -65,46 +79,231 @@ class DijkstraStrategy(PathfindingStrategy):
 
     @staticmethod
     def find_path(
-        grid: List[List[Node]], start: Node, end: Node
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
     ) -> List[Node]:
         """
         Find the shortest path from the start node to the end node using
         Dijkstra's algorithm.
 
         Args:
-            grid (List[List[Node]]): The grid containing all nodes.
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
             start (Node): The starting node.
             end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
 
         Returns:
             List[Node]: The list of nodes representing the shortest path.
                         If no path is found, returns an empty list.
         """
-        priority_queue: List[Tuple[float, Node]] = [(0, start)]
+        if isinstance(grid, TerrainGrid):
+            return DijkstraStrategy._find_path_on_grid(grid, start, end, stats)
+
+        columns = len(grid[0])
+        visited = bytearray(len(grid) * columns)
+        # The push counter breaks ties, so nodes are never compared
+        priority_queue: List[Tuple[float, int, Node]] = [(0, 0, start)]
         distances: Dict[Node, float] = {start: 0}
         previous_nodes: Dict[Node, Node] = {}
+        counters = SearchStats(pushes=1)
+
+        with counters.phase('search'):
+            while priority_queue:
+                current_distance, _, current_node = heapq.heappop(
+                    priority_queue
+                )
+                counters.pops += 1
+                if current_node == end:
+                    break
 
-        while priority_queue:
-            current_distance, current_node = heapq.heappop(priority_queue)
-
-            if current_node == end:
-                path = []
-                while current_node in previous_nodes:
-                    path.append(current_node)
-                    current_node = previous_nodes[current_node]
-                path.reverse()
-                return path
-
-            for neighbor in DijkstraStrategy.get_neighbors(grid, current_node):
-                distance = (
-                    current_distance
-                    + DijkstraStrategy.calculate_distance(
-                        current_node, neighbor
+                y = current_node.position.y
+                cell = current_node.position.x * columns + y
+                # Only a start node outside the grid has no cell, and it is
+                # popped once
+                if 0 <= y < columns and 0 <= cell < len(visited):
+                    if visited[cell]:
+                        # Stale entry left behind by a later, shorter
+                        # distance
+                        counters.stale_pops += 1
+                        continue
+                    visited[cell] = 1
+
+                for neighbor in DijkstraStrategy.get_neighbors(
+                    grid, current_node
+                ):
+                    if visited[
+                        neighbor.position.x * columns + neighbor.position.y
+                    ]:
+                        continue
+                    distance = (
+                        current_distance
+                        + DijkstraStrategy.calculate_distance(
+                            current_node, neighbor
+                        )
                     )
+                    if (
+                        neighbor not in distances
+                        or distance < distances[neighbor]
+                    ):
+                        distances[neighbor] = distance
+                        heapq.heappush(
+                            priority_queue,
+                            (distance, counters.pushes, neighbor),
+                        )
+                        previous_nodes[neighbor] = current_node
+                        counters.pushes += 1
+                counters.max_open_size = max(
+                    counters.max_open_size, counters.pushes - counters.pops
                 )
-                if neighbor not in distances or distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    priority_queue.append((distance, neighbor))
-                    previous_nodes[neighbor] = current_node
 
-        return []
+        # An exhausted queue leaves current_node on another node than the end
+        found = current_node == end
+        counters.expanded = counters.pops - counters.stale_pops - found
+        return trace_nodes(
+            previous_nodes,
+            end if found else None,
+            current_distance,
+            counters,
+            stats,
+        )
+
+    @staticmethod
+    def _find_path_on_grid(
+        grid: TerrainGrid,
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Node]:
+        """
+        Run the integer-indexed Dijkstra engine on a compact grid.
+
+        Nodes are only built for the returned path.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        result = dijkstra_search(
+            grid,
+            grid.index(start.position.x, start.position.y),
+            grid.index(end.position.x, end.position.y),
+            DijkstraStrategy.steps,
+        )
+        return path_nodes(grid, result, stats)
+
+    @staticmethod
+    def search(
+        grid: TerrainGrid,
+        source: int,
+        target: int,
+        cancel: Optional[CancelToken] = None,
+    ) -> SearchResult:
+        """
+        Run the engine of ``find_path`` between two cell indices.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            target (int): The destination cell index.
+            cancel (Optional[CancelToken]): Token the search polls to stop
+                early. Defaults to None.
+
+        Returns:
+            SearchResult: The cost, parent pointers and stats of the search.
+
+        Raises:
+            SearchCancelled: If the cancel token fired.
+        """
+        return dijkstra_search(
+            grid, source, target, DijkstraStrategy.steps, cancel=cancel
+        )
+
+    @staticmethod
+    def stream_path(
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> PathStream:
+        """
+        Find the same path as ``find_path``, as a stream of positions.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes. Grids of nodes are packed into a compact grid.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+
+        Returns:
+            PathStream: The path, read from the parents of the search.
+        """
+        if not isinstance(grid, TerrainGrid):
+            grid = TerrainGrid.from_nodes(grid)
+        result = dijkstra_search(
+            grid,
+            grid.index(start.position.x, start.position.y),
+            grid.index(end.position.x, end.position.y),
+            DijkstraStrategy.steps,
+        )
+        if stats is not None:
+            stats.merge(result.stats)
+        return PathStream(grid, result)
+
+    @staticmethod
+    def search_many(
+        grid: TerrainGrid, source: int, targets: Sequence[int]
+    ) -> List[SearchResult]:
+        """
+        Search from one source cell to several target cells at once.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            targets (Sequence[int]): The destination cell indices.
+
+        Returns:
+            List[SearchResult]: One result per target, in the same order.
+        """
+        return dijkstra_search_many(
+            grid, source, targets, DijkstraStrategy.steps
+        )
+
+    @staticmethod
+    def distance_field(
+        grid: Union[List[List[Node]], TerrainGrid], start: Node
+    ) -> DistanceField:
+        """
+        Compute the cost from the start node to every cell of the grid.
+
+        The whole grid is settled once, expanding each frontier with
+        ``neighbor_table`` in a few array operations; the path to any
+        target can then be rebuilt from the returned parent pointers.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+
+        Returns:
+            DistanceField: The dense cost and parent arrays.
+        """
+        if not isinstance(grid, TerrainGrid):
+            grid = TerrainGrid.from_nodes(grid)
+        return DijkstraStrategy.neighbor_table.distance_field(
+            grid, grid.index(start.position.x, start.position.y)
+        )
@@ -1,9 +1,10 @@
+import sys
+
 from pathfinding_challenge.algorithms.a_star import AStarStrategy
 from pathfinding_challenge.algorithms.context import Context
 from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
 from pathfinding_challenge.entities.valley import Valley
 from pathfinding_challenge.utils import (
-    compute_path_cost,
     create_grid,
     get_random_edge_position,
     print_grid,
@@ -37,24 +38,12 @@ class PFC:
         context.start = start
         context.end = end
 
-        context.strategy = AStarStrategy()
-        path = context.run()
-        path_cost1 = compute_path_cost(path)
-        print(
-            '\n=========  A* Solution  =========\n',
-            path,
-            '\n',
-            'Total cost: ',
-            path_cost1,
-        )
-
-        context.strategy = DijkstraStrategy()
-        path2 = context.run()
-        path_cost2 = compute_path_cost(path2)
-        print(
-            "\n=========  Djikstra's Solution  =========\n",
-            path2,
-            '\n',
-            'Total cost: ',
-            path_cost2,
-        )
+        for name, strategy in (
+            ('A*', AStarStrategy()),
+            ("Djikstra's", DijkstraStrategy()),
+        ):
+            context.strategy = strategy
+            path = context.stream()
+            print(f'\n=========  {name} Solution  =========')
+            path.write_ndjson(sys.stdout)
+            print('Total cost: ', path.cost)
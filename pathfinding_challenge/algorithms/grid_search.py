@@ -0,0 +1,897 @@
+import heapq
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.cancel import CHECK_INTERVAL, CancelToken
+from pathfinding_challenge.algorithms.heaps import IndexedHeap
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.path import Path
+from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+NO_PARENT = -1
+
+Direction = Tuple[int, int, float]
+
+
+def step_table(directions: Sequence[Position]) -> List[Direction]:
+    """
+    Turn a list of direction offsets into (dx, dy, step length) tuples.
+
+    Args:
+        directions (Sequence[Position]): The allowed moves.
+
+    Returns:
+        List[Direction]: One tuple per move with its Euclidean length.
+    """
+    return [
+        (direction.x, direction.y, math.hypot(direction.x, direction.y))
+        for direction in directions
+    ]
+
+
+@dataclass(slots=True)
+class SearchResult:
+    """
+    Outcome of a search run on the linear cell indices of a grid.
+
+    Attributes:
+        source (int): The index the search started from.
+        target (int): The index the search was looking for.
+        cost (float): The cost of the best path, ``math.inf`` if the target
+            was not reached.
+        parents (array): The parent index of each reached cell,
+            ``NO_PARENT`` for the source and unreached cells.
+        stats (SearchStats): Counters and timings of the search.
+    """
+
+    source: int
+    target: int
+    cost: float
+    parents: array
+    stats: SearchStats = field(default_factory=SearchStats)
+
+    @property
+    def found(self) -> bool:
+        """Whether the target was reached."""
+        return self.cost != math.inf
+
+    def indices(self) -> List[int]:
+        """
+        Rebuild the path by walking the parent pointers back.
+
+        Returns:
+            List[int]: The cell indices from the first step to the target,
+            the source excluded. Empty if the target was not reached.
+        """
+        if not self.found:
+            return []
+        parents = self.parents
+        path = []
+        current = self.target
+        while current != self.source:
+            path.append(current)
+            current = int(parents[current])
+        path.reverse()
+        return path
+
+
+def cell_nodes(
+    grid: Union[List[List[Node]], TerrainGrid], indices: Sequence[int]
+) -> List[Node]:
+    """
+    Look up the nodes at linear cell indices.
+
+    Node grids return their own nodes, compact grids build them.
+
+    Args:
+        grid (Union[List[List[Node]], TerrainGrid]): The grid.
+        indices (Sequence[int]): The linear indices of the cells.
+
+    Returns:
+        List[Node]: The node of each cell.
+    """
+    if isinstance(grid, TerrainGrid):
+        return grid.nodes(indices)
+    columns = len(grid[0])
+    return [grid[index // columns][index % columns] for index in indices]
+
+
+def path_nodes(
+    grid: Union[List[List[Node]], TerrainGrid],
+    result: SearchResult,
+    stats: Optional[SearchStats] = None,
+) -> Path:
+    """
+    Look up the nodes along the path of a search result.
+
+    Args:
+        grid (Union[List[List[Node]], TerrainGrid]): The searched grid.
+        result (SearchResult): The search result.
+        stats (Optional[SearchStats]): Collector the search stats are added
+            to, along with the lookup time as the ``'reconstruct'`` phase.
+
+    Returns:
+        Path: The nodes from the first step to the target, with the cost
+        of the result.
+    """
+    started = time.perf_counter()
+    path = Path(cell_nodes(grid, result.indices()), result.cost)
+    if stats is not None:
+        stats.add_timing('reconstruct', time.perf_counter() - started)
+        stats.merge(result.stats)
+    return path
+
+
+def trace_nodes(
+    came_from: Dict[Node, Node],
+    end: Optional[Node],
+    cost: float,
+    counters: SearchStats,
+    stats: Optional[SearchStats] = None,
+) -> Path:
+    """
+    Rebuild the path of a search over a grid of nodes.
+
+    Args:
+        came_from (Dict[Node, Node]): The predecessor of each reached node.
+        end (Optional[Node]): The end node, None if it was not reached.
+        cost (float): The cost of the path.
+        counters (SearchStats): The counters and timings of the search.
+        stats (Optional[SearchStats]): Collector the counters are added
+            to, along with the walk time as the ``'reconstruct'`` phase.
+
+    Returns:
+        Path: The nodes from the first step to the end node, with its
+        cost. Empty if the end node was not reached.
+    """
+    started = time.perf_counter()
+    path = Path.unreachable()
+    if end is not None:
+        path.cost = cost
+        while end in came_from:
+            path.append(end)
+            end = came_from[end]
+        path.reverse()
+    if stats is not None:
+        counters.add_timing('reconstruct', time.perf_counter() - started)
+        stats.merge(counters)
+    return path
+
+
+@dataclass(slots=True)
+class DistanceField:
+    """
+    Cost and parent of every cell reached from a single source.
+
+    Any path from the source can be rebuilt by walking the parent pointers
+    back from its target, without searching again.
+
+    Attributes:
+        source (int): The index the search started from.
+        costs (np.ndarray): (n, m) float64 cost to reach each cell,
+            ``inf`` for unreachable cells.
+        parents (np.ndarray): Flat int32 parent index of each cell,
+            ``NO_PARENT`` for the source and unreachable cells.
+    """
+
+    source: int
+    costs: np.ndarray
+    parents: np.ndarray
+
+    def result(self, target: int) -> SearchResult:
+        """
+        Return the search result for one target.
+
+        Args:
+            target (int): The destination cell index.
+
+        Returns:
+            SearchResult: The cost and parent pointers towards the target.
+        """
+        return SearchResult(
+            self.source,
+            target,
+            float(self.costs.reshape(-1)[target]),
+            self.parents,
+        )
+
+    def save(self, prefix: str):
+        """
+        Write the arrays as ``<prefix>.costs.npy`` and
+        ``<prefix>.parents.npy``, which ``load`` can memory-map, and the
+        source as ``<prefix>.field.npz``.
+
+        Args:
+            prefix (str): The path prefix of the files.
+        """
+        np.save(f'{prefix}.costs.npy', self.costs)
+        np.save(f'{prefix}.parents.npy', self.parents)
+        np.savez(
+            f'{prefix}.field.npz', source=np.array(self.source, np.int64)
+        )
+
+    @classmethod
+    def load(cls, prefix: str, mmap: bool = True) -> 'DistanceField':
+        """
+        Read a field written by ``save``.
+
+        Args:
+            prefix (str): The path prefix of the files.
+            mmap (bool): Memory-map the arrays read-only instead of loading
+                them in memory. Defaults to True.
+
+        Returns:
+            DistanceField: The loaded field.
+        """
+        mmap_mode = 'r' if mmap else None
+        costs = np.load(f'{prefix}.costs.npy', mmap_mode=mmap_mode)
+        parents = np.load(f'{prefix}.parents.npy', mmap_mode=mmap_mode)
+        with np.load(f'{prefix}.field.npz') as data:
+            return cls(int(data['source']), costs, parents)
+
+
+# The search loop keeps its state in locals, and cancel is keyword-only
+def astar_search(  # noqa: PLR0913, PLR0914
+    grid: TerrainGrid,
+    source: int,
+    target: int,
+    directions: Sequence[Direction],
+    heuristic: Union[Heuristic, Sequence[float], None] = None,
+    *,
+    cancel: Optional[CancelToken] = None,
+) -> SearchResult:
+    """
+    Run A* between two linear indices of a compact grid.
+
+    The open set holds plain ``(f, h, counter, index)`` tuples and the
+    scores live in preallocated flat arrays, so the loop never touches
+    ``Node`` objects. Equal f scores are broken towards the smaller
+    estimate, i.e. the larger g, which dives straight through plateaus of
+    equal f instead of widening them, then towards the first pushed, so
+    the path found is reproducible.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        target (int): The destination cell index.
+        directions (Sequence[Direction]): The allowed moves, as built by
+            ``step_table``.
+        heuristic (Union[Heuristic, Sequence[float], None]): The cost
+            estimate towards the target, either a ``Heuristic`` or a
+            consistent lower bound for every cell by linear index, such as
+            ``LandmarkTable.bounds`` returns. Defaults to None, which picks
+            the tightest admissible ``Heuristic`` for the grid and moves.
+        cancel (Optional[CancelToken]): Token checked every
+            ``CHECK_INTERVAL`` expansions. Defaults to None.
+
+    Returns:
+        SearchResult: The cost, parent pointers and stats of the search.
+
+    Raises:
+        SearchCancelled: If the cancel token fired.
+    """
+    started = time.perf_counter()
+    n, m = grid.n, grid.m
+    size = n * m
+    codes, weights = grid.codes, list(grid.weights)
+    if heuristic is None:
+        heuristic = Heuristic.for_grid(grid, directions)
+    estimate_at = _cell_estimate(heuristic, target, m)
+
+    g_score = array('d', [math.inf]) * size
+    parents = array('i', [NO_PARENT]) * size
+    closed = bytearray(size)
+
+    g_score[source] = 0.0
+    counter = expanded = stale_pops = max_open_size = 0
+    open_set = [(0.0, 0.0, 0, source)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    searching = time.perf_counter()
+
+    cost = math.inf
+    while open_set:
+        _, _, _, current = heappop(open_set)
+        if closed[current]:
+            stale_pops += 1
+            continue
+        if current == target:
+            cost = g_score[target]
+            break
+        closed[current] = 1
+        expanded += 1
+        if cancel is not None and not expanded % CHECK_INTERVAL:
+            cancel.check()
+
+        x, y = divmod(current, m)
+        current_g = g_score[current]
+        for dx, dy, step in directions:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= n or ny < 0 or ny >= m:
+                continue
+            neighbor = nx * m + ny
+            if closed[neighbor]:
+                continue
+            tentative_g = current_g + step + weights[codes[neighbor]]
+            if tentative_g < g_score[neighbor]:
+                g_score[neighbor] = tentative_g
+                parents[neighbor] = current
+                counter += 1
+                estimate = estimate_at(nx, ny)
+                heappush(
+                    open_set,
+                    (tentative_g + estimate, estimate, counter, neighbor),
+                )
+        # Every push but the popped ones is still queued
+        max_open_size = max(max_open_size, counter + 1 - expanded - stale_pops)
+
+    return SearchResult(
+        source,
+        target,
+        cost,
+        parents,
+        SearchStats(
+            expanded=expanded,
+            pushes=counter + 1,
+            pops=expanded + stale_pops + (cost != math.inf),
+            stale_pops=stale_pops,
+            max_open_size=max_open_size,
+            timings=_timings(started, searching),
+        ),
+    )
+
+
+def _cell_estimate(
+    heuristic: Union[Heuristic, Sequence[float]], target: int, m: int
+) -> Callable[[int, int], float]:
+    """Look up or compute the estimate at a row and column of the grid."""
+    if isinstance(heuristic, Heuristic):
+        return heuristic.estimator(*divmod(target, m))
+    bounds = heuristic
+    return lambda x, y: bounds[x * m + y]
+
+
+# cancel is keyword-only, on top of the query and the heap choice
+def dijkstra_search(  # noqa: PLR0913
+    grid: TerrainGrid,
+    source: int,
+    target: int,
+    directions: Sequence[Direction],
+    indexed_heap: bool = False,
+    *,
+    cancel: Optional[CancelToken] = None,
+) -> SearchResult:
+    """
+    Run Dijkstra between two linear indices of a compact grid.
+
+    Each cell is settled once: a visited bitmap discards stale heap
+    entries, and the search stops as soon as the target is settled.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        target (int): The destination cell index.
+        directions (Sequence[Direction]): The allowed moves, as built by
+            ``step_table``.
+        indexed_heap (bool): Use a decrease-key ``IndexedHeap`` instead of
+            a binary heap with lazy deletion. Defaults to False.
+        cancel (Optional[CancelToken]): Token checked every
+            ``CHECK_INTERVAL`` expansions. Defaults to None.
+
+    Returns:
+        SearchResult: The cost, parent pointers and stats of the search.
+
+    Raises:
+        SearchCancelled: If the cancel token fired.
+    """
+    if indexed_heap:
+        return _dijkstra_indexed(grid, source, target, directions, cancel)
+    return _dijkstra_binary(grid, source, target, directions, cancel)
+
+
+# The search loop keeps its state in locals
+def _dijkstra_binary(  # noqa: PLR0914
+    grid: TerrainGrid,
+    source: int,
+    target: int,
+    directions: Sequence[Direction],
+    cancel: Optional[CancelToken] = None,
+) -> SearchResult:
+    """Dijkstra variant of ``dijkstra_search`` using a binary heap."""
+    started = time.perf_counter()
+    n, m = grid.n, grid.m
+    size = n * m
+    codes, weights = grid.codes, list(grid.weights)
+
+    distances = array('d', [math.inf]) * size
+    parents = array('i', [NO_PARENT]) * size
+    visited = bytearray(size)
+
+    distances[source] = 0.0
+    priority_queue: List[Tuple[float, int]] = [(0.0, source)]
+    expanded = stale_pops = max_open_size = 0
+    pushes = 1
+    heappush, heappop = heapq.heappush, heapq.heappop
+    searching = time.perf_counter()
+
+    cost = math.inf
+    while priority_queue:
+        current_distance, current = heappop(priority_queue)
+        if visited[current]:
+            stale_pops += 1
+            continue
+        if current == target:
+            cost = current_distance
+            break
+        visited[current] = 1
+        expanded += 1
+        if cancel is not None and not expanded % CHECK_INTERVAL:
+            cancel.check()
+
+        x, y = divmod(current, m)
+        for dx, dy, step in directions:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= n or ny < 0 or ny >= m:
+                continue
+            neighbor = nx * m + ny
+            if visited[neighbor]:
+                continue
+            distance = current_distance + step + weights[codes[neighbor]]
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                heappush(priority_queue, (distance, neighbor))
+                pushes += 1
+        max_open_size = max(max_open_size, pushes - expanded - stale_pops)
+
+    return SearchResult(
+        source,
+        target,
+        cost,
+        parents,
+        SearchStats(
+            expanded=expanded,
+            pushes=pushes,
+            pops=expanded + stale_pops + (cost != math.inf),
+            stale_pops=stale_pops,
+            max_open_size=max_open_size,
+            timings=_timings(started, searching),
+        ),
+    )
+
+
+# The search loop keeps its state in locals
+def _dijkstra_indexed(  # noqa: PLR0914
+    grid: TerrainGrid,
+    source: int,
+    target: int,
+    directions: Sequence[Direction],
+    cancel: Optional[CancelToken] = None,
+) -> SearchResult:
+    """Dijkstra variant of ``dijkstra_search`` using an ``IndexedHeap``."""
+    started = time.perf_counter()
+    n, m = grid.n, grid.m
+    size = n * m
+    codes, weights = grid.codes, list(grid.weights)
+
+    distances = array('d', [math.inf]) * size
+    parents = array('i', [NO_PARENT]) * size
+    visited = bytearray(size)
+
+    distances[source] = 0.0
+    queue = IndexedHeap(size)
+    queue.push(source, 0.0)
+    expanded = updates = max_open_size = 0
+    pushes = 1
+    searching = time.perf_counter()
+
+    cost = math.inf
+    while queue:
+        current_distance, current = queue.pop()
+        if current == target:
+            cost = current_distance
+            break
+        visited[current] = 1
+        expanded += 1
+        if cancel is not None and not expanded % CHECK_INTERVAL:
+            cancel.check()
+
+        x, y = divmod(current, m)
+        for dx, dy, step in directions:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= n or ny < 0 or ny >= m:
+                continue
+            neighbor = nx * m + ny
+            if visited[neighbor]:
+                continue
+            distance = current_distance + step + weights[codes[neighbor]]
+            previous = distances[neighbor]
+            if distance < previous:
+                if previous != math.inf:
+                    updates += 1
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                queue.push(neighbor, distance)
+                pushes += 1
+        # Decrease-key updates move an entry instead of adding one
+        max_open_size = max(max_open_size, pushes - updates - expanded)
+
+    return SearchResult(
+        source,
+        target,
+        cost,
+        parents,
+        SearchStats(
+            expanded=expanded,
+            pushes=pushes,
+            pops=expanded + (cost != math.inf),
+            stale_pops=0,
+            max_open_size=max_open_size,
+            timings=_timings(started, searching),
+        ),
+    )
+
+
+def _timings(started: float, searching: float) -> Dict[str, float]:
+    """Split the elapsed time of an engine into setup and search phases."""
+    return {
+        'setup': searching - started,
+        'search': time.perf_counter() - searching,
+    }
+
+
+@dataclass(slots=True)
+class _Frontier:
+    """
+    One side of a bidirectional search.
+
+    The backward side walks the moves in reverse, and an edge always costs
+    the weight of the cell it enters: stepping back from a cell charges the
+    weight of that cell rather than of its predecessor.
+    """
+
+    grid: TerrainGrid
+    moves: List[Direction]
+    forward: bool
+    potential: Optional[Callable[[int], float]]
+    distances: array
+    links: array
+    closed: bytearray
+    queue: List[Tuple[float, int]]
+    expanded: int = 0
+    pushes: int = 1
+    stale_pops: int = 0
+
+    @classmethod
+    def start(
+        cls,
+        grid: TerrainGrid,
+        cell: int,
+        moves: List[Direction],
+        potential: Optional[Callable[[int], float]],
+        forward: bool,
+    ) -> '_Frontier':
+        """Open a side of the search at a cell."""
+        size = grid.n * grid.m
+        distances = array('d', [math.inf]) * size
+        distances[cell] = 0.0
+        key = 0.0
+        if potential is not None:
+            key = potential(cell) if forward else -potential(cell)
+        return cls(
+            grid,
+            moves,
+            forward,
+            potential,
+            distances,
+            array('i', [NO_PARENT]) * size,
+            bytearray(size),
+            [(key, cell)],
+        )
+
+    def top(self) -> float:
+        """Return the smallest key in the queue."""
+        return self.queue[0][0]
+
+    def pop(self) -> int:
+        """
+        Pop and close the next cell, skipping entries already closed.
+
+        Returns:
+            int: The closed cell, or ``NO_PARENT`` for a stale entry.
+        """
+        _, current = heapq.heappop(self.queue)
+        if self.closed[current]:
+            self.stale_pops += 1
+            return NO_PARENT
+        self.closed[current] = 1
+        self.expanded += 1
+        return current
+
+    # The relax loop keeps the grid and the frontier in locals
+    def relax(  # noqa: PLR0914
+        self, current: int, other: array
+    ) -> Tuple[float, int]:
+        """
+        Relax the edges around a closed cell.
+
+        Args:
+            current (int): The cell just closed.
+            other (array): The distances of the opposite side.
+
+        Returns:
+            Tuple[float, int]: The cheapest path found through a relaxed
+            neighbor, and that neighbor.
+        """
+        grid, potential, forward = self.grid, self.potential, self.forward
+        n, m, codes, weights = grid.n, grid.m, grid.codes, grid.weights
+        distances, links, closed = self.distances, self.links, self.closed
+        queue, heappush = self.queue, heapq.heappush
+        current_distance = distances[current]
+        entered = weights[codes[current]]
+        best, meeting = math.inf, NO_PARENT
+
+        x, y = divmod(current, m)
+        for dx, dy, step in self.moves:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= n or ny < 0 or ny >= m:
+                continue
+            neighbor = nx * m + ny
+            if closed[neighbor]:
+                continue
+            distance = current_distance + step
+            distance += weights[codes[neighbor]] if forward else entered
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                links[neighbor] = current
+                key = distance
+                if potential is not None:
+                    offset = potential(neighbor)
+                    key += offset if forward else -offset
+                heappush(queue, (key, neighbor))
+                self.pushes += 1
+                total = distance + other[neighbor]
+                if total < best:
+                    best, meeting = total, neighbor
+        return best, meeting
+
+
+def bidirectional_search(
+    grid: TerrainGrid,
+    source: int,
+    target: int,
+    directions: Sequence[Direction],
+    heuristic: Optional[Heuristic] = None,
+) -> SearchResult:
+    """
+    Search from both ends of a query at once until the frontiers meet.
+
+    The forward side runs from the source and the backward side from the
+    target over reversed moves, always expanding the side with the smaller
+    key. Every time a cell gets a better label from one side while the
+    other side already reached it, the path through it becomes a
+    candidate. The search stops once the keys on top of both queues add up
+    to the best candidate.
+
+    With a heuristic, both sides use the average of the forward and
+    backward estimates as potential, which keeps the stopping rule exact.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        target (int): The destination cell index.
+        directions (Sequence[Direction]): The allowed moves, as built by
+            ``step_table``.
+        heuristic (Optional[Heuristic]): The cost estimate used to guide
+            both sides. Defaults to None, which runs a bidirectional
+            Dijkstra.
+
+    Returns:
+        SearchResult: The cost, parent pointers and stats of the search.
+    """
+    started = time.perf_counter()
+    potential = None
+    if heuristic is not None:
+        potential = _average_potential(heuristic, source, target, grid.m)
+    forward = _Frontier.start(
+        grid, source, list(directions), potential, forward=True
+    )
+    backward = _Frontier.start(
+        grid,
+        target,
+        [(-dx, -dy, step) for dx, dy, step in directions],
+        potential,
+        forward=False,
+    )
+    best, meeting = (0.0, source) if source == target else (math.inf, source)
+    max_open_size = 0
+    searching = time.perf_counter()
+
+    while forward.queue and backward.queue:
+        if forward.top() + backward.top() >= best:
+            break
+        side, other = forward, backward
+        if backward.top() < forward.top():
+            side, other = backward, forward
+        current = side.pop()
+        if current == NO_PARENT:
+            continue
+        total, cell = side.relax(current, other.distances)
+        if total < best:
+            best, meeting = total, cell
+        max_open_size = max(
+            max_open_size, len(forward.queue) + len(backward.queue)
+        )
+
+    if best != math.inf:
+        # Hang the backward half of the path onto the forward parents
+        cell = meeting
+        while cell != target:
+            forward.links[backward.links[cell]] = cell
+            cell = backward.links[cell]
+
+    expanded = forward.expanded + backward.expanded
+    stale_pops = forward.stale_pops + backward.stale_pops
+    return SearchResult(
+        source,
+        target,
+        best,
+        forward.links,
+        SearchStats(
+            expanded=expanded,
+            pushes=forward.pushes + backward.pushes,
+            pops=expanded + stale_pops,
+            stale_pops=stale_pops,
+            max_open_size=max_open_size,
+            timings=_timings(started, searching),
+        ),
+    )
+
+
+def _average_potential(
+    heuristic: Heuristic, source: int, target: int, m: int
+) -> Callable[[int], float]:
+    """
+    Build the potential shared by both sides of a bidirectional A*.
+
+    Half the estimate towards the target minus half the estimate from the
+    source is consistent for the forward side, and its opposite for the
+    backward side, so the two sides agree on the reduced path costs.
+    """
+    source_x, source_y = divmod(source, m)
+    target_x, target_y = divmod(target, m)
+    estimate = heuristic.estimate
+
+    def potential(cell: int) -> float:
+        x, y = divmod(cell, m)
+        return 0.5 * (
+            estimate(x - target_x, y - target_y)
+            - estimate(x - source_x, y - source_y)
+        )
+
+    return potential
+
+
+def dijkstra_search_many(
+    grid: TerrainGrid,
+    source: int,
+    targets: Sequence[int],
+    directions: Sequence[Direction],
+) -> List[SearchResult]:
+    """
+    Run one Dijkstra from a source until every target is settled.
+
+    All the results share the same parent array, so answering many
+    queries from the same source costs a single search.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        targets (Sequence[int]): The destination cell indices.
+        directions (Sequence[Direction]): The allowed moves, as built by
+            ``step_table``.
+
+    Returns:
+        List[SearchResult]: One result per target, in the same order.
+    """
+    distances, parents = _dijkstra_settle(grid, source, targets, directions)
+    return [
+        SearchResult(source, target, distances[target], parents)
+        for target in targets
+    ]
+
+
+def dijkstra_distance_field(
+    grid: TerrainGrid, source: int, directions: Sequence[Direction]
+) -> 'DistanceField':
+    """
+    Run Dijkstra from a source until every reachable cell is settled.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        directions (Sequence[Direction]): The allowed moves, as built by
+            ``step_table``.
+
+    Returns:
+        DistanceField: The cost and parent of every cell.
+    """
+    distances, parents = _dijkstra_settle(grid, source, None, directions)
+    return DistanceField(
+        source,
+        np.frombuffer(distances, dtype=np.float64).reshape(grid.n, grid.m),
+        np.frombuffer(parents, dtype=np.intc),
+    )
+
+
+# The search loop keeps its state in locals
+def _dijkstra_settle(  # noqa: PLR0914
+    grid: TerrainGrid,
+    source: int,
+    targets: Optional[Sequence[int]],
+    directions: Sequence[Direction],
+) -> Tuple[array, array]:
+    """
+    Settle cells in cost order until the targets, or the grid, are done.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        targets (Optional[Sequence[int]]): The cells to settle, or None to
+            run to exhaustion.
+        directions (Sequence[Direction]): The allowed moves.
+
+    Returns:
+        Tuple[array, array]: The distance and parent of each cell. Cells
+        left unsettled keep a tentative distance, or ``math.inf``.
+    """
+    n, m = grid.n, grid.m
+    size = n * m
+    codes, weights = grid.codes, list(grid.weights)
+
+    distances = array('d', [math.inf]) * size
+    parents = array('i', [NO_PARENT]) * size
+    visited = bytearray(size)
+    pending = None if targets is None else set(targets)
+
+    distances[source] = 0.0
+    priority_queue: List[Tuple[float, int]] = [(0.0, source)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    while priority_queue:
+        current_distance, current = heappop(priority_queue)
+        if visited[current]:
+            continue
+        visited[current] = 1
+        if pending is not None:
+            pending.discard(current)
+            if not pending:
+                break
+
+        x, y = divmod(current, m)
+        for dx, dy, step in directions:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= n or ny < 0 or ny >= m:
+                continue
+            neighbor = nx * m + ny
+            if visited[neighbor]:
+                continue
+            distance = current_distance + step + weights[codes[neighbor]]
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                heappush(priority_queue, (distance, neighbor))
+
+    return distances, parents
@@ -0,0 +1,149 @@
+from array import array
+from typing import List, Tuple
+
+NOT_IN_HEAP = -1
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of integer items supporting decrease-key.
+
+    Every item in ``[0, capacity)`` has at most one entry, and its slot in
+    the heap is tracked in a flat position array, so a better priority
+    updates the existing entry in place instead of pushing a duplicate.
+    Ties on priority are broken by the item index.
+    """
+
+    __slots__ = ('_items', '_positions', '_priorities')
+
+    def __init__(self, capacity: int):
+        self._priorities: List[float] = []
+        self._items: List[int] = []
+        self._positions = array('i', [NOT_IN_HEAP]) * capacity
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: int) -> bool:
+        return self._positions[item] != NOT_IN_HEAP
+
+    def push(self, item: int, priority: float):
+        """
+        Insert an item, or move it if it is already queued.
+
+        Args:
+            item (int): The item to queue.
+            priority (float): The priority of the item.
+        """
+        slot = self._positions[item]
+        if slot == NOT_IN_HEAP:
+            self._priorities.append(priority)
+            self._items.append(item)
+            slot = len(self._items) - 1
+            self._positions[item] = slot
+            self._sift_up(slot)
+        elif priority < self._priorities[slot]:
+            self._priorities[slot] = priority
+            self._sift_up(slot)
+        else:
+            self._priorities[slot] = priority
+            self._sift_down(slot)
+
+    def decrease_key(self, item: int, priority: float):
+        """
+        Lower the priority of a queued item.
+
+        Args:
+            item (int): The queued item.
+            priority (float): The new priority.
+
+        Raises:
+            KeyError: If the item is not queued.
+            ValueError: If the new priority is greater than the current one.
+        """
+        slot = self._positions[item]
+        if slot == NOT_IN_HEAP:
+            raise KeyError(f'Item {item} is not in the heap')
+        if priority > self._priorities[slot]:
+            raise ValueError('decrease_key cannot increase a priority')
+        self._priorities[slot] = priority
+        self._sift_up(slot)
+
+    def pop(self) -> Tuple[float, int]:
+        """
+        Remove and return the entry with the lowest priority.
+
+        Returns:
+            Tuple[float, int]: The priority and the item.
+
+        Raises:
+            IndexError: If the heap is empty.
+        """
+        priorities, items = self._priorities, self._items
+        if not items:
+            raise IndexError('pop from an empty heap')
+        priority, item = priorities[0], items[0]
+        last_priority, last_item = priorities.pop(), items.pop()
+        self._positions[item] = NOT_IN_HEAP
+        if items:
+            priorities[0] = last_priority
+            items[0] = last_item
+            self._positions[last_item] = 0
+            self._sift_down(0)
+        return priority, item
+
+    def _sift_up(self, slot: int):
+        priorities, items, positions = (
+            self._priorities,
+            self._items,
+            self._positions,
+        )
+        priority, item = priorities[slot], items[slot]
+        while slot > 0:
+            parent = (slot - 1) >> 1
+            parent_priority = priorities[parent]
+            if parent_priority < priority or (
+                parent_priority == priority and items[parent] < item
+            ):
+                break
+            priorities[slot] = parent_priority
+            items[slot] = items[parent]
+            positions[items[slot]] = slot
+            slot = parent
+        priorities[slot] = priority
+        items[slot] = item
+        positions[item] = slot
+
+    def _sift_down(self, slot: int):
+        priorities, items, positions = (
+            self._priorities,
+            self._items,
+            self._positions,
+        )
+        size = len(items)
+        priority, item = priorities[slot], items[slot]
+        while True:
+            child = 2 * slot + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and (
+                priorities[right] < priorities[child]
+                or (
+                    priorities[right] == priorities[child]
+                    and items[right] < items[child]
+                )
+            ):
+                child = right
+            child_priority = priorities[child]
+            if priority < child_priority or (
+                priority == child_priority and item < items[child]
+            ):
+                break
+            priorities[slot] = child_priority
+            items[slot] = items[child]
+            positions[items[slot]] = slot
+            slot = child
+        priorities[slot] = priority
+        items[slot] = item
+        positions[item] = slot
@@ -0,0 +1,248 @@
+import math
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+MANHATTAN = 'manhattan'
+OCTILE = 'octile'
+EUCLIDEAN = 'euclidean'
+HEURISTICS = (MANHATTAN, OCTILE, EUCLIDEAN)
+
+
+@dataclass(frozen=True, slots=True)
+class Heuristic:
+    """
+    Lower bound of the path cost between two cells.
+
+    A path costs the length of its moves plus the weight of every cell it
+    enters, so the estimate is a bound on the remaining length plus the
+    minimum terrain weight times a bound on the remaining number of moves.
+    With ``high`` and ``low`` the larger and smaller of ``|dx|`` and
+    ``|dy|``, it reads::
+
+        high_factor * high + low_factor * low + euclidean_factor * hypot
+
+    Every move changes each term by at most its own cost, so the estimate
+    is consistent as well as admissible, as long as terrain weights are
+    not negative.
+
+    Attributes:
+        kind (str): The distance the estimate is built on, one of
+            ``HEURISTICS``.
+        high_factor (float): Factor of the larger offset.
+        low_factor (float): Factor of the smaller offset.
+        euclidean_factor (float): Factor of the straight-line distance.
+    """
+
+    kind: str
+    high_factor: float
+    low_factor: float
+    euclidean_factor: float = 0.0
+
+    @classmethod
+    def build(
+        cls, kind: str, min_weight: float, diagonal: bool
+    ) -> 'Heuristic':
+        """
+        Build an admissible heuristic for a kind of distance and moves.
+
+        Manhattan distance is exact on 4-connected moves but overestimates
+        diagonal ones, so with diagonal moves it is scaled down by
+        ``sqrt(2) / 2``. Octile and Euclidean distances never overestimate.
+
+        Args:
+            kind (str): The distance, one of ``HEURISTICS``.
+            min_weight (float): The smallest terrain weight a path can
+                enter. Negative weights are treated as 0.
+            diagonal (bool): Whether diagonal moves are allowed.
+
+        Returns:
+            Heuristic: The heuristic.
+
+        Raises:
+            ValueError: If the kind of distance is unknown.
+        """
+        if kind not in HEURISTICS:
+            raise ValueError(
+                f'Unknown heuristic {kind!r}, expected one of {HEURISTICS}'
+            )
+        weight = max(min_weight, 0.0)
+        # A move shortens the Chebyshev distance by at most 1, and the
+        # Manhattan distance too when moves are axis aligned
+        high, low = weight, (0.0 if diagonal else weight)
+        if kind == MANHATTAN:
+            scale = math.sqrt(2) / 2 if diagonal else 1.0
+            return cls(kind, high + scale, low + scale)
+        if kind == OCTILE:
+            return cls(kind, high + 1.0, low + math.sqrt(2) - 1.0)
+        return cls(kind, high, low, 1.0)
+
+    @classmethod
+    def for_grid(
+        cls,
+        grid: Union[List[List[Node]], TerrainGrid],
+        directions: Sequence[Tuple[int, int, float]],
+        kind: Optional[str] = None,
+    ) -> 'Heuristic':
+        """
+        Build the heuristic matching a grid and a set of moves.
+
+        Without an explicit kind, the distance the moves actually measure
+        is picked: Manhattan for 4-connected moves, octile with diagonals.
+        It dominates the other admissible estimates, so A* expands the
+        fewest cells with it. The weight term uses the lightest terrain
+        found in the grid, which compact grids cache but grids of nodes
+        scan for on every call: build it once for repeated queries.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid to search.
+            directions (Sequence[Tuple[int, int, float]]): The allowed
+                moves, as built by ``step_table``.
+            kind (Optional[str]): Force a distance, one of ``HEURISTICS``.
+                Defaults to None, which picks it from the moves.
+
+        Returns:
+            Heuristic: The heuristic.
+
+        Raises:
+            ValueError: If a move reaches beyond the 8 neighbors of a cell,
+            or the kind of distance is unknown.
+        """
+        return cls.for_moves(directions, _min_weight(grid), kind)
+
+    @classmethod
+    def for_moves(
+        cls,
+        directions: Sequence[Tuple[int, int, float]],
+        min_weight: float = 0.0,
+        kind: Optional[str] = None,
+    ) -> 'Heuristic':
+        """
+        Build the heuristic matching a set of moves, without a grid.
+
+        Args:
+            directions (Sequence[Tuple[int, int, float]]): The allowed
+                moves, as built by ``step_table``.
+            min_weight (float): The smallest terrain weight a path can
+                enter. Defaults to 0, which only bounds the move lengths.
+            kind (Optional[str]): Force a distance, one of ``HEURISTICS``.
+                Defaults to None, which picks it from the moves.
+
+        Returns:
+            Heuristic: The heuristic.
+
+        Raises:
+            ValueError: If a move reaches beyond the 8 neighbors of a cell,
+            or the kind of distance is unknown.
+        """
+        if any(abs(dx) > 1 or abs(dy) > 1 for dx, dy, _ in directions):
+            raise ValueError('Heuristics only support moves to the neighbors')
+        diagonal = any(dx and dy for dx, dy, _ in directions)
+        if kind is None:
+            kind = OCTILE if diagonal else MANHATTAN
+        return cls.build(kind, min_weight, diagonal)
+
+    def estimate(self, dx: int, dy: int) -> float:
+        """
+        Estimate the cost of covering an offset.
+
+        Args:
+            dx (int): The row offset.
+            dy (int): The column offset.
+
+        Returns:
+            float: A lower bound of the path cost.
+        """
+        dx, dy = abs(dx), abs(dy)
+        if dx < dy:
+            dx, dy = dy, dx
+        value = self.high_factor * dx + self.low_factor * dy
+        if self.euclidean_factor:
+            value += self.euclidean_factor * math.hypot(dx, dy)
+        return value
+
+    def estimator(
+        self, target_x: int, target_y: int
+    ) -> Callable[[int, int], float]:
+        """
+        Bind the estimate to a target cell, for search loops.
+
+        Args:
+            target_x (int): The row of the target cell.
+            target_y (int): The column of the target cell.
+
+        Returns:
+            Callable[[int, int], float]: The estimate from the cell at a
+            row and column to the target.
+        """
+        high, low = self.high_factor, self.low_factor
+        euclidean = self.euclidean_factor
+
+        def estimate(x: int, y: int) -> float:
+            dx = abs(x - target_x)
+            dy = abs(y - target_y)
+            if dx < dy:
+                dx, dy = dy, dx
+            value = high * dx + low * dy
+            if euclidean:
+                value += euclidean * math.hypot(dx, dy)
+            return value
+
+        return estimate
+
+    def towards(self, n: int, m: int, target: int) -> np.ndarray:
+        """
+        Estimate the cost from every cell of an n x m grid to a target.
+
+        Args:
+            n (int): Number of rows in the grid.
+            m (int): Number of columns in the grid.
+            target (int): The linear index of the target cell.
+
+        Returns:
+            np.ndarray: The flat float64 estimate of each cell.
+        """
+        target_x, target_y = divmod(target, m)
+        dx = np.abs(np.arange(n, dtype=np.float64) - target_x)[:, None]
+        dy = np.abs(np.arange(m, dtype=np.float64) - target_y)[None, :]
+        high, low = np.maximum(dx, dy), np.minimum(dx, dy)
+        values = self.high_factor * high + self.low_factor * low
+        if self.euclidean_factor:
+            values += self.euclidean_factor * np.hypot(dx, dy)
+        return values.reshape(-1)
+
+    def between(self, node1: Node, node2: Node) -> float:
+        """
+        Estimate the cost of the path from node1 to node2.
+
+        Args:
+            node1 (Node): The starting node.
+            node2 (Node): The target node.
+
+        Returns:
+            float: A lower bound of the path cost.
+        """
+        return self.estimate(
+            node1.position.x - node2.position.x,
+            node1.position.y - node2.position.y,
+        )
+
+
+def _min_weight(grid: Union[List[List[Node]], TerrainGrid]) -> float:
+    """Return the smallest weight among the cells of a grid."""
+    if isinstance(grid, TerrainGrid):
+        return grid.min_weight()
+    weights: Iterable[float] = (node.weight for row in grid for node in row)
+    return min(weights, default=0.0)
@@ -0,0 +1,839 @@
+import heapq
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    cell_nodes,
+    dijkstra_distance_field,
+    dijkstra_search,
+)
+from pathfinding_challenge.algorithms.heuristics import MANHATTAN, Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.path import Path
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+DEFAULT_CLUSTER_SIZE = 32
+DEFAULT_ENTRANCE_SPACING = 8
+BATCH_CELLS = 1 << 22
+TOLERANCE = 1e-9
+
+SOURCE = -1
+TARGET = -2
+
+
+def _spread(length: int, spacing: int) -> np.ndarray:
+    """Spread entrance offsets along a border, both ends included."""
+    count = math.ceil((length - 1) / spacing) + 1
+    offsets = np.round(np.linspace(0, length - 1, count))
+    return np.unique(offsets.astype(np.int64))
+
+
+def _entrance_pairs(n: int, m: int, size: int, spacing: int) -> np.ndarray:
+    """
+    Pick the cells facing each other across every cluster border.
+
+    Returns:
+        np.ndarray: A (k, 2) array of linear cell indices, one row per
+        entrance.
+    """
+    pairs = [np.empty((0, 2), dtype=np.int64)]
+    for x0 in range(0, n, size):
+        xs = x0 + _spread(min(size, n - x0), spacing)
+        pairs.extend(
+            np.stack([xs * m + y - 1, xs * m + y], axis=1)
+            for y in range(size, m, size)
+        )
+    for y0 in range(0, m, size):
+        ys = y0 + _spread(min(size, m - y0), spacing)
+        pairs.extend(
+            np.stack([(x - 1) * m + ys, x * m + ys], axis=1)
+            for x in range(size, n, size)
+        )
+    return np.concatenate(pairs)
+
+
+def _cluster_blocks(
+    n: int, m: int, size: int
+) -> Iterator[Tuple[int, int, int, int, int, int]]:
+    """
+    Split the clusters into blocks of clusters sharing the same shape.
+
+    Yields:
+        Tuple[int, int, int, int, int, int]: The first cluster row and
+        column, the number of cluster rows and columns, and the height and
+        width of the clusters in the block.
+    """
+    full_rows, rest_rows = divmod(n, size)
+    full_columns, rest_columns = divmod(m, size)
+    row_parts = [(0, full_rows, size), (full_rows, 1, rest_rows)]
+    column_parts = [(0, full_columns, size), (full_columns, 1, rest_columns)]
+    for row, rows, height in row_parts:
+        for column, columns, width in column_parts:
+            if rows and columns and height and width:
+                yield row, column, rows, columns, height, width
+
+
+def _cluster_distances(
+    distances: np.ndarray, costs: np.ndarray, owners: np.ndarray
+) -> np.ndarray:
+    """
+    Relax distances inside a batch of clusters until they settle.
+
+    Each round sweeps every row and column both ways. Reaching cell ``j``
+    of a run from cell ``k`` costs the entry costs summed over ``(k, j]``,
+    so with ``S`` the running sum of the entry costs the best distance is
+    ``S[j] + min(D[k] - S[k] for k <= j)``: a running minimum. Rounds go on
+    for the slices that still improved, so paths winding around expensive
+    terrain only keep their own slices busy.
+
+    Args:
+        distances (np.ndarray): (k, h, w) initial distances, 0 at the
+            source of each slice and ``inf`` elsewhere. Updated in place.
+        costs (np.ndarray): (clusters, h, w) cost of entering each cell.
+        owners (np.ndarray): The cluster of each slice.
+
+    Returns:
+        np.ndarray: The shortest distances from each source, restricted to
+        the cluster.
+    """
+    sweeps = [
+        (
+            axis,
+            reverse,
+            np.cumsum(np.flip(costs, axis) if reverse else costs, axis),
+        )
+        for axis in (-1, -2)
+        for reverse in (False, True)
+    ]
+    active = np.arange(len(distances))
+    while active.size:
+        current = distances[active]
+        previous = current.copy()
+        for axis, reverse, cluster_totals in sweeps:
+            view = np.flip(current, axis) if reverse else current
+            totals = cluster_totals[owners[active]]
+            relaxed = np.minimum.accumulate(view - totals, axis=axis)
+            relaxed += totals
+            np.minimum(view, relaxed, out=view)
+        distances[active] = current
+        improved = current < previous - TOLERANCE
+        active = active[improved.reshape(len(active), -1).any(axis=1)]
+    return distances
+
+
+@dataclass(slots=True)
+class AbstractRoute:
+    """
+    Path found on the abstract graph, before refinement.
+
+    Attributes:
+        waypoints (List[int]): Linear indices of the source, the entrances
+            crossed and the target.
+        cost (float): The cost of the route, ``math.inf`` if the target
+            was not reached.
+        stats (SearchStats): Counters and timings of the abstract search.
+    """
+
+    waypoints: List[int]
+    cost: float
+    stats: SearchStats = field(default_factory=SearchStats)
+
+
+@dataclass(slots=True)
+class HierarchicalGraph:
+    """
+    Cluster abstraction of a grid for hierarchical pathfinding.
+
+    The grid is split into square clusters. Entrances are pairs of cells
+    facing each other across a cluster border; their cells are the nodes
+    of the abstract graph. Edges join the two cells of an entrance, and
+    every pair of nodes of a cluster with the cost of the best path
+    staying inside the cluster. Moves and costs are those of
+    ``AStarStrategy``.
+
+    Attributes:
+        n (int): Number of rows in the grid.
+        m (int): Number of columns in the grid.
+        cluster_size (int): Side of the clusters.
+        entrance_spacing (int): Largest gap between two entrances along a
+            border.
+        checksum (int): ``TerrainGrid.checksum`` of the grid.
+        min_weight (float): The smallest weight in the grid.
+        cells (np.ndarray): Linear cell index of each node, grouped by
+            cluster.
+        cluster_offsets (np.ndarray): Start of the nodes of each cluster in
+            ``cells``.
+        offsets (np.ndarray): Start of the edges of each node.
+        neighbors (np.ndarray): The node each edge leads to.
+        costs (np.ndarray): The cost of each edge.
+    """
+
+    n: int
+    m: int
+    cluster_size: int
+    entrance_spacing: int
+    checksum: int
+    min_weight: float
+    cells: np.ndarray
+    cluster_offsets: np.ndarray
+    offsets: np.ndarray
+    neighbors: np.ndarray
+    costs: np.ndarray
+
+    @classmethod
+    def build(
+        cls,
+        grid: TerrainGrid,
+        cluster_size: int = DEFAULT_CLUSTER_SIZE,
+        entrance_spacing: int = DEFAULT_ENTRANCE_SPACING,
+    ) -> 'HierarchicalGraph':
+        """
+        Precompute the abstraction of a grid.
+
+        Intra-cluster costs are computed for a whole batch of same-shaped
+        clusters at once, by sweeping running minimums over the rows and
+        columns until the distances settle.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            cluster_size (int): Side of the clusters.
+            entrance_spacing (int): Largest gap between two entrances along
+                a border.
+
+        Returns:
+            HierarchicalGraph: The abstraction.
+
+        Raises:
+            ValueError: If the cluster size or the entrance spacing is
+            smaller than 1.
+        """
+        if cluster_size < 1 or entrance_spacing < 1:
+            raise ValueError(
+                'Cluster size and entrance spacing must be at least 1'
+            )
+        n, m = grid.n, grid.m
+        cluster_columns = -(-m // cluster_size)
+        cluster_count = -(-n // cluster_size) * cluster_columns
+        weights = grid.weight_array()[grid.as_array()].astype(np.float64)
+
+        pairs = _entrance_pairs(n, m, cluster_size, entrance_spacing)
+        unique_cells = np.unique(pairs)
+        clusters = (unique_cells // m // cluster_size) * cluster_columns + (
+            unique_cells % m // cluster_size
+        )
+        order = np.lexsort((unique_cells, clusters))
+        node_of = np.empty(len(order), dtype=np.int64)
+        node_of[order] = np.arange(len(order))
+        pair_nodes = node_of[np.searchsorted(unique_cells, pairs)]
+
+        graph = cls(
+            n,
+            m,
+            cluster_size,
+            entrance_spacing,
+            grid.checksum(),
+            grid.min_weight(),
+            unique_cells[order],
+            np.concatenate([
+                [0],
+                np.cumsum(np.bincount(clusters, minlength=cluster_count)),
+            ]),
+            np.zeros(len(order) + 1, dtype=np.int64),
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.float64),
+        )
+        flat = weights.reshape(-1)
+        edges = [
+            (
+                pair_nodes[:, 0],
+                pair_nodes[:, 1],
+                1 + flat[unique_cells[order][pair_nodes[:, 1]]],
+            ),
+            (
+                pair_nodes[:, 1],
+                pair_nodes[:, 0],
+                1 + flat[unique_cells[order][pair_nodes[:, 0]]],
+            ),
+        ]
+        edges.extend(graph._intra_edges(weights))
+        graph._store_edges(edges)
+        return graph
+
+    def _intra_edges(
+        self, weights: np.ndarray
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Yield the (sources, targets, costs) edges inside clusters."""
+        size = self.cluster_size
+        cluster_columns = -(-self.m // size)
+        for row, column, rows, columns, height, width in _cluster_blocks(
+            self.n, self.m, size
+        ):
+            block = weights[
+                row * size : row * size + rows * height,
+                column * size : column * size + columns * width,
+            ]
+            block = (
+                block
+                .reshape(rows, height, columns, width)
+                .transpose(0, 2, 1, 3)
+                .reshape(rows * columns, height, width)
+            )
+            ids = (
+                np.arange(row, row + rows)[:, None] * cluster_columns
+                + np.arange(column, column + columns)
+            ).reshape(-1)
+            counts = self.cluster_offsets[ids + 1] - self.cluster_offsets[ids]
+            batch = max(1, BATCH_CELLS // max(1, counts.max() * block[0].size))
+            for first in range(0, len(ids), batch):
+                yield self._cluster_edges(
+                    ids[first : first + batch], block[first : first + batch]
+                )
+
+    def _cluster_edges(
+        self, clusters: np.ndarray, weights: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Compute the edges between the nodes of a batch of clusters."""
+        nodes, valid, xs, ys = self._cluster_slots(clusters)
+        sources = np.arange(nodes.shape[1])
+        shape = (len(clusters), len(sources), *weights.shape[1:])
+        distances = np.full(shape, np.inf)
+        batch, source = np.nonzero(valid)
+        distances[batch, source, xs[batch, source], ys[batch, source]] = 0.0
+        _cluster_distances(
+            distances.reshape(-1, *shape[2:]),
+            1.0 + weights,
+            np.repeat(np.arange(len(clusters)), len(sources)),
+        )
+
+        costs = distances[
+            np.arange(len(clusters))[:, None, None],
+            sources[None, :, None],
+            xs[:, None, :],
+            ys[:, None, :],
+        ]
+        keep = valid[:, :, None] & valid[:, None, :]
+        keep &= ~np.eye(len(sources), dtype=bool)
+        return (
+            np.broadcast_to(nodes[:, :, None], keep.shape)[keep],
+            np.broadcast_to(nodes[:, None, :], keep.shape)[keep],
+            costs[keep],
+        )
+
+    def _cluster_slots(
+        self, clusters: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Lay out the nodes of a batch of clusters in padded rows.
+
+        Args:
+            clusters (np.ndarray): The cluster ids.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The node
+            in each slot, whether the slot holds a node, and the row and
+            column of its cell within the cluster. Padding slots point at
+            the first cell of their own cluster.
+        """
+        starts = self.cluster_offsets[clusters]
+        counts = self.cluster_offsets[clusters + 1] - starts
+        slots = np.arange(max(1, counts.max()))
+        valid = slots < counts[:, None]
+        nodes = np.where(valid, starts[:, None] + slots, 0)
+        cells = self.cells[nodes] if len(self.cells) else nodes
+        size = self.cluster_size
+        cluster_columns = -(-self.m // size)
+        xs = cells // self.m - (clusters // cluster_columns * size)[:, None]
+        ys = cells % self.m - (clusters % cluster_columns * size)[:, None]
+        return nodes, valid, np.where(valid, xs, 0), np.where(valid, ys, 0)
+
+    def _store_edges(
+        self, edges: List[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+    ):
+        """Sort the edges by source node into the CSR arrays."""
+        sources = np.concatenate([edge[0] for edge in edges])
+        order = np.argsort(sources, kind='stable')
+        self.neighbors = np.concatenate([edge[1] for edge in edges])[
+            order
+        ].astype(np.int32)
+        self.costs = np.concatenate([edge[2] for edge in edges])[order]
+        self.offsets = np.concatenate([
+            [0],
+            np.cumsum(np.bincount(sources, minlength=len(self.cells))),
+        ])
+
+    def matches(self, grid: TerrainGrid) -> bool:
+        """Whether the abstraction was built for this grid content."""
+        return (self.n, self.m) == (
+            grid.n,
+            grid.m,
+        ) and self.checksum == grid.checksum()
+
+    def save(self, path: str):
+        """
+        Write the abstraction to a ``.npz`` file.
+
+        Args:
+            path (str): The destination file, usually next to the grid
+                file.
+        """
+        np.savez(
+            path,
+            meta=np.array(
+                [
+                    self.n,
+                    self.m,
+                    self.cluster_size,
+                    self.entrance_spacing,
+                    self.checksum,
+                ],
+                dtype=np.int64,
+            ),
+            min_weight=np.array(self.min_weight),
+            cells=self.cells,
+            cluster_offsets=self.cluster_offsets,
+            offsets=self.offsets,
+            neighbors=self.neighbors,
+            costs=self.costs,
+        )
+
+    @classmethod
+    def load(
+        cls, path: str, grid: Optional[TerrainGrid] = None
+    ) -> 'HierarchicalGraph':
+        """
+        Read an abstraction written by ``save``.
+
+        Args:
+            path (str): The ``.npz`` file.
+            grid (Optional[TerrainGrid]): The grid the abstraction is meant
+                for, to check it against.
+
+        Returns:
+            HierarchicalGraph: The abstraction.
+
+        Raises:
+            ValueError: If the abstraction was built for another grid.
+        """
+        with np.load(path) as data:
+            n, m, cluster_size, spacing, checksum = data['meta'].tolist()
+            graph = cls(
+                n,
+                m,
+                cluster_size,
+                spacing,
+                checksum,
+                float(data['min_weight']),
+                data['cells'],
+                data['cluster_offsets'],
+                data['offsets'],
+                data['neighbors'],
+                data['costs'],
+            )
+        if grid is not None and not graph.matches(grid):
+            raise ValueError('Abstraction does not match the grid')
+        return graph
+
+    def cluster(self, cell: int) -> int:
+        """Return the cluster holding a cell."""
+        x, y = divmod(cell, self.m)
+        size = self.cluster_size
+        return x // size * -(-self.m // size) + y // size
+
+    def cluster_grid(
+        self, grid: TerrainGrid, cluster: int
+    ) -> Tuple[TerrainGrid, int, int]:
+        """
+        Cut the cells of a cluster out of the grid.
+
+        Returns:
+            Tuple[TerrainGrid, int, int]: The cluster as a grid of its own,
+            and the row and column of its first cell.
+        """
+        size = self.cluster_size
+        row, column = divmod(cluster, -(-self.m // size))
+        x0, y0 = row * size, column * size
+        codes = grid.as_array()[x0 : x0 + size, y0 : y0 + size]
+        return (
+            TerrainGrid(
+                codes.shape[0],
+                codes.shape[1],
+                bytearray(codes.tobytes()),
+                grid.terrains,
+                grid.weights,
+            ),
+            x0,
+            y0,
+        )
+
+    def _local_costs(
+        self, grid: TerrainGrid, cell: int, outgoing: bool
+    ) -> Dict[int, float]:
+        """
+        Connect a cell to the nodes of its cluster.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            cell (int): The cell to connect.
+            outgoing (bool): Cost paths from the cell to the nodes, rather
+                than from the nodes to the cell.
+
+        Returns:
+            Dict[int, float]: The cost of each node of the cluster, keyed
+            by node id.
+        """
+        cluster = self.cluster(cell)
+        local, x0, y0 = self.cluster_grid(grid, cluster)
+        x, y = divmod(cell, self.m)
+        field_costs = dijkstra_distance_field(
+            local, (x - x0) * local.m + (y - y0), AStarStrategy.steps
+        ).costs
+        first = int(self.cluster_offsets[cluster])
+        last = int(self.cluster_offsets[cluster + 1])
+        nodes = self.cells[first:last]
+        local_x, local_y = nodes // self.m - x0, nodes % self.m - y0
+        costs = field_costs[local_x, local_y]
+        if not outgoing:
+            # Reversing a path swaps which of its two ends gets paid for
+            entered = grid.weight_array()[grid.as_array()[x, y]]
+            costs = (
+                costs
+                - grid.weight_array()[local.as_array()][local_x, local_y]
+                + entered
+            )
+        return dict(zip(range(first, last), costs.tolist()))
+
+    def route(
+        self, grid: TerrainGrid, source: int, target: int
+    ) -> AbstractRoute:
+        """
+        Search the abstract graph between two cells.
+
+        The source and the target are linked to the nodes of their
+        clusters, and to each other when they share one, then A* runs over
+        the nodes.
+
+        Args:
+            grid (TerrainGrid): The compact grid the graph was built for.
+            source (int): The starting cell index.
+            target (int): The destination cell index.
+
+        Returns:
+            AbstractRoute: The waypoints and cost of the route.
+        """
+        started = time.perf_counter()
+        if source == target:
+            return AbstractRoute([source], 0.0)
+        source_edges, target_edges = self._query_edges(grid, source, target)
+        searching = time.perf_counter()
+        cost, parents, stats = self._search(source_edges, target_edges, target)
+        stats.timings = {
+            'setup': searching - started,
+            'search': time.perf_counter() - searching,
+        }
+        waypoints = []
+        if cost != math.inf:
+            node = TARGET
+            while node != SOURCE:
+                waypoints.append(
+                    target if node == TARGET else int(self.cells[node])
+                )
+                node = parents[node]
+            waypoints.append(source)
+            waypoints.reverse()
+        return AbstractRoute(waypoints, cost, stats)
+
+    def _query_edges(
+        self, grid: TerrainGrid, source: int, target: int
+    ) -> Tuple[Dict[int, float], Dict[int, float]]:
+        """
+        Link the two ends of a query to the nodes of their clusters.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            target (int): The destination cell index.
+
+        Returns:
+            Tuple[Dict[int, float], Dict[int, float]]: The cost from the
+            source to each node of its cluster, and from each node of its
+            cluster to the target. When both cells share a cluster, the
+            first one also holds the cost of the best path between them
+            inside it, keyed by ``TARGET``.
+        """
+        source_edges = self._local_costs(grid, source, outgoing=True)
+        target_edges = self._local_costs(grid, target, outgoing=False)
+        cluster = self.cluster(source)
+        if cluster == self.cluster(target):
+            local, x0, y0 = self.cluster_grid(grid, cluster)
+            source_x, source_y = divmod(source, self.m)
+            target_x, target_y = divmod(target, self.m)
+            source_edges[TARGET] = dijkstra_search(
+                local,
+                (source_x - x0) * local.m + source_y - y0,
+                (target_x - x0) * local.m + target_y - y0,
+                AStarStrategy.steps,
+            ).cost
+        return source_edges, target_edges
+
+    def _search(
+        self,
+        source_edges: Dict[int, float],
+        target_edges: Dict[int, float],
+        target: int,
+    ) -> Tuple[float, Dict[int, int], SearchStats]:
+        """
+        Run A* over the nodes from ``SOURCE`` to ``TARGET``.
+
+        Args:
+            source_edges (Dict[int, float]): The edges leaving the source.
+            target_edges (Dict[int, float]): The edges entering the target.
+            target (int): The destination cell index.
+
+        Returns:
+            Tuple[float, Dict[int, int], SearchStats]: The cost of the
+            route, the parent of each reached node, and the counters of
+            the search.
+        """
+        estimate = Heuristic.build(
+            MANHATTAN, self.min_weight, False
+        ).estimator(*divmod(target, self.m))
+        stats = SearchStats(pushes=1)
+        g_score: Dict[int, float] = {SOURCE: 0.0}
+        parents: Dict[int, int] = {}
+        closed = set()
+        open_set = [(0.0, 0, SOURCE)]
+
+        while open_set:
+            _, _, node = heapq.heappop(open_set)
+            if node in closed:
+                stats.stale_pops += 1
+                continue
+            if node == TARGET:
+                break
+            closed.add(node)
+            stats.expanded += 1
+            for neighbor, cost in self._edges(
+                node, source_edges, target_edges
+            ):
+                tentative_g = g_score[node] + cost
+                if neighbor in closed or tentative_g >= g_score.get(
+                    neighbor, math.inf
+                ):
+                    continue
+                g_score[neighbor] = tentative_g
+                parents[neighbor] = node
+                cell = target if neighbor == TARGET else self.cells[neighbor]
+                heapq.heappush(
+                    open_set,
+                    (
+                        tentative_g + estimate(*divmod(int(cell), self.m)),
+                        stats.pushes,
+                        neighbor,
+                    ),
+                )
+                stats.pushes += 1
+            stats.max_open_size = max(
+                stats.max_open_size,
+                stats.pushes - stats.expanded - stats.stale_pops,
+            )
+
+        cost = g_score.get(TARGET, math.inf)
+        stats.pops = stats.expanded + stats.stale_pops + (cost != math.inf)
+        return cost, parents, stats
+
+    def _edges(
+        self,
+        node: int,
+        source_edges: Dict[int, float],
+        target_edges: Dict[int, float],
+    ) -> List[Tuple[int, float]]:
+        """Return the (neighbor, cost) edges leaving a node of a query."""
+        if node == SOURCE:
+            return list(source_edges.items())
+        first, last = self.offsets[node], self.offsets[node + 1]
+        edges = list(
+            zip(
+                self.neighbors[first:last].tolist(),
+                self.costs[first:last].tolist(),
+            )
+        )
+        if node in target_edges:
+            edges.append((TARGET, target_edges[node]))
+        return edges
+
+    def refine(
+        self, grid: TerrainGrid, route: AbstractRoute
+    ) -> Iterator[List[int]]:
+        """
+        Turn a route into grid cells, one segment at a time.
+
+        Segments are only searched when the iteration reaches them, each
+        within the cluster it crosses.
+
+        Args:
+            grid (TerrainGrid): The compact grid the graph was built for.
+            route (AbstractRoute): The route to refine.
+
+        Yields:
+            List[int]: The cells of each segment, its first waypoint
+            excluded.
+        """
+        m = self.m
+        for start, end in zip(route.waypoints, route.waypoints[1:]):
+            cluster = self.cluster(start)
+            if cluster != self.cluster(end):
+                yield [end]
+                continue
+            local, x0, y0 = self.cluster_grid(grid, cluster)
+            start_x, start_y = divmod(start, m)
+            end_x, end_y = divmod(end, m)
+            result = dijkstra_search(
+                local,
+                (start_x - x0) * local.m + start_y - y0,
+                (end_x - x0) * local.m + end_y - y0,
+                AStarStrategy.steps,
+            )
+            yield [
+                (x0 + index // local.m) * m + y0 + index % local.m
+                for index in result.indices()
+            ]
+
+
+class HierarchicalStrategy(AStarStrategy):
+    """
+    Hierarchical A* (HPA*) over a precomputed cluster abstraction.
+
+    Queries search the small abstract graph first, then refine only the
+    segments of the route they return. The abstraction is built on the
+    first query on a grid, or loaded with ``HierarchicalGraph.load``, and
+    kept for the following queries on the same grid. Routes are
+    near-optimal: paths must cross cluster borders at entrances.
+
+    Attributes:
+        cluster_size (int): Side of the clusters.
+        entrance_spacing (int): Largest gap between two entrances along a
+            border.
+        graph (Optional[HierarchicalGraph]): The current abstraction.
+    """
+
+    def __init__(
+        self,
+        cluster_size: int = DEFAULT_CLUSTER_SIZE,
+        entrance_spacing: int = DEFAULT_ENTRANCE_SPACING,
+        graph: Optional[HierarchicalGraph] = None,
+    ):
+        self.cluster_size = cluster_size
+        self.entrance_spacing = entrance_spacing
+        self.graph = graph
+        self._grid: Union[List[List[Node]], TerrainGrid, None] = None
+        self._compact: Optional[TerrainGrid] = None
+        self._version: Optional[int] = None
+
+    def prepare(
+        self, grid: Union[List[List[Node]], TerrainGrid]
+    ) -> TerrainGrid:
+        """
+        Make the abstraction match a grid, building it if needed.
+
+        The abstraction is kept while queries use the same grid object,
+        and rebuilt once a compact grid reports edits through its
+        ``version``. Grids of nodes have no version: call it again after
+        editing their cells.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid to
+                search.
+
+        Returns:
+            TerrainGrid: The compact version of the grid.
+        """
+        compact = grid
+        if not isinstance(compact, TerrainGrid):
+            compact = TerrainGrid.from_nodes(grid)
+        if self.graph is None or not self.graph.matches(compact):
+            self.graph = HierarchicalGraph.build(
+                compact, self.cluster_size, self.entrance_spacing
+            )
+        self._grid, self._compact = grid, compact
+        self._version = compact.version
+        return compact
+
+    def _prepared(
+        self, grid: Union[List[List[Node]], TerrainGrid]
+    ) -> TerrainGrid:
+        """Return the compact grid, preparing it again if it changed."""
+        compact = self._compact
+        if (
+            self._grid is not grid
+            or self.graph is None
+            or compact.version != self._version
+        ):
+            compact = self.prepare(grid)
+        return compact
+
+    def route(
+        self,
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+    ) -> AbstractRoute:
+        """
+        Search the abstract route between two nodes, without refining it.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid to
+                search.
+            start (Node): The starting node.
+            end (Node): The destination node.
+
+        Returns:
+            AbstractRoute: The waypoints and cost of the route.
+        """
+        compact = self._prepared(grid)
+        return self.graph.route(
+            compact,
+            compact.index(start.position.x, start.position.y),
+            compact.index(end.position.x, end.position.y),
+        )
+
+    def find_path(
+        self,
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Node]:
+        """
+        Find a path from the start node to the end node using HPA*.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+
+        Returns:
+            List[Node]: The list of nodes representing the path.
+                        If no path is found, returns an empty list.
+        """
+        route = self.route(grid, start, end)
+        started = time.perf_counter()
+        cells = [
+            cell
+            for segment in self.graph.refine(self._compact, route)
+            for cell in segment
+        ]
+        path = Path(cell_nodes(grid, cells), route.cost)
+        if stats is not None:
+            stats.add_timing('reconstruct', time.perf_counter() - started)
+            stats.merge(route.stats)
+        return path
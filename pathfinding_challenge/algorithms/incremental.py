@@ -0,0 +1,325 @@
+import heapq
+import math
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    NO_PARENT,
+    Direction,
+    SearchResult,
+    path_nodes,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+Key = Tuple[float, float]
+
+
+@dataclass(slots=True)
+class LifelongPlanner:
+    """
+    Lifelong Planning A* (LPA*) between two fixed cells of a grid.
+
+    The planner keeps its cost estimates between searches. When cells
+    change terrain, only the costs of the edges entering them change, so
+    marking those cells is enough: the next search repairs the estimates
+    that depended on them and leaves the rest of the grid alone.
+
+    ``g_score`` holds the settled costs and ``rhs`` the one-step lookahead
+    from the neighbors. A cell is queued while the two disagree.
+
+    Attributes:
+        grid (TerrainGrid): The compact grid, read for the current weights.
+        source (int): The starting cell index.
+        target (int): The destination cell index.
+        moves (List[Direction]): The allowed moves, which must be symmetric.
+        heuristic (Heuristic): The consistent estimate towards the target.
+        min_weight (float): The lightest weight the heuristic assumes.
+        g_score (array): The settled cost of each cell.
+        rhs (array): The lookahead cost of each cell.
+        queued (Dict[int, Key]): The key of each queued cell. Heap entries
+            with another key are stale.
+        queue (List[Tuple[float, float, int]]): The open set.
+    """
+
+    grid: TerrainGrid
+    source: int
+    target: int
+    moves: List[Direction]
+    heuristic: Heuristic
+    min_weight: float
+    g_score: array
+    rhs: array
+    queued: Dict[int, Key] = field(default_factory=dict)
+    queue: List[Tuple[float, float, int]] = field(default_factory=list)
+
+    @classmethod
+    def start(
+        cls,
+        grid: TerrainGrid,
+        source: int,
+        target: int,
+        moves: Iterable[Direction],
+    ) -> 'LifelongPlanner':
+        """
+        Set up a planner with nothing searched yet.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+            target (int): The destination cell index.
+            moves (Iterable[Direction]): The allowed moves, as built by
+                ``step_table``.
+
+        Returns:
+            LifelongPlanner: The planner, with only the source queued.
+        """
+        moves = list(moves)
+        size = grid.n * grid.m
+        min_weight = grid.min_weight()
+        planner = cls(
+            grid,
+            source,
+            target,
+            moves,
+            Heuristic.for_grid(grid, moves),
+            min_weight,
+            array('d', [math.inf]) * size,
+            array('d', [math.inf]) * size,
+        )
+        planner.rhs[source] = 0.0
+        planner.enqueue(source)
+        return planner
+
+    def neighbors(self, cell: int) -> List[Tuple[int, float]]:
+        """Return the (neighbor, step length) pairs around a cell."""
+        n, m = self.grid.n, self.grid.m
+        x, y = divmod(cell, m)
+        return [
+            ((x + dx) * m + y + dy, step)
+            for dx, dy, step in self.moves
+            if 0 <= x + dx < n and 0 <= y + dy < m
+        ]
+
+    def key(self, cell: int) -> Key:
+        """Return the queue key of a cell."""
+        best = min(self.g_score[cell], self.rhs[cell])
+        x, y = divmod(cell, self.grid.m)
+        target_x, target_y = divmod(self.target, self.grid.m)
+        return (
+            best + self.heuristic.estimate(x - target_x, y - target_y),
+            best,
+        )
+
+    def enqueue(self, cell: int):
+        """Queue a cell under its current key, replacing any older entry."""
+        key = self.key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (*key, cell))
+
+    def update_cell(self, cell: int):
+        """Recompute the lookahead of a cell and queue it if inconsistent."""
+        if cell != self.source:
+            grid = self.grid
+            entered = grid.weights[grid.codes[cell]]
+            g_score = self.g_score
+            self.rhs[cell] = min(
+                (
+                    g_score[neighbor] + step + entered
+                    for neighbor, step in self.neighbors(cell)
+                ),
+                default=math.inf,
+            )
+        self.queued.pop(cell, None)
+        if self.g_score[cell] != self.rhs[cell]:
+            self.enqueue(cell)
+
+    def update(self, cells: Iterable[int]):
+        """
+        Take into account cells whose terrain changed in the grid.
+
+        Args:
+            cells (Iterable[int]): The linear indices of the changed cells.
+        """
+        self.grid.invalidate()
+        min_weight = self.grid.min_weight()
+        if min_weight < self.min_weight:
+            # A lighter terrain would make the current estimates overshoot
+            self.heuristic = Heuristic.for_grid(self.grid, self.moves)
+            self.min_weight = min_weight
+            self.queue = []
+            for cell in list(self.queued):
+                self.enqueue(cell)
+        for cell in cells:
+            self.update_cell(cell)
+
+    def search(self) -> SearchResult:
+        """
+        Repair the cost estimates until the target cost is settled.
+
+        Returns:
+            SearchResult: The cost, the parent pointers along the path and
+            the stats of this repair.
+        """
+        started = time.perf_counter()
+        target, queue, queued = self.target, self.queue, self.queued
+        stats = SearchStats()
+
+        while queue:
+            top_key, top_cost, cell = queue[0]
+            if queued.get(cell) != (top_key, top_cost):
+                heapq.heappop(queue)
+                stats.stale_pops += 1
+                continue
+            if (top_key, top_cost) >= self.key(target) and (
+                self.rhs[target] == self.g_score[target]
+            ):
+                break
+            heapq.heappop(queue)
+            del queued[cell]
+            stats.expanded += 1
+            size = len(queue)
+            self._expand(cell)
+            stats.pushes += len(queue) - size
+            stats.max_open_size = max(stats.max_open_size, len(queue))
+
+        stats.pops = stats.expanded + stats.stale_pops
+        stats.add_timing('search', time.perf_counter() - started)
+        cost = self.g_score[target]
+        return SearchResult(
+            self.source,
+            target,
+            cost,
+            self._parents() if cost != math.inf else array('i'),
+            stats,
+        )
+
+    def _expand(self, cell: int):
+        """
+        Make a popped cell consistent and update its neighbors.
+
+        An overconsistent cell takes its lookahead as cost and lowers the
+        lookahead of its neighbors. An underconsistent one is reset, and
+        its own lookahead and its neighbors' are recomputed.
+
+        Args:
+            cell (int): The linear index of the cell.
+        """
+        g_score, rhs = self.g_score, self.rhs
+        if g_score[cell] > rhs[cell]:
+            codes, weights = self.grid.codes, self.grid.weights
+            cost = g_score[cell] = rhs[cell]
+            for neighbor, step in self.neighbors(cell):
+                candidate = cost + step + weights[codes[neighbor]]
+                if candidate < rhs[neighbor]:
+                    rhs[neighbor] = candidate
+                    self.enqueue(neighbor)
+        else:
+            g_score[cell] = math.inf
+            self.update_cell(cell)
+            for neighbor, _ in self.neighbors(cell):
+                self.update_cell(neighbor)
+
+    def _parents(self) -> array:
+        """Walk back from the target along the cheapest predecessors."""
+        grid, g_score = self.grid, self.g_score
+        parents = array('i', [NO_PARENT]) * (grid.n * grid.m)
+        cell = self.target
+        while cell != self.source:
+            entered = grid.weights[grid.codes[cell]]
+            parent = min(
+                self.neighbors(cell),
+                key=lambda pair: g_score[pair[0]] + pair[1] + entered,
+            )[0]
+            parents[cell] = parent
+            cell = parent
+        return parents
+
+
+class IncrementalStrategy(AStarStrategy):
+    """
+    LPA* with the moves and costs of ``AStarStrategy``.
+
+    The search state is kept between calls for the same grid, start and
+    end. After changing the terrain of some cells, report them with
+    ``update`` and the next call only repairs the part of the search they
+    affect. Any other query starts a new planner.
+
+    Attributes:
+        planner (Optional[LifelongPlanner]): The current planner.
+    """
+
+    def __init__(self):
+        self.planner: Optional[LifelongPlanner] = None
+        self._grid: Union[List[List[Node]], TerrainGrid, None] = None
+
+    def update(self, cells: Iterable[Tuple[int, int]]):
+        """
+        Report cells whose terrain changed since the last call.
+
+        For grids of nodes, the new nodes are read from the grid.
+
+        Args:
+            cells (Iterable[Tuple[int, int]]): The (x, y) positions of the
+                changed cells.
+        """
+        if self.planner is None:
+            return
+        compact = self.planner.grid
+        indices = []
+        for x, y in cells:
+            if compact is not self._grid:
+                compact.set_node(x, y, self._grid[x][y])
+            indices.append(compact.index(x, y))
+        self.planner.update(indices)
+
+    def find_path(
+        self,
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Node]:
+        """
+        Find the shortest path from the start node to the end node,
+        reusing the previous search when possible.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        started = time.perf_counter()
+        planner = self.planner
+        m = len(grid[0]) if len(grid) else 0
+        source = start.position.x * m + start.position.y
+        target = end.position.x * m + end.position.y
+        if (
+            planner is None
+            or self._grid is not grid
+            or (planner.source, planner.target) != (source, target)
+        ):
+            compact = grid
+            if not isinstance(compact, TerrainGrid):
+                compact = TerrainGrid.from_nodes(grid)
+            planner = LifelongPlanner.start(
+                compact, source, target, AStarStrategy.steps
+            )
+            self.planner, self._grid = planner, grid
+        setup = time.perf_counter() - started
+        result = planner.search()
+        result.stats.add_timing('setup', setup)
+        return path_nodes(grid, result, stats)
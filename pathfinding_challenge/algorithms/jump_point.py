@@ -0,0 +1,334 @@
+import heapq
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    NO_PARENT,
+    SearchResult,
+    path_nodes,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+ALL_DIRECTIONS: Tuple[Tuple[int, int], ...] = tuple(
+    (direction.x, direction.y)
+    for direction in DijkstraStrategy.cardinal_directions
+)
+
+
+def boundary_cells(grid: TerrainGrid) -> np.ndarray:
+    """
+    Flag the cells that touch a cell of another weight.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+
+    Returns:
+        np.ndarray: An (n, m) bool array, True for cells with at least one
+        of their 8 neighbors weighing differently.
+    """
+    weights = grid.weight_array()[grid.as_array()]
+    boundary = np.zeros(weights.shape, dtype=bool)
+    for dx, dy in ALL_DIRECTIONS:
+        rows = slice(max(dx, 0), weights.shape[0] + min(dx, 0))
+        columns = slice(max(dy, 0), weights.shape[1] + min(dy, 0))
+        shifted_rows = slice(max(-dx, 0), weights.shape[0] + min(-dx, 0))
+        shifted_columns = slice(max(-dy, 0), weights.shape[1] + min(-dy, 0))
+        boundary[shifted_rows, shifted_columns] |= (
+            weights[shifted_rows, shifted_columns] != weights[rows, columns]
+        )
+    return boundary
+
+
+@dataclass(slots=True)
+class _JumpPlanes:
+    """
+    Boundary flags of a grid laid out for fast straight scans.
+
+    Inside a uniform region every move into the region costs the same, so
+    the only cells a jump must stop at are boundary cells and the target.
+    Keeping the flags both row major and column major turns each straight
+    scan into a single ``bytes.find`` call.
+    """
+
+    n: int
+    m: int
+    rows: bytes
+    columns: bytes
+    target: int
+    target_x: int
+    target_y: int
+
+    @classmethod
+    def build(cls, grid: TerrainGrid, target: int) -> '_JumpPlanes':
+        """Compute the boundary flags of a grid."""
+        boundary = boundary_cells(grid).astype(np.uint8)
+        return cls(
+            grid.n,
+            grid.m,
+            boundary.tobytes(),
+            boundary.T.tobytes(),
+            target,
+            *divmod(target, grid.m),
+        )
+
+    def straight(self, x: int, y: int, dx: int, dy: int) -> int:
+        """
+        Scan along a row or a column for the next jump point.
+
+        Returns:
+            int: The first boundary cell or target after (x, y), or
+            ``NO_PARENT`` if the scan leaves the grid first.
+        """
+        n, m = self.n, self.m
+        target_x, target_y = self.target_x, self.target_y
+        if dx == 0:
+            start = x * m
+            if dy > 0:
+                found = self.rows.find(1, start + y + 1, start + m)
+                end = m if found < 0 else found - start
+                if target_x == x and y < target_y < end:
+                    return self.target
+            else:
+                found = self.rows.rfind(1, start, start + y)
+                end = -1 if found < 0 else found - start
+                if target_x == x and end < target_y < y:
+                    return self.target
+            return NO_PARENT if found < 0 else found
+        start = y * n
+        if dx > 0:
+            found = self.columns.find(1, start + x + 1, start + n)
+            end = n if found < 0 else found - start
+            if target_y == y and x < target_x < end:
+                return self.target
+        else:
+            found = self.columns.rfind(1, start, start + x)
+            end = -1 if found < 0 else found - start
+            if target_y == y and end < target_x < x:
+                return self.target
+        return NO_PARENT if found < 0 else (found - start) * m + y
+
+    def jump(self, x: int, y: int, dx: int, dy: int) -> int:
+        """
+        Jump from (x, y) in a direction to the next jump point.
+
+        A diagonal jump stops at a boundary cell, at the target, or at a
+        cell from which one of its two straight components finds one.
+
+        Returns:
+            int: The jump point, or ``NO_PARENT`` if there is none.
+        """
+        if not (dx and dy):
+            return self.straight(x, y, dx, dy)
+        n, m, rows, target = self.n, self.m, self.rows, self.target
+        while True:
+            x += dx
+            y += dy
+            if x < 0 or x >= n or y < 0 or y >= m:
+                return NO_PARENT
+            cell = x * m + y
+            if cell == target or rows[cell]:
+                return cell
+            if (
+                self.straight(x, y, dx, 0) != NO_PARENT
+                or self.straight(x, y, 0, dy) != NO_PARENT
+            ):
+                return cell
+
+
+def _successor_directions(
+    planes: _JumpPlanes, current: int, parent: int
+) -> Tuple[Tuple[int, int], ...]:
+    """
+    Return the directions worth jumping to from a cell.
+
+    Boundary cells, and the start cell, are expanded in every direction.
+    Inside a uniform region a cell only keeps its natural neighbors, since
+    every other neighbor is reached as cheaply through the parent.
+    """
+    if parent == NO_PARENT or planes.rows[current]:
+        return ALL_DIRECTIONS
+    m = planes.m
+    x, y = divmod(current, m)
+    parent_x, parent_y = divmod(parent, m)
+    dx = (x > parent_x) - (x < parent_x)
+    dy = (y > parent_y) - (y < parent_y)
+    if dx and dy:
+        return ((dx, dy), (dx, 0), (0, dy))
+    return ((dx, dy),)
+
+
+# The search loop keeps its state in locals
+def jump_point_search(  # noqa: PLR0914
+    grid: TerrainGrid,
+    source: int,
+    target: int,
+    heuristic: Optional[Heuristic] = None,
+) -> SearchResult:
+    """
+    Run A* over jump points, with the 8-connected moves of Dijkstra.
+
+    Inside uniform-weight regions, symmetric paths are pruned and straight
+    or diagonal runs are crossed in a single jump. Cells next to another
+    terrain are expanded in all directions, like a plain A*. Every cell a
+    jump enters weighs the same as the cell it lands on, so a jump of
+    ``k`` moves costs ``k`` times one move.
+
+    Args:
+        grid (TerrainGrid): The compact grid.
+        source (int): The starting cell index.
+        target (int): The destination cell index.
+        heuristic (Optional[Heuristic]): The cost estimate towards the
+            target. Defaults to None, which picks the tightest admissible
+            one for the grid.
+
+    Returns:
+        SearchResult: The cost, parent pointers and stats of the search.
+        The parents of the cells between jump points are filled along the
+        returned path only.
+    """
+    started = time.perf_counter()
+    n, m = grid.n, grid.m
+    size = n * m
+    codes, weights = grid.codes, list(grid.weights)
+    if heuristic is None:
+        heuristic = Heuristic.for_grid(grid, DijkstraStrategy.steps)
+    estimate = heuristic.estimator(*divmod(target, m))
+    planes = _JumpPlanes.build(grid, target)
+
+    g_score = array('d', [math.inf]) * size
+    parents = array('i', [NO_PARENT]) * size
+    closed = bytearray(size)
+    g_score[source] = 0.0
+    counter = expanded = stale_pops = max_open_size = 0
+    open_set = [(0.0, 0, source)]
+    heappush, heappop = heapq.heappush, heapq.heappop
+    searching = time.perf_counter()
+
+    cost = math.inf
+    while open_set:
+        _, _, current = heappop(open_set)
+        if closed[current]:
+            stale_pops += 1
+            continue
+        if current == target:
+            cost = g_score[target]
+            break
+        closed[current] = 1
+        expanded += 1
+
+        x, y = divmod(current, m)
+        current_g = g_score[current]
+        for dx, dy in _successor_directions(planes, current, parents[current]):
+            jump_point = planes.jump(x, y, dx, dy)
+            if jump_point == NO_PARENT or closed[jump_point]:
+                continue
+            jump_x, jump_y = divmod(jump_point, m)
+            moves = max(abs(jump_x - x), abs(jump_y - y))
+            step = math.sqrt(2) if dx and dy else 1.0
+            tentative_g = current_g + moves * (
+                step + weights[codes[jump_point]]
+            )
+            if tentative_g < g_score[jump_point]:
+                g_score[jump_point] = tentative_g
+                parents[jump_point] = current
+                counter += 1
+                heappush(
+                    open_set,
+                    (
+                        tentative_g + estimate(jump_x, jump_y),
+                        counter,
+                        jump_point,
+                    ),
+                )
+        max_open_size = max(max_open_size, counter + 1 - expanded - stale_pops)
+
+    if cost != math.inf:
+        _fill_jumps(parents, source, target, m)
+    return SearchResult(
+        source,
+        target,
+        cost,
+        parents,
+        SearchStats(
+            expanded=expanded,
+            pushes=counter + 1,
+            pops=expanded + stale_pops + (cost != math.inf),
+            stale_pops=stale_pops,
+            max_open_size=max_open_size,
+            timings={
+                'setup': searching - started,
+                'search': time.perf_counter() - searching,
+            },
+        ),
+    )
+
+
+def _fill_jumps(parents: array, source: int, target: int, m: int):
+    """Point the cells skipped by each jump of a path at their predecessor."""
+    jump_points: List[int] = [target]
+    while jump_points[-1] != source:
+        jump_points.append(parents[jump_points[-1]])
+    for cell, parent in zip(jump_points, jump_points[1:]):
+        x, y = divmod(cell, m)
+        parent_x, parent_y = divmod(parent, m)
+        dx = (x > parent_x) - (x < parent_x)
+        dy = (y > parent_y) - (y < parent_y)
+        previous = parent
+        while previous != cell:
+            parent_x += dx
+            parent_y += dy
+            following = parent_x * m + parent_y
+            parents[following] = previous
+            previous = following
+
+
+class JumpPointStrategy(DijkstraStrategy):
+    """
+    Jump Point Search with the moves and costs of ``DijkstraStrategy``.
+
+    Large single-terrain regions are crossed in a few jumps instead of
+    being expanded cell by cell, while the returned costs stay optimal.
+    """
+
+    @staticmethod
+    def find_path(
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Node]:
+        """
+        Find the shortest path from the start node to the end node using
+        Jump Point Search.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        compact = grid
+        if not isinstance(compact, TerrainGrid):
+            compact = TerrainGrid.from_nodes(grid)
+        result = jump_point_search(
+            compact,
+            compact.index(start.position.x, start.position.y),
+            compact.index(end.position.x, end.position.y),
+        )
+        return path_nodes(grid, result, stats)
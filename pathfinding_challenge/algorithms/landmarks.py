@@ -0,0 +1,337 @@
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    Direction,
+    astar_search,
+    path_nodes,
+)
+from pathfinding_challenge.algorithms.heuristics import Heuristic
+from pathfinding_challenge.algorithms.neighbors import NeighborTable
+from pathfinding_challenge.algorithms.stats import SearchStats
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+DEFAULT_LANDMARKS = 8
+# Relative spacing of float32 values, twice the worst rounding error
+FLOAT32_EPSILON = float(np.finfo(np.float32).eps)
+
+
+def edge_cells(n: int, m: int) -> np.ndarray:
+    """Return the linear indices of the cells on the border of a grid."""
+    cells = np.arange(n * m).reshape(n, m)
+    return np.unique(
+        np.concatenate([cells[0], cells[-1], cells[:, 0], cells[:, -1]])
+    )
+
+
+@dataclass(slots=True)
+class LandmarkTable:
+    """
+    Distances from a few landmark cells, for ALT lower bounds.
+
+    By the triangle inequality, a path from ``v`` to ``t`` costs at least
+    ``d(L, t) - d(L, v)`` and ``d(v, L) - d(t, L)`` for any landmark ``L``.
+    Moves are symmetric and every edge costs the weight of the cell it
+    enters, so the cost back to a landmark follows from the cost from it:
+    ``d(v, L) = d(L, v) - w(v) + w(L)``. A single float32 table per
+    landmark therefore gives both bounds.
+
+    Attributes:
+        checksum (int): ``TerrainGrid.checksum`` of the grid.
+        moves (np.ndarray): The (k, 3) step table the distances follow.
+        landmarks (np.ndarray): Linear index of each landmark.
+        distances (np.ndarray): (landmarks, n, m) float32 cost from each
+            landmark to every cell.
+        max_distance (float): The largest finite distance in the table.
+    """
+
+    checksum: int
+    moves: np.ndarray
+    landmarks: np.ndarray
+    distances: np.ndarray
+    max_distance: float
+
+    @classmethod
+    def build(
+        cls,
+        grid: TerrainGrid,
+        directions: Sequence[Direction],
+        count: int = DEFAULT_LANDMARKS,
+    ) -> 'LandmarkTable':
+        """
+        Pick landmarks on the grid border and cost every cell from each.
+
+        The first landmark is the top left corner. Each following one is
+        the border cell farthest from the landmarks picked so far, which
+        spreads them around the map.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            directions (Sequence[Direction]): The allowed moves, as built by
+                ``step_table``.
+            count (int): The number of landmarks. Defaults to 8.
+
+        Returns:
+            LandmarkTable: The table.
+
+        Raises:
+            ValueError: If the count is smaller than 1.
+        """
+        if count < 1:
+            raise ValueError('At least one landmark is needed')
+        border = edge_cells(grid.n, grid.m)
+        nearest = np.full(len(border), np.inf)
+        landmarks: List[int] = []
+        distances: List[np.ndarray] = []
+        landmark = 0
+        neighbor_table = NeighborTable.from_steps(directions)
+        while len(landmarks) < min(count, len(border)):
+            costs = neighbor_table.distance_field(grid, landmark).costs
+            landmarks.append(landmark)
+            distances.append(costs.astype(np.float32))
+            nearest = np.minimum(nearest, costs.reshape(-1)[border])
+            landmark = int(border[np.argmax(nearest)])
+        table = np.stack(distances) if distances else np.empty((0, 0, 0))
+        finite = table[np.isfinite(table)]
+        return cls(
+            grid.checksum(),
+            np.array(directions, dtype=np.float64).reshape(-1, 3),
+            np.array(landmarks, dtype=np.int64),
+            table.astype(np.float32),
+            float(finite.max()) if finite.size else 0.0,
+        )
+
+    def matches(
+        self, grid: TerrainGrid, directions: Sequence[Direction]
+    ) -> bool:
+        """Whether the table was built for this grid content and moves."""
+        moves = np.array(directions, dtype=np.float64).reshape(-1, 3)
+        return (
+            self.distances.shape[1:] == (grid.n, grid.m)
+            and self.checksum == grid.checksum()
+            and np.array_equal(self.moves, moves)
+        )
+
+    def save(self, prefix: str):
+        """
+        Write the table as ``<prefix>.landmarks.npz`` and the distances as
+        ``<prefix>.distances.npy``, which ``load`` can memory-map.
+
+        Args:
+            prefix (str): The path prefix of the files.
+        """
+        np.save(f'{prefix}.distances.npy', self.distances)
+        np.savez(
+            f'{prefix}.landmarks.npz',
+            checksum=np.array(self.checksum, dtype=np.int64),
+            moves=self.moves,
+            landmarks=self.landmarks,
+            max_distance=np.array(self.max_distance),
+        )
+
+    @classmethod
+    def load(cls, prefix: str, mmap: bool = True) -> 'LandmarkTable':
+        """
+        Read a table written by ``save``.
+
+        Args:
+            prefix (str): The path prefix of the files.
+            mmap (bool): Memory-map the distances read-only instead of
+                loading them in memory. Defaults to True.
+
+        Returns:
+            LandmarkTable: The loaded table.
+        """
+        distances = np.load(
+            f'{prefix}.distances.npy', mmap_mode='r' if mmap else None
+        )
+        with np.load(f'{prefix}.landmarks.npz') as data:
+            return cls(
+                int(data['checksum']),
+                data['moves'],
+                data['landmarks'],
+                distances,
+                float(data['max_distance']),
+            )
+
+    def bounds(
+        self,
+        grid: TerrainGrid,
+        target: int,
+        heuristic: Optional[Heuristic] = None,
+    ) -> np.ndarray:
+        """
+        Compute a lower bound of the cost from every cell to a target.
+
+        The bound is the best of the landmark bounds and the heuristic.
+        Float32 rounding can make the landmark bounds overestimate by a
+        few units in the last place, so they are shrunk by that much, and
+        scaled down just enough for rounding to never break consistency.
+
+        Args:
+            grid (TerrainGrid): The compact grid the table was built for.
+            target (int): The destination cell index.
+            heuristic (Optional[Heuristic]): The geometric estimate to
+                combine the landmark bounds with. Defaults to None, which
+                picks the tightest admissible one for the moves.
+
+        Returns:
+            np.ndarray: The flat float64 bound of each cell, to pass as the
+            heuristic of ``astar_search``.
+        """
+        moves = [tuple(move) for move in self.moves.tolist()]
+        if heuristic is None:
+            heuristic = Heuristic.for_grid(grid, moves)
+        best = heuristic.towards(grid.n, grid.m, target)
+
+        weights = grid.weight_array()[grid.as_array()].reshape(-1)
+        entered = weights.astype(np.float64) - float(weights[target])
+        scale, slack = self._rounding_margins(grid, moves)
+        for row in self.distances.reshape(len(self.landmarks), -1):
+            from_landmark = row.astype(np.float64)
+            ahead = from_landmark[target] - from_landmark
+            bound = np.maximum(ahead, -ahead - entered)
+            bound *= scale
+            bound -= slack
+            # Unreachable cells give NaN, which fmax skips
+            np.fmax(best, bound, out=best)
+        return best
+
+    def _rounding_margins(
+        self, grid: TerrainGrid, moves: List[Direction]
+    ) -> Tuple[float, float]:
+        """
+        Return how much to scale and shrink the float32 landmark bounds.
+
+        The slack covers the rounding of the largest stored distance, and
+        the scale leaves room for it on the cheapest edge, which keeps the
+        bounds consistent.
+
+        Args:
+            grid (TerrainGrid): The compact grid the table was built for.
+            moves (List[Direction]): The allowed moves.
+
+        Returns:
+            Tuple[float, float]: The scale and the slack.
+        """
+        slack = FLOAT32_EPSILON * self.max_distance
+        cheapest_edge = min(step for _, _, step in moves) + max(
+            grid.min_weight(), 0.0
+        )
+        scale = 1.0 - slack / cheapest_edge if cheapest_edge > 0 else 0.0
+        return scale, slack
+
+
+class LandmarkStrategy(AStarStrategy):
+    """
+    A* guided by ALT landmark bounds, with the moves of ``AStarStrategy``.
+
+    The landmark table is built on the first query on a grid, or loaded
+    with ``LandmarkTable.load``, and reused by the following queries on
+    the same grid. It pays off when many queries run on few static maps:
+    the bounds follow the terrain instead of assuming the lightest one
+    everywhere, so far fewer cells are expanded.
+
+    Attributes:
+        count (int): The number of landmarks of built tables.
+        table (Optional[LandmarkTable]): The current table.
+    """
+
+    def __init__(
+        self,
+        count: int = DEFAULT_LANDMARKS,
+        table: Optional[LandmarkTable] = None,
+    ):
+        self.count = count
+        self.table = table
+        self._grid: Union[List[List[Node]], TerrainGrid, None] = None
+        self._compact: Optional[TerrainGrid] = None
+        self._version: Optional[int] = None
+
+    def prepare(
+        self, grid: Union[List[List[Node]], TerrainGrid]
+    ) -> TerrainGrid:
+        """
+        Make the table match a grid, building it if needed.
+
+        The table is kept while queries use the same grid object, and
+        rebuilt once a compact grid reports edits through its ``version``,
+        as lighter terrains would make its bounds overestimate. Grids of
+        nodes have no version: call it again after editing their cells.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid to
+                search.
+
+        Returns:
+            TerrainGrid: The compact version of the grid.
+        """
+        compact = grid
+        if not isinstance(compact, TerrainGrid):
+            compact = TerrainGrid.from_nodes(grid)
+        if self.table is None or not self.table.matches(
+            compact, AStarStrategy.steps
+        ):
+            self.table = LandmarkTable.build(
+                compact, AStarStrategy.steps, self.count
+            )
+        self._grid, self._compact = grid, compact
+        self._version = compact.version
+        return compact
+
+    def _prepared(
+        self, grid: Union[List[List[Node]], TerrainGrid]
+    ) -> TerrainGrid:
+        """Return the compact grid, preparing it again if it changed."""
+        compact = self._compact
+        if (
+            self._grid is not grid
+            or self.table is None
+            or compact.version != self._version
+        ):
+            compact = self.prepare(grid)
+        return compact
+
+    def find_path(
+        self,
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
+    ) -> List[Node]:
+        """
+        Find the shortest path from the start node to the end node using
+        A* with landmark bounds.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid containing
+                all nodes.
+            start (Node): The starting node.
+            end (Node): The destination node.
+            stats (Optional[SearchStats]): Collector the search counters and
+                timings are added to. Defaults to None, which collects
+                nothing.
+
+        Returns:
+            List[Node]: The list of nodes representing the shortest path.
+                        If no path is found, returns an empty list.
+        """
+        started = time.perf_counter()
+        compact = self._prepared(grid)
+        target = compact.index(end.position.x, end.position.y)
+        bounds = self.table.bounds(compact, target)
+        setup = time.perf_counter() - started
+        result = astar_search(
+            compact,
+            compact.index(start.position.x, start.position.y),
+            target,
+            AStarStrategy.steps,
+            bounds,
+        )
+        result.stats.add_timing('setup', setup)
+        return path_nodes(grid, result, stats)
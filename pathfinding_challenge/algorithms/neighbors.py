@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.grid_search import (
+    NO_PARENT,
+    Direction,
+    DistanceField,
+    step_table,
+)
+from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+
+@dataclass(frozen=True, slots=True)
+class NeighborTable:
+    """
+    Precomputed neighbor offsets and step costs for a connectivity layout.
+
+    The Euclidean length of each move is computed once, so expanding a
+    cell never calls ``math.sqrt`` nor allocates ``Position`` objects.
+
+    Attributes:
+        directions (Tuple[Direction, ...]): (dx, dy, step length) tuples,
+            handy for pure Python loops.
+        dx (np.ndarray): Row offset of each move.
+        dy (np.ndarray): Column offset of each move.
+        steps (np.ndarray): Euclidean length of each move.
+    """
+
+    directions: Tuple[Direction, ...]
+    dx: np.ndarray
+    dy: np.ndarray
+    steps: np.ndarray
+
+    @classmethod
+    def from_directions(
+        cls, directions: Sequence[Position]
+    ) -> 'NeighborTable':
+        """
+        Build the table for a list of direction offsets.
+
+        Args:
+            directions (Sequence[Position]): The allowed moves.
+
+        Returns:
+            NeighborTable: The precomputed table.
+        """
+        return cls.from_steps(step_table(directions))
+
+    @classmethod
+    def from_steps(cls, directions: Sequence[Direction]) -> 'NeighborTable':
+        """
+        Build the table for moves already turned into a step table.
+
+        Args:
+            directions (Sequence[Direction]): The allowed moves, as built
+                by ``step_table``.
+
+        Returns:
+            NeighborTable: The precomputed table.
+        """
+        table = tuple(tuple(direction) for direction in directions)
+        return cls(
+            directions=table,
+            dx=np.array([dx for dx, _, _ in table], dtype=np.int64),
+            dy=np.array([dy for _, dy, _ in table], dtype=np.int64),
+            steps=np.array([step for _, _, step in table], dtype=np.float64),
+        )
+
+    def expand(
+        self, grid: TerrainGrid, cells: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Expand a batch of cells into all their in-bounds neighbors.
+
+        A single cell or a whole frontier is handled by the same few array
+        operations. The edge cost follows ``calculate_distance``: the step
+        length plus the weight of the destination cell.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            cells (np.ndarray): Linear indices of the cells to expand.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: For each valid edge,
+            the origin cell, the neighbor cell and the edge cost.
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1)
+        x, y = np.divmod(cells, grid.m)
+        nx = x[:, None] + self.dx
+        ny = y[:, None] + self.dy
+        inside = (nx >= 0) & (nx < grid.n) & (ny >= 0) & (ny < grid.m)
+
+        origins = np.broadcast_to(cells[:, None], inside.shape)[inside]
+        neighbors = nx[inside] * grid.m + ny[inside]
+        steps = np.broadcast_to(self.steps, inside.shape)[inside]
+        codes = grid.as_array().reshape(-1)[neighbors]
+        costs = steps + grid.weight_array()[codes]
+        return origins, neighbors, costs
+
+    def distance_field(self, grid: TerrainGrid, source: int) -> DistanceField:
+        """
+        Compute the cost from a source to every cell, a frontier at a time.
+
+        Instead of popping one cell at a time off a heap, every cell whose
+        cost improved is expanded at once by ``expand``. Frontiers are cut
+        into buckets as wide as the cheapest edge, as in delta-stepping,
+        so few cells are expanded again once a better cost reaches them.
+        The costs are the ones Dijkstra finds; on ties, parents may point
+        to another path of the same cost.
+
+        Args:
+            grid (TerrainGrid): The compact grid.
+            source (int): The starting cell index.
+
+        Returns:
+            DistanceField: The cost and parent of every cell.
+        """
+        costs = np.full(grid.n * grid.m, np.inf)
+        parents = np.full(grid.n * grid.m, NO_PARENT, dtype=np.intc)
+        costs[source] = 0.0
+        width = float(self.steps.min()) + max(grid.min_weight(), 0.0)
+        pending = np.array([source], dtype=np.int64)
+        while pending.size:
+            limit = costs[pending].min() + width
+            near = costs[pending] < limit
+            frontier, pending = pending[near], pending[~near]
+            while frontier.size:
+                improved = self._relax(grid, costs, parents, frontier)
+                near = costs[improved] < limit
+                frontier = improved[near]
+                pending = np.union1d(pending, improved[~near])
+        return DistanceField(source, costs.reshape(grid.n, grid.m), parents)
+
+    def _relax(
+        self,
+        grid: TerrainGrid,
+        costs: np.ndarray,
+        parents: np.ndarray,
+        frontier: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Relax every edge leaving a frontier, in place.
+
+        Returns:
+            np.ndarray: The sorted cells whose cost improved.
+        """
+        origins, neighbors, edges = self.expand(grid, frontier)
+        candidates = costs[origins] + edges
+        better = candidates < costs[neighbors]
+        origins, neighbors = origins[better], neighbors[better]
+        candidates = candidates[better]
+        np.minimum.at(costs, neighbors, candidates)
+        # Of several edges reaching a cell, the cheapest sets its parent
+        won = candidates == costs[neighbors]
+        parents[neighbors[won]] = origins[won]
+        return np.unique(neighbors[won])
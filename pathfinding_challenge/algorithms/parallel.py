@@ -0,0 +1,186 @@
+import math
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+CoordinateAnswer = Tuple[np.ndarray, float]
+Chunk = List[Tuple[int, List[int]]]
+PackedAnswers = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Chunks per worker when the chunk size is left to the pool, so that a
+# slow chunk does not leave the other workers idle at the end
+CHUNKS_PER_WORKER = 4
+
+_worker_state: Dict[str, object] = {}
+
+
+class SharedGridPool:
+    """
+    Persistent worker processes answering queries on a shared grid.
+
+    The terrain-code plane is copied once into a shared memory block that
+    every worker maps, so neither the grid nor its nodes are ever pickled.
+    Only chunks of cell indices go to the workers, and the paths come back
+    as packed coordinate arrays. The pool stays up between ``solve`` calls
+    until ``close``, or the end of a ``with`` block.
+
+    Queries sharing a source are answered by a single ``search_many``
+    call, and distinct sources are spread over the workers.
+
+    Attributes:
+        grid (TerrainGrid): The grid the queries refer to.
+        strategy (PathfindingStrategy): A strategy providing
+            ``search_many``.
+        processes (int): Number of worker processes.
+        chunk_size (Optional[int]): Sources sent to a worker at once.
+            None spreads each call over ``CHUNKS_PER_WORKER`` chunks per
+            worker.
+    """
+
+    def __init__(
+        self,
+        grid: TerrainGrid,
+        strategy: PathfindingStrategy,
+        processes: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ):
+        if not hasattr(strategy, 'search_many'):
+            raise NotImplementedError(
+                'Strategy must implement the search_many method'
+            )
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError('Chunk size must be at least 1')
+        self.grid = grid
+        self.strategy = strategy
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        size = grid.n * grid.m
+        self._memory = shared_memory.SharedMemory(
+            create=True, size=max(size, 1)
+        )
+        np.frombuffer(self._memory.buf, np.uint8, size)[:] = np.frombuffer(
+            grid.codes, np.uint8
+        )
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            initializer=_attach_worker,
+            initargs=(
+                self._memory.name,
+                (grid.n, grid.m, grid.connectivity),
+                (list(grid.terrains), grid.weights),
+                strategy,
+            ),
+        )
+
+    def __enter__(self) -> 'SharedGridPool':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the workers and release the shared memory block."""
+        if self._executor is None:
+            return
+        self._executor.shutdown()
+        self._executor = None
+        self._memory.close()
+        self._memory.unlink()
+
+    def solve(
+        self, queries: Sequence[Tuple[int, int]]
+    ) -> List[CoordinateAnswer]:
+        """
+        Answer (source, target) queries given as linear cell indices.
+
+        Args:
+            queries (Sequence[Tuple[int, int]]): The source and target
+                index of each query.
+
+        Returns:
+            List[CoordinateAnswer]: For each query in input order, the
+            int32 (x, y) rows from the first step to the target, the
+            source excluded, and the path cost. Unreached targets get an
+            empty array and ``math.inf``.
+
+        Raises:
+            ValueError: If the pool was closed.
+        """
+        if self._executor is None:
+            raise ValueError('The pool is closed')
+        groups: Dict[int, Dict[int, None]] = {}
+        for source, target in queries:
+            groups.setdefault(int(source), {})[int(target)] = None
+        items = [(source, list(targets)) for source, targets in groups.items()]
+        chunk_size = self.chunk_size or max(
+            1, math.ceil(len(items) / (self.processes * CHUNKS_PER_WORKER))
+        )
+        chunks = [
+            items[begin : begin + chunk_size]
+            for begin in range(0, len(items), chunk_size)
+        ]
+
+        answers: Dict[Tuple[int, int], CoordinateAnswer] = {}
+        for chunk, (coordinates, offsets, costs) in zip(
+            chunks, self._executor.map(_solve_chunk, chunks)
+        ):
+            paths = np.split(coordinates, offsets[1:-1])
+            pairs = (
+                (source, target)
+                for source, targets in chunk
+                for target in targets
+            )
+            for pair, path, cost in zip(pairs, paths, costs.tolist()):
+                answers[pair] = (path, cost)
+        return [answers[int(s), int(t)] for s, t in queries]
+
+
+def _attach_worker(
+    name: str,
+    layout: Tuple[int, int, int],
+    palette: Tuple[List[Type[Node]], array],
+    strategy: PathfindingStrategy,
+):
+    """Map the shared plane as the grid of this worker, once."""
+    n, m, connectivity = layout
+    terrains, weights = palette
+    memory = shared_memory.SharedMemory(name)
+    grid = TerrainGrid(
+        n, m, memory.buf[: n * m], terrains, weights, connectivity
+    )
+    # Keep the block mapped for as long as the worker lives
+    _worker_state.update(memory=memory, grid=grid, strategy=strategy)
+
+
+def _solve_chunk(chunk: Chunk) -> PackedAnswers:
+    """
+    Answer a chunk of sources and pack the paths end to end.
+
+    Returns:
+        PackedAnswers: The int32 (x, y) rows of every path, the offset of
+        each path in them followed by their total, and the costs.
+    """
+    grid: TerrainGrid = _worker_state['grid']
+    strategy: PathfindingStrategy = _worker_state['strategy']
+    cells: List[int] = []
+    offsets = [0]
+    costs = []
+    for source, targets in chunk:
+        for result in strategy.search_many(grid, source, targets):
+            cells.extend(result.indices())
+            offsets.append(len(cells))
+            costs.append(result.cost)
+    xs, ys = np.divmod(np.asarray(cells, dtype=np.int32), grid.m)
+    return (
+        np.stack((xs, ys), axis=1),
+        np.asarray(offsets, dtype=np.int64),
+        np.asarray(costs, dtype=np.float64),
+    )
@@ -1,7 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Union
 
+from pathfinding_challenge.algorithms.stats import SearchStats
 from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
 
 
 class PathfindingStrategy(ABC):
@@ -18,19 +20,28 @@ class PathfindingStrategy(ABC):
 
     @abstractmethod
     def find_path(
-        self, grid: List[List[Node]], start: Node, end: Node
+        self,
+        grid: Union[List[List[Node]], TerrainGrid],
+        start: Node,
+        end: Node,
+        stats: Optional[SearchStats] = None,
     ) -> List[Node]:
         """
         Find a path from the start node to the end node.
 
         Args:
-            grid (List[List[Node]]): The grid representing the terrain.
+            grid (Union[List[List[Node]], TerrainGrid]): The grid
+                representing the terrain.
             start (Node): The starting node.
             end (Node): The ending node.
+            stats (Optional[SearchStats]): Collector the search counters
+                and timings are added to. Defaults to None, which collects
+                nothing.
 
         Returns:
             List[Node]: A list of nodes representing the
-            path from start to end.
+            path from start to end. Strategies return a ``Path``, which
+            also carries the path cost.
         """
         pass  # pragma: no cover
 
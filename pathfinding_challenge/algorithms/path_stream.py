@@ -0,0 +1,156 @@
+import struct
+from array import array
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, Optional, TextIO, Tuple
+
+import numpy as np
+
+from pathfinding_challenge.algorithms.grid_search import SearchResult
+from pathfinding_challenge.entities.path import Path
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+MAGIC = b'PFP1'
+HEADER = struct.Struct('<4sId')
+POSITION = np.dtype('<u4')
+CHUNK_STEPS = 1 << 16
+
+
+@dataclass(slots=True)
+class PathStream:
+    """
+    Path of a search result, read as (x, y) positions without nodes.
+
+    Parent pointers run from the target back to the source, so iterating
+    backwards is free while iterating forwards first gathers the cell
+    indices, four bytes per step. Nodes are only built by ``nodes``.
+
+    Attributes:
+        grid (TerrainGrid): The searched grid.
+        result (SearchResult): The search result holding the parents.
+    """
+
+    grid: TerrainGrid
+    result: SearchResult
+    _cells: Optional[array] = field(default=None, repr=False)
+
+    @property
+    def cost(self) -> float:
+        """The cost of the path, ``math.inf`` if the target was missed."""
+        return self.result.cost
+
+    def cells(self) -> array:
+        """
+        Gather the cell indices along the path, once.
+
+        Returns:
+            array: The int32 linear indices from the first step to the
+            target, the source excluded. Empty if the target was missed.
+        """
+        if self._cells is None:
+            cells = array('i', self._backwards())
+            cells.reverse()
+            self._cells = cells
+        return self._cells
+
+    def _backwards(self) -> Iterator[int]:
+        result = self.result
+        if not result.found:
+            return
+        parents, current = result.parents, result.target
+        while current != result.source:
+            yield current
+            current = int(parents[current])
+
+    def __len__(self) -> int:
+        return len(self.cells())
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        m = self.grid.m
+        for cell in self.cells():
+            yield divmod(cell, m)
+
+    def __reversed__(self) -> Iterator[Tuple[int, int]]:
+        m = self.grid.m
+        for cell in self._backwards():
+            yield divmod(cell, m)
+
+    def nodes(self) -> Path:
+        """Build the nodes along the path, as ``find_path`` returns them."""
+        return Path(self.grid.nodes(self.cells()), self.cost)
+
+    def _chunks(self) -> Iterator[np.ndarray]:
+        """Yield the positions as (steps, 2) arrays of bounded size."""
+        cells = np.frombuffer(self.cells(), dtype=np.int32)
+        for begin in range(0, len(cells), CHUNK_STEPS):
+            xs, ys = np.divmod(cells[begin : begin + CHUNK_STEPS], self.grid.m)
+            yield np.stack((xs, ys), axis=1)
+
+    def write_binary(self, stream: BinaryIO) -> int:
+        """
+        Write the path in the compact binary encoding.
+
+        A header holds the magic bytes, the number of steps and the float64
+        cost, followed by the uint32 (x, y) of each step, little endian.
+        Read it back with ``read_binary_path``.
+
+        Args:
+            stream (BinaryIO): A binary file, or ``socket.makefile('wb')``.
+
+        Returns:
+            int: The number of steps written.
+        """
+        stream.write(HEADER.pack(MAGIC, len(self), self.cost))
+        for chunk in self._chunks():
+            stream.write(chunk.astype(POSITION).tobytes())
+        return len(self)
+
+    def write_ndjson(self, stream: TextIO) -> int:
+        """
+        Write the path as newline-delimited JSON, one ``[x, y]`` per step.
+
+        Args:
+            stream (TextIO): A text file, or ``socket.makefile('w')``.
+
+        Returns:
+            int: The number of steps written.
+        """
+        for chunk in self._chunks():
+            stream.write(''.join(f'[{x},{y}]\n' for x, y in chunk.tolist()))
+        return len(self)
+
+
+def read_binary_path(
+    stream: BinaryIO,
+) -> Tuple[float, Iterator[Tuple[int, int]]]:
+    """
+    Read a path written by ``PathStream.write_binary``.
+
+    Args:
+        stream (BinaryIO): The stream, positioned at the header.
+
+    Returns:
+        Tuple[float, Iterator[Tuple[int, int]]]: The cost and a generator
+        reading the (x, y) of each step as it goes.
+
+    Raises:
+        ValueError: If the stream does not start with a path header.
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError('Truncated path header')
+    magic, steps, cost = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError('Not a path stream')
+
+    def positions() -> Iterator[Tuple[int, int]]:
+        remaining = steps
+        while remaining:
+            count = min(remaining, CHUNK_STEPS)
+            data = stream.read(count * 2 * POSITION.itemsize)
+            if len(data) < count * 2 * POSITION.itemsize:
+                raise ValueError('Truncated path stream')
+            for x, y in np.frombuffer(data, POSITION).reshape(-1, 2).tolist():
+                yield x, y
+            remaining -= count
+
+    return cost, positions()
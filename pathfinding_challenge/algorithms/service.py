@@ -0,0 +1,167 @@
+import asyncio
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
+
+from pathfinding_challenge.algorithms.cancel import CancelToken
+from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.algorithms.grid_search import path_nodes
+from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.path import Path
+from pathfinding_challenge.entities.terrain_grid import TerrainGrid
+
+Query = Tuple[int, int]
+
+
+@dataclass(slots=True)
+class _InFlight:
+    """A running search and the number of callers awaiting it."""
+
+    future: 'asyncio.Future[Path]'
+    token: CancelToken
+    waiters: int = 0
+
+
+@dataclass(slots=True)
+class AsyncPathfinder:
+    """
+    Asyncio front-end running searches off the event loop.
+
+    Searches run on an executor so the loop stays responsive. Callers
+    asking for a start/end pair already being searched await the same
+    search instead of starting another one. A caller giving up, on its
+    deadline or by being cancelled, only stops the search once no other
+    caller awaits it: the search polls a ``CancelToken`` and stops within
+    ``CHECK_INTERVAL`` expansions.
+
+    The token is shared memory, so the executor must run threads. Leave
+    it to None to use the default executor of the loop.
+
+    Attributes:
+        grid (TerrainGrid): The compact grid searched.
+        strategy (PathfindingStrategy): A strategy providing ``search``.
+            Defaults to ``DijkstraStrategy``.
+        executor (Optional[Executor]): The thread pool searches run on.
+            Defaults to None, the default executor of the loop.
+        searches (int): Searches started.
+        coalesced (int): Calls answered by a search already running.
+        cancelled (int): Searches stopped because every caller gave up.
+    """
+
+    grid: TerrainGrid
+    strategy: PathfindingStrategy = field(default_factory=DijkstraStrategy)
+    executor: Optional[Executor] = None
+    searches: int = 0
+    coalesced: int = 0
+    cancelled: int = 0
+    _in_flight: Dict[Query, _InFlight] = field(
+        default_factory=dict, repr=False
+    )
+
+    def __post_init__(self):
+        if not hasattr(self.strategy, 'search'):
+            raise NotImplementedError(
+                'Strategy must implement the search method'
+            )
+
+    @classmethod
+    def for_grid(
+        cls,
+        grid: Union[List[List[Node]], TerrainGrid],
+        strategy: Optional[PathfindingStrategy] = None,
+        executor: Optional[Executor] = None,
+    ) -> 'AsyncPathfinder':
+        """
+        Build a pathfinder, packing grids of nodes into a compact grid.
+
+        Args:
+            grid (Union[List[List[Node]], TerrainGrid]): The grid.
+            strategy (Optional[PathfindingStrategy]): A strategy providing
+                ``search``. Defaults to None, which uses Dijkstra.
+            executor (Optional[Executor]): The thread pool searches run
+                on. Defaults to None, the default executor of the loop.
+
+        Returns:
+            AsyncPathfinder: The pathfinder.
+        """
+        if not isinstance(grid, TerrainGrid):
+            grid = TerrainGrid.from_nodes(grid)
+        return cls(grid, strategy or DijkstraStrategy(), executor)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of searches currently running."""
+        return len(self._in_flight)
+
+    async def find(
+        self, start: Node, end: Node, timeout: Optional[float] = None
+    ) -> Path:
+        """
+        Find the path from the start node to the end node.
+
+        Args:
+            start (Node): The starting node.
+            end (Node): The destination node.
+            timeout (Optional[float]): Seconds this caller waits for the
+                path. Defaults to None, which waits until it is found.
+
+        Returns:
+            Path: The nodes from the first step to the end node, with the
+            path cost. Empty, with an infinite cost, if the end node is
+            unreachable.
+
+        Raises:
+            TimeoutError: If the timeout expired first. On Python 3.10 it
+                is ``asyncio.TimeoutError``.
+        """
+        query = (
+            self.grid.index(start.position.x, start.position.y),
+            self.grid.index(end.position.x, end.position.y),
+        )
+        entry = self._in_flight.get(query)
+        if entry is None:
+            entry = self._start(query)
+        else:
+            self.coalesced += 1
+        entry.waiters += 1
+        try:
+            path = await asyncio.wait_for(
+                asyncio.shield(entry.future), timeout
+            )
+        finally:
+            self._release(query, entry)
+        return path.copy()
+
+    def _release(self, query: Query, entry: _InFlight):
+        """Let a caller go, stopping the search if it was the last one."""
+        entry.waiters -= 1
+        if not entry.waiters and not entry.future.done():
+            entry.token.cancel()
+            self._in_flight.pop(query, None)
+            self.cancelled += 1
+
+    def _start(self, query: Query) -> _InFlight:
+        """Start searching for a query on the executor."""
+        token = CancelToken()
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, self._search, query, token
+        )
+        entry = _InFlight(future, token)
+        self._in_flight[query] = entry
+        self.searches += 1
+
+        def finished(future: 'asyncio.Future[Path]'):
+            if self._in_flight.get(query) is entry:
+                del self._in_flight[query]
+            # Searches nobody awaits anymore end with SearchCancelled
+            if not future.cancelled():
+                future.exception()
+
+        future.add_done_callback(finished)
+        return entry
+
+    def _search(self, query: Query, token: CancelToken) -> Path:
+        """Run one search, on an executor thread."""
+        result = self.strategy.search(self.grid, *query, cancel=token)
+        return path_nodes(self.grid, result)
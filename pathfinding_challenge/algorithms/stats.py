@@ -0,0 +1,93 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, Optional, Union
+
+
+@dataclass(slots=True)
+class SearchStats:
+    """
+    Counters and timings collected while searching a path.
+
+    Attributes:
+        expanded (int): Nodes whose neighbors were scanned.
+        pushes (int): Entries pushed to the open set, decrease-key updates
+            included.
+        pops (int): Entries popped from the open set.
+        stale_pops (int): Popped entries discarded because their node had
+            already been expanded.
+        reopened (int): Nodes expanded again after a cheaper path to them
+            was found.
+        max_open_size (int): Largest number of entries in the open set.
+        timings (Dict[str, float]): Seconds spent in each search phase.
+    """
+
+    expanded: int = 0
+    pushes: int = 0
+    pops: int = 0
+    stale_pops: int = 0
+    reopened: int = 0
+    max_open_size: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def add_timing(self, phase: str, seconds: float):
+        """
+        Add time spent in a phase.
+
+        Args:
+            phase (str): The phase name, e.g. ``'search'``.
+            seconds (float): The time to add.
+        """
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time the body of a ``with`` block as a phase.
+
+        Args:
+            name (str): The phase name.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_timing(name, time.perf_counter() - started)
+
+    def merge(self, other: 'SearchStats'):
+        """
+        Accumulate the counters and timings of another search.
+
+        Args:
+            other (SearchStats): The stats to add to these ones.
+        """
+        self.expanded += other.expanded
+        self.pushes += other.pushes
+        self.pops += other.pops
+        self.stale_pops += other.stale_pops
+        self.reopened += other.reopened
+        self.max_open_size = max(self.max_open_size, other.max_open_size)
+        for phase, seconds in other.timings.items():
+            self.add_timing(phase, seconds)
+
+
+StatsCallback = Callable[[SearchStats], None]
+StatsHook = Union[SearchStats, StatsCallback]
+
+
+def resolve_stats_hook(
+    hook: Optional[StatsHook],
+) -> Optional[SearchStats]:
+    """
+    Return the collector a search should fill for a caller hook.
+
+    Args:
+        hook (Optional[StatsHook]): A collector, a callback or None.
+
+    Returns:
+        Optional[SearchStats]: The collector itself, a new collector for a
+        callback, or None when stats are off.
+    """
+    if hook is None or isinstance(hook, SearchStats):
+        return hook
+    return SearchStats()
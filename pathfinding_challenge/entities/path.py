@@ -0,0 +1,36 @@
+import math
+from typing import Iterable
+
+from pathfinding_challenge.entities.node import Node
+
+
+class Path(list):
+    """
+    List of nodes returned by a strategy, along with its cost.
+
+    Like every strategy result, the nodes run from the first step to the
+    end node, the start node excluded. The cost is the one the search
+    settled on, start edge included, so it never has to be recomputed.
+
+    Attributes:
+        cost (float): The cost of reaching the end node, ``math.inf`` if
+            it was not reached.
+    """
+
+    __slots__ = ('cost',)
+
+    def __init__(self, nodes: Iterable[Node] = (), cost: float = 0.0):
+        super().__init__(nodes)
+        self.cost = cost
+
+    @classmethod
+    def unreachable(cls) -> 'Path':
+        """Return the empty path of a search that missed its end node."""
+        return cls((), math.inf)
+
+    def copy(self) -> 'Path':
+        """Return a shallow copy keeping the cost."""
+        return Path(self, self.cost)
+
+    def __reduce__(self):
+        return (Path, (list(self), self.cost))
@@ -0,0 +1,272 @@
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Type
+
+import numpy as np
+
+from pathfinding_challenge.entities.down_hill import DownHill
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.plateau import Plateau
+from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.up_hill import UpHill
+from pathfinding_challenge.entities.valley import Valley
+
+VALLEY = 0
+UP_HILL = 1
+DOWN_HILL = 2
+PLATEAU = 3
+
+TERRAIN_TYPES: Tuple[Type[Node], ...] = (Valley, UpHill, DownHill, Plateau)
+MAX_TERRAIN_CODES = 256
+
+
+def _default_terrains() -> List[Type[Node]]:
+    return list(TERRAIN_TYPES)
+
+
+def _default_weights() -> array:
+    return array('f', (terrain().weight for terrain in TERRAIN_TYPES))
+
+
+@dataclass(slots=True)
+class TerrainGrid:
+    """
+    Compact NxM grid storing one terrain code per cell.
+
+    Cells are kept in a contiguous uint8 plane indexed by ``x * m + y``.
+    Each code points to an entry of a small palette made of a terrain
+    type and its float32 weight, so a cell costs a single byte no matter
+    how large the map is. ``Node`` objects are only built on demand.
+
+    The grid also supports ``grid[x][y]`` and ``len(grid)``, so code
+    written for ``List[List[Node]]`` grids keeps working on it.
+
+    Attributes:
+        n (int): Number of rows in the grid.
+        m (int): Number of columns in the grid.
+        codes (array): The uint8 terrain-code plane, row major. Any
+            buffer of bytes works, e.g. a memoryview over a mapped file.
+        terrains (List[Type[Node]]): Terrain type of each palette code.
+        weights (array): The float32 weight of each palette code.
+        connectivity (int): The neighborhood the grid is meant for, 4 or 8.
+            Only kept as metadata; each strategy uses its own moves.
+    """
+
+    n: int
+    m: int
+    codes: array
+    terrains: List[Type[Node]] = field(default_factory=_default_terrains)
+    weights: array = field(default_factory=_default_weights)
+    connectivity: int = 8
+    _min_weight: Optional[float] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if len(self.codes) != self.n * self.m:
+            raise ValueError(
+                f'Expected {self.n * self.m} terrain codes, '
+                f'got {len(self.codes)}'
+            )
+        if len(self.terrains) != len(self.weights):
+            raise ValueError('Each terrain code must have a weight')
+
+    @classmethod
+    def from_nodes(cls, grid: List[List[Node]]) -> 'TerrainGrid':
+        """
+        Build a compact grid from a grid of nodes.
+
+        Args:
+            grid (List[List[Node]]): The grid of nodes to convert.
+
+        Returns:
+            TerrainGrid: The equivalent compact grid.
+
+        Raises:
+            ValueError: If the rows have different lengths or the grid holds
+            more distinct (terrain, weight) pairs than codes available.
+        """
+        n = len(grid)
+        m = len(grid[0]) if n else 0
+        terrain_grid = cls(n, m, array('B', bytes(n * m)))
+        palette: Dict[Tuple[Type[Node], float], int] = {
+            (terrain, weight): code
+            for code, (terrain, weight) in enumerate(
+                zip(terrain_grid.terrains, terrain_grid.weights)
+            )
+        }
+        codes = terrain_grid.codes
+        for x, row in enumerate(grid):
+            if len(row) != m:
+                raise ValueError('All grid rows must have the same length')
+            for y, node in enumerate(row):
+                key = (type(node), array('f', (node.weight,))[0])
+                code = palette.get(key)
+                if code is None:
+                    code = terrain_grid.add_terrain(*key)
+                    palette[key] = code
+                codes[x * m + y] = code
+        return terrain_grid
+
+    def add_terrain(self, terrain: Type[Node], weight: float) -> int:
+        """
+        Register a new (terrain, weight) pair in the palette.
+
+        Args:
+            terrain (Type[Node]): The terrain type.
+            weight (float): The weight of the terrain.
+
+        Returns:
+            int: The code assigned to the new pair.
+
+        Raises:
+            ValueError: If the palette is already full.
+        """
+        if len(self.terrains) >= MAX_TERRAIN_CODES:
+            raise ValueError(
+                f'A grid supports at most {MAX_TERRAIN_CODES} terrain codes'
+            )
+        self.terrains.append(terrain)
+        self.weights.append(weight)
+        self.invalidate()
+        return len(self.terrains) - 1
+
+    def set_node(self, x: int, y: int, node: Node):
+        """
+        Store the terrain and weight of a node in the cell at (x, y).
+
+        Args:
+            x (int): The row of the cell.
+            y (int): The column of the cell.
+            node (Node): The node whose terrain the cell takes.
+
+        Raises:
+            ValueError: If the pair is new and the palette is already full.
+        """
+        key = (type(node), array('f', (node.weight,))[0])
+        for code, pair in enumerate(zip(self.terrains, self.weights)):
+            if pair == key:
+                break
+        else:
+            code = self.add_terrain(*key)
+        self.codes[x * self.m + y] = code
+        self.invalidate()
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every change reported through ``invalidate``."""
+        return self._version
+
+    def invalidate(self):
+        """
+        Report a change: drop the summaries cached for the grid, such as
+        ``min_weight``, and bump ``version``.
+
+        ``set_node`` and ``add_terrain`` do it on their own; call it after
+        writing to ``codes`` or ``weights`` directly.
+        """
+        self._min_weight = None
+        self._version += 1
+
+    def as_array(self) -> np.ndarray:
+        """Return a zero-copy (n, m) uint8 NumPy view of the code plane."""
+        return np.frombuffer(self.codes, dtype=np.uint8).reshape(
+            self.n, self.m
+        )
+
+    def weight_array(self) -> np.ndarray:
+        """Return the palette weights as a float32 NumPy array."""
+        return np.frombuffer(self.weights, dtype=np.float32)
+
+    def terrain_counts(self) -> np.ndarray:
+        """Return the number of cells holding each palette code."""
+        return np.bincount(
+            self.as_array().reshape(-1), minlength=len(self.weights)
+        )
+
+    def min_weight(self) -> float:
+        """
+        Return the smallest weight among the terrains present in the grid.
+
+        Palette entries no cell uses are ignored, and an empty grid has a
+        minimum weight of 0. The scan runs once and is cached until the
+        grid changes, see ``invalidate``.
+        """
+        if self._min_weight is None:
+            present = self.weight_array()[self.terrain_counts() > 0]
+            self._min_weight = float(present.min()) if present.size else 0.0
+        return self._min_weight
+
+    def checksum(self) -> int:
+        """
+        Return a CRC32 of the code plane and the palette weights.
+
+        Data precomputed for a grid, such as search tables, can keep it to
+        detect being reused on another map.
+        """
+        return zlib.crc32(bytes(self.weights), zlib.crc32(self.codes))
+
+    def index(self, x: int, y: int) -> int:
+        """Return the linear index of the cell at (x, y)."""
+        return x * self.m + y
+
+    def position(self, index: int) -> Position:
+        """Return the position of the cell at a linear index."""
+        x, y = divmod(index, self.m)
+        return Position(x, y)
+
+    def weight(self, x: int, y: int) -> float:
+        """Return the weight of the cell at (x, y)."""
+        return self.weights[self.codes[x * self.m + y]]
+
+    def node(self, x: int, y: int) -> Node:
+        """
+        Build a node view of the cell at (x, y).
+
+        Args:
+            x (int): The row of the cell.
+            y (int): The column of the cell.
+
+        Returns:
+            Node: A new node holding the cell terrain, weight and position.
+        """
+        code = self.codes[x * self.m + y]
+        return self.terrains[code](
+            weight=self.weights[code], position=Position(x, y)
+        )
+
+    def nodes(self, indices: Iterable[int]) -> List[Node]:
+        """Build node views for a sequence of linear indices."""
+        return [self.node(*divmod(index, self.m)) for index in indices]
+
+    def to_nodes(self) -> List[List[Node]]:
+        """Expand the compact grid into a grid of nodes."""
+        return [
+            [self.node(x, y) for y in range(self.m)] for x in range(self.n)
+        ]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, x: int) -> '_TerrainRow':
+        if not 0 <= x < self.n:
+            raise IndexError('TerrainGrid row index out of range')
+        return _TerrainRow(self, x)
+
+
+@dataclass(slots=True)
+class _TerrainRow:
+    """Lazy row view returned by ``TerrainGrid.__getitem__``."""
+
+    grid: TerrainGrid
+    x: int
+
+    def __len__(self) -> int:
+        return self.grid.m
+
+    def __getitem__(self, y: int) -> Node:
+        if not 0 <= y < self.grid.m:
+            raise IndexError('TerrainGrid column index out of range')
+        return self.grid.node(self.x, y)
@@ -33,14 +33,12 @@ class UpHill(Node):
             MissingAttrError: If the 'position' or 'weight' attribute is
                                     missing in either object.
         """
-        if (
-            not hasattr(self, 'weight')
-            or not hasattr(self, 'position')
-            or not hasattr(other, 'weight')
-            or not hasattr(other, 'position')
-        ):
-            raise MissingAttrError('Missing `position` or `weight` attribute')
-        return self.position == other.position
+        try:
+            return self.position == other.position
+        except AttributeError:
+            raise MissingAttrError(
+                'Missing `position` or `weight` attribute'
+            ) from None
 
     def __lt__(self, other) -> bool:
         """
@@ -57,9 +55,10 @@ class UpHill(Node):
             MissingAttrError: If the 'weight' attribute is missing in
             either object.
         """
-        if not hasattr(self, 'weight') or not hasattr(other, 'weight'):
-            raise MissingAttrError('Missing `weight` attribute')
-        return self.weight < other.weight
+        try:
+            return self.weight < other.weight
+        except AttributeError:
+            raise MissingAttrError('Missing `weight` attribute') from None
 
     def __gt__(self, other) -> bool:
         """
@@ -76,9 +75,10 @@ class UpHill(Node):
             MissingAttrError: If the 'weight' attribute is missing in
             either object.
         """
-        if not hasattr(self, 'weight') or not hasattr(other, 'weight'):
-            raise MissingAttrError('Missing `weight` attribute')
-        return self.weight > other.weight
+        try:
+            return self.weight > other.weight
+        except AttributeError:
+            raise MissingAttrError('Missing `weight` attribute') from None
 
     def __ne__(self, other) -> bool:
         """
@@ -95,6 +95,7 @@ class UpHill(Node):
             MissingAttrError: If the 'weight' attribute is missing in
             either object.
         """
-        if not hasattr(self, 'weight') or not hasattr(other, 'weight'):
-            raise MissingAttrError('Missing `weight` attribute')
-        return self.weight != other.weight
+        try:
+            return self.weight != other.weight
+        except AttributeError:
+            raise MissingAttrError('Missing `weight` attribute') from None
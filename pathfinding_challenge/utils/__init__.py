@@ -1,25 +1,32 @@
-import math
 import random
-from typing import List
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from pathfinding_challenge.entities.down_hill import DownHill
+from pathfinding_challenge.entities.node import Node
 from pathfinding_challenge.entities.plateau import Plateau
 from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import TERRAIN_TYPES
 from pathfinding_challenge.entities.up_hill import UpHill
 from pathfinding_challenge.entities.valley import Valley
+from pathfinding_challenge.utils.generator import generate_codes
+
 
+def generate_terrain(prev_terrain=None, above_terrain=None):
+    """
+    Generate a random terrain type based on continuity rules.
 
-def generate_terrain(prev_terrain=None):
-    """Generate a random terrain type based on continuity rules."""
+    The rules apply to both the previous terrain of the row and the
+    terrain above, like the grid validation of ``Context``.
+    """
     terrain_types = [Valley, UpHill, DownHill, Plateau]
 
-    if prev_terrain == UpHill:
-        # If the previous terrain is UpHill,
-        # the next terrain cannot be Valley
+    if UpHill in {prev_terrain, above_terrain}:
+        # After or below an UpHill, the next terrain cannot be Valley
         terrain_types.remove(Valley)
-    elif prev_terrain == DownHill:
-        # If the previous terrain is DownHill,
-        # the next terrain cannot be Plateau
+    if DownHill in {prev_terrain, above_terrain}:
+        # After or below a DownHill, the next terrain cannot be Plateau
         terrain_types.remove(Plateau)
 
     return random.choice(terrain_types)
@@ -40,7 +47,10 @@ def get_random_edge_position(N: int, M: int) -> Position:
 def create_grid(N: int, M: int) -> List[List[object]]:
     """
     Create an NxM grid with random terrain types, adhering to continuity
-    rules.
+    rules horizontally and vertically.
+
+    The terrain codes come from the vectorized generator, seeded from the
+    ``random`` module so ``random.seed`` keeps the grid reproducible.
 
     Args:
         N (int): Number of rows in the grid.
@@ -50,15 +60,14 @@ def create_grid(N: int, M: int) -> List[List[object]]:
         List[List[object]]: An NxM grid populated with terrain objects.
     """
     grid = []
-    prev_terrain = None
-
-    for x in range(N):
-        row = []
-        for y in range(M):
-            terrain_type = generate_terrain(prev_terrain)
-            prev_terrain = terrain_type
-            row.append(terrain_type(position=Position(x, y)))
-        grid.append(row)
+    x = 0
+    for block in generate_codes(N, M, seed=random.getrandbits(64)):
+        for codes in block.tolist():
+            grid.append([
+                TERRAIN_TYPES[code](position=Position(x, y))
+                for y, code in enumerate(codes)
+            ])
+            x += 1
 
     return grid
 
@@ -71,18 +80,110 @@ def print_grid(grid: List[List[object]]):
         print(' '.join(symbols[type(cell)] for cell in row))
 
 
-def compute_path_cost(path):
-    for i, node in enumerate(path[:-1]):
-        node1 = node
-        node2 = path[i + 1]
-        path_cost = (
-            math.sqrt(
-                (node2.position.x - node1.position.x) ** 2
-                + (node2.position.y - node1.position.y) ** 2
-            )
-            + node2.weight
-        )
-    if path_cost:
-        return path_cost
+def path_arrays(
+    path: Sequence[Node], start: Optional[Node] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gather the coordinates and weights of the nodes of a path.
+
+    Args:
+        path (Sequence[Node]): The nodes of the path.
+        start (Optional[Node]): A node to put before the path, such as the
+            start node strategies leave out. Defaults to None.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: The x, y and weight of
+        each node.
+    """
+    nodes = list(path) if start is None else [start, *path]
+    xs = np.fromiter((node.position.x for node in nodes), np.float64)
+    ys = np.fromiter((node.position.y for node in nodes), np.float64)
+    weights = np.fromiter((node.weight for node in nodes), np.float64)
+    return xs, ys, weights
+
+
+def path_costs_from_arrays(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    weights: np.ndarray,
+    offsets: Optional[Sequence[int]] = None,
+) -> np.ndarray:
+    """
+    Sum the edge costs along paths laid end to end in flat arrays.
+
+    Each edge costs its Euclidean length plus the weight of the node it
+    enters, like ``DijkstraStrategy.calculate_distance``. The first node
+    of a path is where it starts, so its weight is not paid.
+
+    Args:
+        xs (np.ndarray): The x coordinate of each node.
+        ys (np.ndarray): The y coordinate of each node.
+        weights (np.ndarray): The weight of each node.
+        offsets (Optional[Sequence[int]]): The index of the first node of
+            each path, followed by the total number of nodes. Defaults to
+            None, which treats the arrays as a single path.
+
+    Returns:
+        np.ndarray: The float64 cost of each path.
+    """
+    size = len(xs)
+    if offsets is None:
+        offsets = [0, size]
+    offsets = np.asarray(offsets, dtype=np.int64)
+    entering = np.zeros(size)
+    entering[1:] = np.hypot(np.diff(xs), np.diff(ys)) + weights[1:]
+    starts = offsets[:-1]
+    entering[starts[starts < size]] = 0.0
+    if not size:
+        return np.zeros(len(starts))
+    costs = np.add.reduceat(entering, np.minimum(starts, size - 1))
+    costs[offsets[1:] == starts] = 0.0
+    return costs
+
+
+def compute_path_cost(
+    path: Sequence[Node], start: Optional[Node] = None
+) -> float:
+    """
+    Compute the cost of a path.
+
+    Args:
+        path (Sequence[Node]): The nodes of the path.
+        start (Optional[Node]): The node the path starts from, when the
+            path leaves it out as strategies do. Its edge to the first node
+            is then included. Defaults to None.
+
+    Returns:
+        float: The sum of the edge costs along the path, 0 for an empty
+        path.
+    """
+    return float(path_costs_from_arrays(*path_arrays(path, start))[0])
+
+
+def compute_path_costs(
+    paths: Sequence[Sequence[Node]],
+    starts: Optional[Sequence[Node]] = None,
+) -> np.ndarray:
+    """
+    Compute the cost of many paths in a single vectorized pass.
+
+    Args:
+        paths (Sequence[Sequence[Node]]): The paths.
+        starts (Optional[Sequence[Node]]): The start node of each path,
+            when the paths leave it out. Defaults to None.
+
+    Returns:
+        np.ndarray: The float64 cost of each path.
+    """
+    if starts is None:
+        nodes = [node for path in paths for node in path]
+        lengths = [len(path) for path in paths]
     else:
-        return 0
+        nodes = [
+            node
+            for start, path in zip(starts, paths)
+            for node in (start, *path)
+        ]
+        lengths = [len(path) + 1 for path in paths]
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    return path_costs_from_arrays(*path_arrays(nodes), offsets)
@@ -0,0 +1,199 @@
+from array import array
+from typing import Iterator, Optional
+
+import numpy as np
+
+from pathfinding_challenge.entities.terrain_grid import (
+    DOWN_HILL,
+    PLATEAU,
+    UP_HILL,
+    VALLEY,
+    TerrainGrid,
+)
+from pathfinding_challenge.utils.grid_io import pack_header
+
+BLOCK_CELLS = 1 << 20
+
+
+def _packed(terrains) -> np.ndarray:
+    """Pack four 2-bit terrain codes, indexed by previous terrain, a byte."""
+    return (
+        terrains[VALLEY]
+        | terrains[UP_HILL] << 2
+        | terrains[DOWN_HILL] << 4
+        | terrains[PLATEAU] << 6
+    )
+
+
+def _compose_table() -> np.ndarray:
+    """
+    Build the table composing two packed transition maps.
+
+    ``table[after, before]`` is the packed map of applying ``before`` then
+    ``after``.
+
+    Returns:
+        np.ndarray: A (256, 256) uint8 lookup table.
+    """
+    maps = np.arange(256, dtype=np.uint8)
+    entries = [(maps >> (2 * terrain)) & 3 for terrain in range(4)]
+    composed = [
+        (maps[:, None] >> (2 * entries[terrain][None, :])) & 3
+        for terrain in range(4)
+    ]
+    return _packed(composed).astype(np.uint8)
+
+
+COMPOSE = _compose_table()
+
+
+FORBIDDEN_CODES = ((UP_HILL, VALLEY), (DOWN_HILL, PLATEAU))
+
+
+def _transition_table() -> np.ndarray:
+    """
+    Build the packed transition map of each upper terrain and draw.
+
+    ``table[above, draw]`` sends the terrain of the left neighbor of a cell
+    to the terrain of the cell, following the continuity rules of
+    ``generate_terrain`` against both neighbors: no Valley right of or
+    below an UpHill, and no Plateau right of or below a DownHill. The
+    draw picks uniformly among the allowed terrains, as there are 4, 3 or
+    2 of them and 12 draws.
+
+    Returns:
+        np.ndarray: A (4, 12) uint8 lookup table.
+    """
+    table = np.zeros((4, 12), dtype=np.uint8)
+    for above in range(4):
+        for draw in range(12):
+            terrains = {}
+            for left in range(4):
+                allowed = [
+                    terrain
+                    for terrain in range(4)
+                    if (left, terrain) not in FORBIDDEN_CODES
+                    and (above, terrain) not in FORBIDDEN_CODES
+                ]
+                terrains[left] = allowed[draw % len(allowed)]
+            table[above, draw] = _packed(terrains)
+    return table
+
+
+TRANSITIONS = _transition_table()
+
+
+def _chain(maps: np.ndarray, previous: int) -> np.ndarray:
+    """
+    Resolve a run of transition maps starting from a known terrain.
+
+    The maps are composed with a parallel prefix scan, so the sequential
+    dependency between neighbors costs log2(cells) array passes instead of
+    a Python loop over the cells.
+
+    Args:
+        maps (np.ndarray): Packed transition maps, one per cell.
+        previous (int): Terrain code of the cell before the run.
+
+    Returns:
+        np.ndarray: The uint8 terrain code of each cell of the run.
+    """
+    prefix = maps.copy()
+    shift = 1
+    while shift < len(prefix):
+        prefix[shift:] = COMPOSE[prefix[shift:], prefix[:-shift]]
+        shift *= 2
+    return (prefix >> (2 * previous)) & 3
+
+
+def generate_codes(
+    n: int,
+    m: int,
+    seed: Optional[int] = None,
+    block_rows: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Generate the terrain-code plane of an NxM grid in row blocks.
+
+    Cells follow the same continuity rules as ``create_grid`` towards
+    their left and upper neighbors, so the grids pass the validation of
+    ``Context``. Each row is resolved from the one above it, and the last
+    row of a block carries over to the next one.
+
+    Args:
+        n (int): Number of rows in the grid.
+        m (int): Number of columns in the grid.
+        seed (Optional[int]): Seed of the random generator.
+        block_rows (Optional[int]): Rows per yielded block. Defaults to
+            about a million cells per block.
+
+    Yields:
+        np.ndarray: (rows, m) uint8 blocks of terrain codes.
+    """
+    rng = np.random.default_rng(seed)
+    if block_rows is None:
+        block_rows = max(1, BLOCK_CELLS // max(m, 1))
+    # The first row has no constraint from above, like below a Valley
+    above = np.full(m, VALLEY, dtype=np.uint8)
+    for first_row in range(0, n, block_rows):
+        rows = min(block_rows, n - first_row)
+        draws = rng.integers(0, 12, size=(rows, m), dtype=np.uint8)
+        codes = np.empty((rows, m), dtype=np.uint8)
+        for row in range(rows):
+            # The first cell of a row has no left neighbor either
+            codes[row] = _chain(TRANSITIONS[above, draws[row]], VALLEY)
+            above = codes[row]
+        yield codes
+
+
+def generate_grid(n: int, m: int, seed: Optional[int] = None) -> TerrainGrid:
+    """
+    Generate a random compact grid with the vectorized generator.
+
+    Args:
+        n (int): Number of rows in the grid.
+        m (int): Number of columns in the grid.
+        seed (Optional[int]): Seed of the random generator.
+
+    Returns:
+        TerrainGrid: The generated grid.
+    """
+    codes = array('B')
+    for block in generate_codes(n, m, seed):
+        codes.frombytes(block.tobytes())
+    return TerrainGrid(n, m, codes)
+
+
+def write_generated_grid(
+    path: str,
+    n: int,
+    m: int,
+    seed: Optional[int] = None,
+    block_rows: Optional[int] = None,
+):
+    """
+    Generate a grid straight into a grid file, one row block at a time.
+
+    Only one block is held in memory, so maps larger than RAM can be
+    generated and later opened with ``load_grid``.
+
+    Args:
+        path (str): The destination file.
+        n (int): Number of rows in the grid.
+        m (int): Number of columns in the grid.
+        seed (Optional[int]): Seed of the random generator.
+        block_rows (Optional[int]): Rows generated per block.
+    """
+    palette = TerrainGrid(0, 0, array('B'))
+    with open(path, 'wb') as file:
+        file.write(
+            pack_header(
+                n,
+                m,
+                palette.connectivity,
+                palette.terrains,
+                palette.weights,
+            )
+        )
+        for block in generate_codes(n, m, seed, block_rows):
+            file.write(block.tobytes())
@@ -0,0 +1,150 @@
+import mmap
+import struct
+from array import array
+from typing import List, Optional, Sequence, Tuple, Type, Union
+
+from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.terrain_grid import (
+    TERRAIN_TYPES,
+    TerrainGrid,
+)
+
+MAGIC = b'PFG1'
+HEADER = struct.Struct('<4sIIBxH')
+PALETTE_ENTRY = struct.Struct('<Bf')
+CONNECTIVITIES = (4, 8)
+
+
+def pack_header(
+    n: int,
+    m: int,
+    connectivity: int,
+    terrains: Sequence[Type[Node]],
+    weights: Sequence[float],
+) -> bytes:
+    """
+    Encode the header of a grid file.
+
+    The header holds the magic bytes, N, M, the connectivity and the
+    palette of (terrain kind, float32 weight) entries. The uint8 code plane
+    follows it directly.
+
+    Args:
+        n (int): Number of rows in the grid.
+        m (int): Number of columns in the grid.
+        connectivity (int): The neighborhood the grid is meant for, 4 or 8.
+        terrains (Sequence[Type[Node]]): Terrain type of each code.
+        weights (Sequence[float]): Weight of each code.
+
+    Returns:
+        bytes: The encoded header.
+
+    Raises:
+        ValueError: If the connectivity is not 4 or 8, or a terrain type
+        has no kind in the file format.
+    """
+    if connectivity not in CONNECTIVITIES:
+        raise ValueError('Connectivity must be 4 or 8')
+    palette = []
+    for terrain, weight in zip(terrains, weights):
+        if terrain not in TERRAIN_TYPES:
+            raise ValueError(f'Cannot store terrain {terrain.__name__}')
+        palette.append(
+            PALETTE_ENTRY.pack(TERRAIN_TYPES.index(terrain), weight)
+        )
+    header = HEADER.pack(MAGIC, n, m, connectivity, len(palette))
+    return header + b''.join(palette)
+
+
+def unpack_header(
+    buffer: bytes,
+) -> Tuple[int, int, int, List[Type[Node]], List[float], int]:
+    """
+    Decode the header of a grid file.
+
+    Args:
+        buffer (bytes): The beginning of the file.
+
+    Returns:
+        Tuple[int, int, int, List[Type[Node]], List[float], int]: N, M, the
+        connectivity, the palette terrains and weights, and the offset of
+        the code plane.
+
+    Raises:
+        ValueError: If the buffer does not hold a grid file header.
+    """
+    if len(buffer) < HEADER.size:
+        raise ValueError('Truncated grid file header')
+    magic, n, m, connectivity, palette_size = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise ValueError('Not a grid file')
+    terrains, weights = [], []
+    offset = HEADER.size
+    for _ in range(palette_size):
+        kind, weight = PALETTE_ENTRY.unpack_from(buffer, offset)
+        terrains.append(TERRAIN_TYPES[kind])
+        weights.append(weight)
+        offset += PALETTE_ENTRY.size
+    return n, m, connectivity, terrains, weights, offset
+
+
+def write_grid(
+    path: str,
+    grid: Union[List[List[Node]], TerrainGrid],
+    connectivity: Optional[int] = None,
+):
+    """
+    Write a grid to disk in the compact binary format.
+
+    Args:
+        path (str): The destination file.
+        grid (Union[List[List[Node]], TerrainGrid]): The grid to store.
+            Node grids are converted first.
+        connectivity (Optional[int]): The neighborhood the grid is meant
+            for. Defaults to the connectivity of the grid.
+    """
+    if not isinstance(grid, TerrainGrid):
+        grid = TerrainGrid.from_nodes(grid)
+    if connectivity is None:
+        connectivity = grid.connectivity
+    with open(path, 'wb') as file:
+        file.write(
+            pack_header(
+                grid.n, grid.m, connectivity, grid.terrains, grid.weights
+            )
+        )
+        file.write(grid.codes)
+
+
+def load_grid(path: str, writable: bool = False) -> TerrainGrid:
+    """
+    Memory-map a grid file into a TerrainGrid without copying it.
+
+    The code plane is a view over the mapped file, so only the pages a
+    search actually reads are loaded from disk.
+
+    Args:
+        path (str): The grid file.
+        writable (bool): Map the file copy-on-write so cells can be edited
+            in memory without touching the file. Defaults to False.
+
+    Returns:
+        TerrainGrid: The grid backed by the mapped file.
+
+    Raises:
+        ValueError: If the file is not a grid file or is truncated.
+    """
+    access = mmap.ACCESS_COPY if writable else mmap.ACCESS_READ
+    with open(path, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=access)
+    n, m, connectivity, terrains, weights, offset = unpack_header(mapped)
+    if len(mapped) - offset != n * m:
+        raise ValueError('Truncated grid file')
+    return TerrainGrid(
+        n,
+        m,
+        memoryview(mapped)[offset:],
+        terrains,
+        array('f', weights),
+        connectivity,
+    )
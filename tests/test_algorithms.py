@@ -1,19 +1,87 @@
+import asyncio
+import io
+import json
 import math
+import random
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from unittest.mock import MagicMock
 
+import numpy as np
 import pytest
 
 from pathfinding_challenge.algorithms.a_star import AStarStrategy
+from pathfinding_challenge.algorithms.anytime import AnytimeStrategy
+from pathfinding_challenge.algorithms.bidirectional import (
+    BidirectionalAStarStrategy,
+    BidirectionalDijkstraStrategy,
+)
+from pathfinding_challenge.algorithms.cache import ResultCache
+from pathfinding_challenge.algorithms.cancel import (
+    CancelToken,
+    SearchCancelled,
+)
 from pathfinding_challenge.algorithms.context import Context
 from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.algorithms.grid_search import (
+    NO_PARENT,
+    DistanceField,
+    SearchResult,
+    astar_search,
+    bidirectional_search,
+    dijkstra_distance_field,
+    dijkstra_search,
+)
+from pathfinding_challenge.algorithms.heaps import IndexedHeap
+from pathfinding_challenge.algorithms.heuristics import (
+    EUCLIDEAN,
+    HEURISTICS,
+    MANHATTAN,
+    OCTILE,
+    Heuristic,
+)
+from pathfinding_challenge.algorithms.hierarchical import (
+    HierarchicalGraph,
+    HierarchicalStrategy,
+)
+from pathfinding_challenge.algorithms.incremental import (
+    IncrementalStrategy,
+    LifelongPlanner,
+)
+from pathfinding_challenge.algorithms.jump_point import (
+    JumpPointStrategy,
+    boundary_cells,
+    jump_point_search,
+)
+from pathfinding_challenge.algorithms.landmarks import (
+    LandmarkStrategy,
+    LandmarkTable,
+)
+from pathfinding_challenge.algorithms.neighbors import NeighborTable
+from pathfinding_challenge.algorithms.parallel import SharedGridPool
 from pathfinding_challenge.algorithms.path_finding import PathfindingStrategy
+from pathfinding_challenge.algorithms.path_stream import (
+    PathStream,
+    read_binary_path,
+)
+from pathfinding_challenge.algorithms.service import AsyncPathfinder
+from pathfinding_challenge.algorithms.stats import SearchStats
 from pathfinding_challenge.entities.down_hill import DownHill
 from pathfinding_challenge.entities.node import Node
+from pathfinding_challenge.entities.path import Path
 from pathfinding_challenge.entities.plateau import Plateau
 from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import (
+    DOWN_HILL,
+    UP_HILL,
+    VALLEY,
+    TerrainGrid,
+)
 from pathfinding_challenge.entities.up_hill import UpHill
 from pathfinding_challenge.entities.valley import Valley
+from pathfinding_challenge.utils import compute_path_cost, create_grid
+from pathfinding_challenge.utils.generator import generate_grid
 
 
 def create_3_by_3_flat_terrain_grid():
@@ -321,3 +389,1275 @@ def test_context_run_success():
     path = context.run()
 
     assert path == expected_path, 'The path should match the expected path'
+
+
+def test_default_context_run_returns_empty_path():
+    assert Context().run() == []
+
+
+def test_dijkstra_start_outside_grid():
+    grid = create_3_by_3_flat_terrain_grid()
+    outside = Valley(position=Position(-1, 0))
+
+    path = DijkstraStrategy.find_path(grid, outside, grid[2][2])
+
+    # Three diagonal or straight steps reach the opposite corner
+    assert len(path) == len(grid)
+    assert path[-1] == grid[2][2]
+    assert not DijkstraStrategy.find_path(grid, Valley(), grid[2][2])
+
+
+def total_path_cost(start: Node, path: List[Node]) -> float:
+    cost = 0.0
+    previous = start
+    for node in path:
+        cost += DijkstraStrategy.calculate_distance(previous, node)
+        previous = node
+    return cost
+
+
+@pytest.mark.parametrize('strategy', [AStarStrategy(), DijkstraStrategy()])
+def test_find_path_on_terrain_grid(strategy: PathfindingStrategy):
+    random.seed(7)
+    nodes = create_grid(12, 9)
+    grid = TerrainGrid.from_nodes(nodes)
+    start = nodes[0][0]
+    end = nodes[11][8]
+
+    expected = strategy.find_path(nodes, start, end)
+    path = strategy.find_path(grid, start, end)
+
+    assert path[-1] == end
+    assert all(isinstance(node, Node) for node in path)
+    assert math.isclose(
+        total_path_cost(start, path), total_path_cost(start, expected)
+    )
+
+
+def test_context_run_accepts_terrain_grid():
+    grid = TerrainGrid.from_nodes(create_3_by_3_flat_terrain_grid())
+    context = Context()
+    context.grid = grid
+    context.start = Valley(position=Position(0, 0))
+    context.end = Valley(position=Position(2, 2))
+
+    assert context.grid is grid
+    assert context.run() == [
+        Valley(position=Position(1, 1)),
+        Valley(position=Position(2, 2)),
+    ]
+
+
+def test_astar_search_flat_arrays():
+    grid = TerrainGrid.from_nodes(create_3_by_3_flat_terrain_grid())
+
+    result = astar_search(grid, 0, grid.index(2, 2), AStarStrategy.steps)
+
+    assert result.found
+    assert math.isclose(result.cost, 4 * (1 + 1))
+    assert len(result.indices()) == len(range(4))
+    assert result.indices()[-1] == grid.index(2, 2)
+    assert result.parents[0] == NO_PARENT
+
+
+def test_astar_search_same_source_and_target():
+    grid = TerrainGrid.from_nodes(create_3_by_3_flat_terrain_grid())
+
+    result = astar_search(grid, 4, 4, AStarStrategy.steps)
+
+    assert result.cost == 0
+    assert result.indices() == []
+
+
+def test_indexed_heap_orders_and_decreases_keys():
+    CAPACITY = 5
+    heap = IndexedHeap(CAPACITY)
+    for item, priority in [(0, 4.0), (1, 2.0), (2, 3.0), (3, 5.0)]:
+        heap.push(item, priority)
+    heap.decrease_key(3, 1.0)
+    heap.push(0, 6.0)
+
+    assert CAPACITY - 1 not in heap
+    assert 0 in heap
+    assert [heap.pop() for _ in range(len(heap))] == [
+        (1.0, 3),
+        (2.0, 1),
+        (3.0, 2),
+        (6.0, 0),
+    ]
+
+
+def test_indexed_heap_errors():
+    heap = IndexedHeap(2)
+    heap.push(0, 1.0)
+
+    with pytest.raises(KeyError):
+        heap.decrease_key(1, 0.0)
+    with pytest.raises(ValueError, match='cannot increase'):
+        heap.decrease_key(0, 2.0)
+    heap.pop()
+    with pytest.raises(IndexError):
+        heap.pop()
+
+
+@pytest.mark.parametrize('indexed_heap', [False, True])
+def test_dijkstra_search_matches_node_dijkstra(indexed_heap: bool):
+    random.seed(11)
+    nodes = create_grid(15, 10)
+    grid = TerrainGrid.from_nodes(nodes)
+    start, end = nodes[0][9], nodes[14][0]
+
+    result = dijkstra_search(
+        grid,
+        grid.index(0, 9),
+        grid.index(14, 0),
+        DijkstraStrategy.steps,
+        indexed_heap=indexed_heap,
+    )
+    expected = DijkstraStrategy.find_path(nodes, start, end)
+
+    assert math.isclose(result.cost, total_path_cost(start, expected))
+    assert grid.nodes(result.indices())[-1] == end
+
+
+@pytest.mark.parametrize(('start_node', 'expected_neighbors_count'), test_data)
+def test_neighbor_table_expand_single_cell(
+    start_node: Node, expected_neighbors_count: int
+):
+    grid = TerrainGrid.from_nodes(create_3_by_3_flat_terrain_grid())
+    cell = grid.index(start_node.position.x, start_node.position.y)
+
+    origins, neighbors, costs = DijkstraStrategy.neighbor_table.expand(
+        grid, np.array([cell])
+    )
+
+    assert len(neighbors) == expected_neighbors_count
+    assert set(origins.tolist()) == {cell}
+    expected = sorted(
+        DijkstraStrategy.calculate_distance(start_node, neighbor)
+        for neighbor in DijkstraStrategy.get_neighbors(
+            create_3_by_3_flat_terrain_grid(), start_node
+        )
+    )
+    assert np.allclose(np.sort(costs), expected)
+
+
+def test_neighbor_table_expand_frontier():
+    grid = TerrainGrid.from_nodes([
+        [Valley(), UpHill(), UpHill()],
+        [DownHill(), DownHill(), Valley()],
+    ])
+    frontier = np.array([grid.index(0, 0), grid.index(1, 2)])
+
+    origins, neighbors, costs = NeighborTable.from_directions(
+        AStarStrategy.allowed_directions
+    ).expand(grid, frontier)
+
+    edges = sorted(zip(origins.tolist(), neighbors.tolist(), costs.tolist()))
+    assert edges == [
+        (0, 1, 1 + 2),
+        (0, 3, 1 + 0.5),
+        (5, 2, 1 + 2),
+        (5, 4, 1 + 0.5),
+    ]
+
+
+@pytest.mark.parametrize(
+    'steps', [AStarStrategy.steps, DijkstraStrategy.steps], ids=['4', '8']
+)
+def test_neighbor_table_distance_field_matches_dijkstra(steps):
+    grid = generate_grid(23, 31, 17)
+    source = grid.index(11, 4)
+
+    field = NeighborTable.from_steps(steps).distance_field(grid, source)
+    expected = dijkstra_distance_field(grid, source, steps)
+
+    np.testing.assert_allclose(field.costs, expected.costs)
+    for target in (0, 200, len(grid.codes) - 1):
+        path = grid.nodes(field.result(target).indices())
+        cost = total_path_cost(grid.node(11, 4), path)
+        assert math.isclose(cost, expected.costs.flat[target])
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+@pytest.mark.parametrize('strategy', [AStarStrategy(), DijkstraStrategy()])
+def test_context_run_batch(strategy: PathfindingStrategy, processes):
+    random.seed(5)
+    nodes = create_grid(10, 10)
+    pairs = [
+        (nodes[0][0], nodes[9][9]),
+        (nodes[0][0], nodes[5][9]),
+        (nodes[9][0], nodes[0][9]),
+        (nodes[0][0], nodes[9][9]),
+    ]
+    with Context() as context:
+        context.grid = nodes
+        context.strategy = strategy
+
+        answers = context.run_batch(pairs, processes=processes)
+
+    assert len(answers) == len(pairs)
+    for (start, end), (path, cost) in zip(pairs, answers):
+        expected = strategy.find_path(nodes, start, end)
+        assert path[-1] == end
+        assert math.isclose(cost, total_path_cost(start, path))
+        assert math.isclose(cost, total_path_cost(start, expected))
+
+
+def test_context_run_batch_keeps_pool():
+    random.seed(5)
+    nodes = create_grid(6, 6)
+    pairs = [(nodes[0][0], nodes[5][5]), (nodes[5][0], nodes[0][5])]
+    context = Context()
+    context.grid = nodes
+
+    first = context.run_batch(pairs, processes=2)
+    pool = context._pool
+    second = context.run_batch(pairs, processes=2)
+
+    assert pool is not None
+    assert context._pool is pool
+    assert [cost for _, cost in first] == [cost for _, cost in second]
+
+    context.revalidate([(2, 2)])
+    assert context._pool is None
+    context.run_batch(pairs, processes=2)
+    assert context._pool is not pool
+
+    context.close()
+    assert context._pool is None
+
+
+def test_context_run_batch_off_grid_pairs():
+    random.seed(5)
+    nodes = create_grid(5, 5)
+    outside = Valley(position=Position(0, 5))
+    pairs = [
+        (nodes[0][0], outside),
+        (outside, nodes[4][4]),
+        (nodes[0][0], nodes[4][4]),
+    ]
+    context = Context()
+    context.grid = nodes
+    context.start, context.end = nodes[0][0], outside
+
+    answers = context.run_batch(pairs)
+
+    assert answers[:2] == [([], math.inf), ([], math.inf)]
+    assert answers[2][0][-1] == nodes[4][4]
+    assert not context.run()
+
+
+def test_context_run_batch_missing_search_many():
+    context = Context(_strategy=object())
+
+    with pytest.raises(NotImplementedError, match='search_many'):
+        context.run_batch([(Valley(), Valley())])
+
+
+def test_dijkstra_distance_field(tmp_path):
+    random.seed(3)
+    nodes = create_grid(8, 6)
+    grid = TerrainGrid.from_nodes(nodes)
+    start = nodes[0][0]
+
+    field = DijkstraStrategy.distance_field(nodes, start)
+
+    assert field.costs.shape == (8, 6)
+    assert field.costs[0, 0] == 0
+    for end in (nodes[7][5], nodes[3][2], nodes[0][5]):
+        expected = DijkstraStrategy.find_path(nodes, start, end)
+        result = field.result(grid.index(end.position.x, end.position.y))
+        assert math.isclose(result.cost, total_path_cost(start, expected))
+        assert grid.nodes(result.indices())[-1] == end
+
+    field.save(str(tmp_path / 'depot'))
+    loaded = DistanceField.load(str(tmp_path / 'depot'))
+
+    assert isinstance(loaded.costs, np.memmap)
+    assert loaded.source == 0
+    assert np.array_equal(loaded.costs, field.costs)
+    assert loaded.result(47).indices() == field.result(47).indices()
+
+    DijkstraStrategy.distance_field(grid, nodes[3][2]).save(
+        str(tmp_path / 'middle')
+    )
+    assert DistanceField.load(str(tmp_path / 'middle')).source == (
+        grid.index(3, 2)
+    )
+
+
+@pytest.mark.parametrize('strategy', [AStarStrategy(), DijkstraStrategy()])
+@pytest.mark.parametrize('compact', [False, True])
+def test_context_run_collects_stats(
+    strategy: PathfindingStrategy, compact: bool
+):
+    random.seed(11)
+    nodes = create_grid(10, 10)
+    context = Context(_strategy=strategy)
+    context.grid = TerrainGrid.from_nodes(nodes) if compact else nodes
+    context.start = nodes[0][0]
+    context.end = nodes[9][9]
+    stats = SearchStats()
+
+    path = context.run(stats=stats)
+
+    assert path == context.run()
+    assert stats.expanded > 0
+    assert stats.pushes >= stats.expanded
+    assert stats.pops == stats.expanded + stats.stale_pops + 1
+    assert 0 < stats.max_open_size <= stats.pushes
+    assert {'search', 'reconstruct'} <= set(stats.timings)
+
+
+def test_context_run_calls_stats_callback():
+    context = Context()
+    context.grid = create_3_by_3_flat_terrain_grid()
+    context.start = context.grid[0][0]
+    context.end = context.grid[2][2]
+    received: List[SearchStats] = []
+
+    context.run(stats=received.append)
+
+    assert len(received) == 1
+    assert received[0].expanded > 0
+
+
+def test_search_stats_counts_stale_pops():
+    random.seed(5)
+    grid = TerrainGrid.from_nodes(create_grid(15, 15))
+
+    result = dijkstra_search(grid, 0, len(grid) - 1, DijkstraStrategy.steps)
+    indexed = dijkstra_search(
+        grid, 0, len(grid) - 1, DijkstraStrategy.steps, indexed_heap=True
+    )
+
+    assert result.stats.stale_pops > 0
+    assert result.stats.pops == (
+        result.stats.expanded + result.stats.stale_pops + 1
+    )
+    assert indexed.stats.stale_pops == 0
+    assert indexed.stats.expanded == result.stats.expanded
+
+
+def test_search_stats_merge():
+    stats = SearchStats(expanded=2, max_open_size=3, timings={'search': 1})
+
+    stats.merge(
+        SearchStats(expanded=1, max_open_size=2, timings={'search': 2})
+    )
+
+    assert stats.expanded == len(range(3))
+    assert stats.max_open_size == len(range(3))
+    assert stats.timings == {'search': 3}
+
+
+@pytest.mark.parametrize('kind', HEURISTICS)
+@pytest.mark.parametrize(
+    'strategy', [AStarStrategy, DijkstraStrategy], ids=['4', '8']
+)
+def test_heuristic_is_admissible_and_consistent(kind: str, strategy):
+    random.seed(13)
+    grid = TerrainGrid.from_nodes(create_grid(12, 12))
+    heuristic = Heuristic.for_grid(grid, strategy.steps, kind)
+    target = grid.index(7, 4)
+    costs = dijkstra_distance_field(grid, target, strategy.steps).costs
+
+    for x in range(grid.n):
+        for y in range(grid.m):
+            estimate = heuristic.estimate(x - 7, y - 4)
+            # Reversing a path swaps which end weight it pays
+            cost = costs[x, y] - grid.weight(x, y) + grid.weight(7, 4)
+            assert estimate <= cost + 1e-9
+            for dx, dy, step in strategy.steps:
+                if 0 <= x + dx < grid.n and 0 <= y + dy < grid.m:
+                    edge = step + grid.weight(x + dx, y + dy)
+                    neighbor = heuristic.estimate(x + dx - 7, y + dy - 4)
+                    assert estimate <= edge + neighbor + 1e-9
+
+
+@pytest.mark.parametrize(
+    ('steps', 'expected'),
+    [(AStarStrategy.steps, MANHATTAN), (DijkstraStrategy.steps, OCTILE)],
+)
+def test_heuristic_picked_from_moves_and_terrains(steps, expected: str):
+    grid = TerrainGrid(1, 2, bytearray([UP_HILL, DOWN_HILL]))
+
+    heuristic = Heuristic.for_grid(grid, steps)
+
+    assert heuristic.kind == expected
+    assert heuristic.estimate(1, 0) == 1 + DownHill().weight
+
+
+def test_heuristic_errors():
+    grid = create_3_by_3_flat_terrain_grid()
+
+    with pytest.raises(ValueError, match='Unknown heuristic'):
+        Heuristic.for_grid(grid, AStarStrategy.steps, 'chebyshev')
+    with pytest.raises(ValueError, match='neighbors'):
+        Heuristic.for_grid(grid, [(2, 1, math.hypot(2, 1))])
+
+
+@pytest.mark.parametrize('kind', HEURISTICS)
+def test_astar_search_heuristics_stay_optimal(kind: str):
+    random.seed(17)
+    grid = TerrainGrid.from_nodes(create_grid(20, 20))
+    steps = DijkstraStrategy.steps
+    heuristic = Heuristic.for_grid(grid, steps, kind)
+    plain = Heuristic.build(EUCLIDEAN, 0.0, diagonal=True)
+
+    result = astar_search(grid, 0, len(grid.codes) - 1, steps, heuristic)
+    loose = astar_search(grid, 0, len(grid.codes) - 1, steps, plain)
+    expected = dijkstra_search(grid, 0, len(grid.codes) - 1, steps)
+
+    assert math.isclose(result.cost, expected.cost)
+    assert result.stats.expanded <= loose.stats.expanded
+
+
+@pytest.mark.parametrize(
+    ('strategy', 'reference'),
+    [
+        (BidirectionalAStarStrategy(), AStarStrategy()),
+        (BidirectionalDijkstraStrategy(), DijkstraStrategy()),
+    ],
+)
+@pytest.mark.parametrize('compact', [False, True])
+def test_bidirectional_strategies_match_one_directional(
+    strategy: PathfindingStrategy,
+    reference: PathfindingStrategy,
+    compact: bool,
+):
+    random.seed(19)
+    nodes = create_grid(16, 11)
+    grid = TerrainGrid.from_nodes(nodes) if compact else nodes
+
+    for start, end in [
+        (nodes[0][0], nodes[15][10]),
+        (nodes[15][0], nodes[0][7]),
+        (nodes[4][4], nodes[4][4]),
+    ]:
+        path = strategy.find_path(grid, start, end)
+        expected = reference.find_path(nodes, start, end)
+
+        assert path[-1:] == expected[-1:]
+        assert math.isclose(
+            total_path_cost(start, path), total_path_cost(start, expected)
+        )
+
+
+@pytest.mark.parametrize(
+    ('steps', 'guided'),
+    [
+        (AStarStrategy.steps, False),
+        (AStarStrategy.steps, True),
+        (DijkstraStrategy.steps, False),
+        (DijkstraStrategy.steps, True),
+    ],
+)
+def test_bidirectional_search_expands_less(steps, guided: bool):
+    random.seed(23)
+    grid = TerrainGrid.from_nodes(create_grid(40, 40))
+    source, target = grid.index(0, 10), grid.index(39, 30)
+    heuristic = Heuristic.for_grid(grid, steps) if guided else None
+
+    result = bidirectional_search(grid, source, target, steps, heuristic)
+    if guided:
+        expected = astar_search(grid, source, target, steps, heuristic)
+    else:
+        expected = dijkstra_search(grid, source, target, steps)
+
+    assert math.isclose(result.cost, expected.cost)
+    assert result.indices()[-1] == target
+    assert result.stats.expanded < expected.stats.expanded
+
+
+def create_blocky_grid(n: int, m: int, block: int, seed: int) -> TerrainGrid:
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 4, size=(n // block + 1, m // block + 1))
+    codes = np.kron(blocks, np.ones((block, block)))[:n, :m]
+    return TerrainGrid(n, m, bytearray(codes.astype(np.uint8).tobytes()))
+
+
+def test_boundary_cells():
+    grid = TerrainGrid(3, 4, bytearray([VALLEY] * 11 + [UP_HILL]))
+
+    assert boundary_cells(grid).tolist() == [
+        [False, False, False, False],
+        [False, False, True, True],
+        [False, False, True, True],
+    ]
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_jump_point_search_matches_dijkstra(seed: int):
+    rng = random.Random(seed)
+    grid = (
+        create_blocky_grid(25, 30, rng.randint(2, 8), seed)
+        if seed % 3
+        else generate_grid(25, 30, seed)
+    )
+    steps = DijkstraStrategy.steps
+
+    for _ in range(5):
+        source = rng.randrange(len(grid.codes))
+        target = rng.randrange(len(grid.codes))
+        result = jump_point_search(grid, source, target)
+        expected = dijkstra_search(grid, source, target, steps)
+
+        assert math.isclose(result.cost, expected.cost)
+        assert source == target or result.indices()[-1] == target
+        path = grid.nodes(result.indices())
+        assert math.isclose(
+            total_path_cost(grid.node(*divmod(source, grid.m)), path),
+            result.cost,
+        )
+
+
+def test_jump_point_search_crosses_uniform_regions():
+    grid = TerrainGrid(50, 50, bytearray([DOWN_HILL] * 2500))
+    target = grid.index(49, 30)
+
+    result = jump_point_search(grid, 0, target)
+    expected = astar_search(grid, 0, target, DijkstraStrategy.steps)
+
+    assert math.isclose(result.cost, expected.cost)
+    assert len(result.indices()) == len(range(49))
+    assert result.stats.expanded < expected.stats.expanded // 10
+
+
+def test_context_runs_jump_point_strategy():
+    random.seed(29)
+    nodes = create_grid(10, 12)
+    context = Context()
+    context.strategy = JumpPointStrategy()
+    context.grid = nodes
+    context.start = nodes[9][0]
+    context.end = nodes[0][11]
+
+    path = context.run()
+    expected = DijkstraStrategy.find_path(nodes, nodes[9][0], nodes[0][11])
+
+    assert path[-1] is nodes[0][11]
+    assert math.isclose(
+        total_path_cost(nodes[9][0], path),
+        total_path_cost(nodes[9][0], expected),
+    )
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_hierarchical_graph_routes_near_optimal_paths(seed: int):
+    rng = random.Random(seed)
+    grid = generate_grid(37, 45, seed)
+    graph = HierarchicalGraph.build(grid, cluster_size=8, entrance_spacing=3)
+
+    for _ in range(6):
+        source = rng.randrange(len(grid.codes))
+        target = rng.randrange(len(grid.codes))
+        route = graph.route(grid, source, target)
+        cells = [
+            cell for segment in graph.refine(grid, route) for cell in segment
+        ]
+        expected = dijkstra_search(grid, source, target, AStarStrategy.steps)
+
+        assert route.cost >= expected.cost - 1e-9
+        assert route.cost <= expected.cost * 1.25
+        assert source == target or cells[-1] == target
+        path = grid.nodes(cells)
+        assert math.isclose(
+            total_path_cost(grid.node(*divmod(source, grid.m)), path),
+            route.cost,
+        )
+        positions = [grid.position(source)] + [node.position for node in path]
+        for previous, position in zip(positions, positions[1:]):
+            assert (
+                abs(previous.x - position.x) + abs(previous.y - position.y)
+                == 1
+            )
+
+
+def test_hierarchical_graph_save_and_load(tmp_path):
+    grid = generate_grid(20, 26, 3)
+    graph = HierarchicalGraph.build(grid, cluster_size=6)
+    graph.save(str(tmp_path / 'abstraction.npz'))
+
+    loaded = HierarchicalGraph.load(str(tmp_path / 'abstraction.npz'), grid)
+
+    assert loaded.checksum == graph.checksum
+    np.testing.assert_array_equal(loaded.neighbors, graph.neighbors)
+    np.testing.assert_array_equal(loaded.costs, graph.costs)
+    route = loaded.route(grid, 0, len(grid.codes) - 1)
+    assert route.cost == graph.route(grid, 0, len(grid.codes) - 1).cost
+
+    grid.codes[0] = (grid.codes[0] + 1) % 4
+    with pytest.raises(
+        ValueError, match='Abstraction does not match the grid'
+    ):
+        HierarchicalGraph.load(str(tmp_path / 'abstraction.npz'), grid)
+
+
+def test_context_reuses_hierarchical_abstraction():
+    random.seed(31)
+    nodes = create_grid(14, 17)
+    strategy = HierarchicalStrategy(cluster_size=5, entrance_spacing=2)
+    context = Context()
+    context.strategy = strategy
+    context.grid = nodes
+
+    for start, end in [
+        (nodes[13][0], nodes[0][16]),
+        (nodes[2][3], nodes[11][9]),
+    ]:
+        context.start, context.end = start, end
+        collector = SearchStats()
+        path = context.run(stats=collector)
+        graph = strategy.graph
+        expected = AStarStrategy.find_path(nodes, start, end)
+
+        assert path[-1] is end
+        assert total_path_cost(start, path) >= total_path_cost(start, expected)
+        assert collector.expanded > 0
+    assert strategy.graph is graph
+
+
+def test_hierarchical_rebuilds_after_grid_edits():
+    grid = generate_grid(40, 40, seed=3)
+    strategy = HierarchicalStrategy(cluster_size=8, entrance_spacing=3)
+    start, end = grid.node(0, 0), grid.node(39, 39)
+    path = strategy.find_path(grid, start, end)
+    graph = strategy.graph
+
+    for node in path[:-1]:
+        grid.set_node(node.position.x, node.position.y, UpHill(weight=500))
+    path = strategy.find_path(grid, start, end)
+    expected = AStarStrategy.find_path(grid, start, end)
+
+    assert strategy.graph is not graph
+    assert math.isclose(path.cost, compute_path_cost(path, start))
+    assert path.cost >= expected.cost
+    assert path.cost <= 1.1 * expected.cost
+
+
+@pytest.mark.parametrize(
+    'steps', [AStarStrategy.steps, DijkstraStrategy.steps], ids=['4', '8']
+)
+def test_landmark_bounds_keep_astar_optimal(steps):
+    rng = random.Random(37)
+    grid = generate_grid(30, 40, 37)
+    table = LandmarkTable.build(grid, steps, count=4)
+    expanded = guided = 0
+
+    for _ in range(10):
+        source = rng.randrange(len(grid.codes))
+        target = rng.randrange(len(grid.codes))
+        bounds = table.bounds(grid, target)
+        result = astar_search(grid, source, target, steps, bounds)
+        plain = astar_search(grid, source, target, steps)
+        expected = dijkstra_search(grid, source, target, steps)
+
+        assert math.isclose(result.cost, expected.cost)
+        field = dijkstra_distance_field(grid, target, steps).costs
+        costs_to_target = (
+            field.reshape(-1)
+            - grid.weight_array()[grid.codes]
+            + grid.weight(*divmod(target, grid.m))
+        )
+        assert np.all(bounds <= costs_to_target + 1e-9)
+        expanded += plain.stats.expanded
+        guided += result.stats.expanded
+    assert guided < 0.75 * expanded
+
+
+def test_landmark_table_save_and_memory_map(tmp_path):
+    grid = generate_grid(12, 15, 5)
+    table = LandmarkTable.build(grid, AStarStrategy.steps, count=3)
+    table.save(str(tmp_path / 'map'))
+
+    loaded = LandmarkTable.load(str(tmp_path / 'map'))
+
+    assert isinstance(loaded.distances, np.memmap)
+    assert loaded.distances.dtype == np.float32
+    assert loaded.distances.shape == (3, 12, 15)
+    assert loaded.landmarks.tolist() == table.landmarks.tolist()
+    assert loaded.matches(grid, AStarStrategy.steps)
+    assert not loaded.matches(grid, DijkstraStrategy.steps)
+    np.testing.assert_array_equal(
+        loaded.bounds(grid, 17), table.bounds(grid, 17)
+    )
+
+
+def test_landmark_table_needs_a_landmark():
+    grid = generate_grid(3, 3, 0)
+
+    with pytest.raises(ValueError, match='At least one landmark is needed'):
+        LandmarkTable.build(grid, AStarStrategy.steps, count=0)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_landmark_strategy_rebuilds_after_grid_edits(seed):
+    rng = random.Random(seed)
+    grid = generate_grid(40, 40, seed=seed)
+    strategy = LandmarkStrategy(count=2)
+    start, end = grid.node(0, 0), grid.node(39, 39)
+    strategy.find_path(grid, start, end)
+    table = strategy.table
+
+    for cell in rng.sample(range(len(grid.codes)), len(grid.codes) // 3):
+        grid.set_node(*divmod(cell, grid.m), Valley(weight=0.0))
+    path = strategy.find_path(grid, start, end)
+    expected = dijkstra_search(
+        grid, 0, len(grid.codes) - 1, AStarStrategy.steps
+    )
+
+    assert strategy.table is not table
+    assert math.isclose(path.cost, expected.cost)
+
+
+def test_context_reuses_landmark_table():
+    random.seed(41)
+    nodes = create_grid(11, 13)
+    strategy = LandmarkStrategy(count=2)
+    context = Context()
+    context.strategy = strategy
+    context.grid = nodes
+
+    for start, end in [
+        (nodes[10][0], nodes[0][12]),
+        (nodes[3][4], nodes[8][9]),
+    ]:
+        context.start, context.end = start, end
+        path = context.run()
+        table = strategy.table
+        expected = AStarStrategy.find_path(nodes, start, end)
+
+        assert path[-1] is end
+        assert math.isclose(
+            total_path_cost(start, path), total_path_cost(start, expected)
+        )
+    assert strategy.table is table
+
+
+@pytest.mark.parametrize(
+    'steps', [AStarStrategy.steps, DijkstraStrategy.steps], ids=['4', '8']
+)
+def test_lifelong_planner_repairs_after_changes(steps):
+    rng = random.Random(43)
+    grid = generate_grid(25, 30, 43)
+    source, target = rng.randrange(750), rng.randrange(750)
+    planner = LifelongPlanner.start(grid, source, target, steps)
+    first = planner.search()
+
+    assert math.isclose(
+        first.cost, dijkstra_search(grid, source, target, steps).cost
+    )
+    for _ in range(10):
+        cells = [rng.randrange(750) for _ in range(rng.randint(1, 4))]
+        for cell in cells:
+            grid.codes[cell] = rng.randrange(4)
+        planner.update(cells)
+        result = planner.search()
+        expected = dijkstra_search(grid, source, target, steps)
+
+        assert math.isclose(result.cost, expected.cost)
+        path = grid.nodes(result.indices())
+        assert math.isclose(
+            total_path_cost(grid.node(*divmod(source, grid.m)), path),
+            result.cost,
+        )
+        assert result.stats.expanded < first.stats.expanded
+
+
+def test_lifelong_planner_follows_lighter_terrain():
+    grid = TerrainGrid(5, 5, bytearray([UP_HILL] * 25))
+    planner = LifelongPlanner.start(grid, 0, 24, AStarStrategy.steps)
+    planner.search()
+
+    grid.codes[12] = VALLEY
+    planner.update([12])
+    result = planner.search()
+
+    assert (
+        result.cost == dijkstra_search(grid, 0, 24, AStarStrategy.steps).cost
+    )
+
+
+def test_context_repairs_incremental_strategy():
+    random.seed(47)
+    nodes = create_grid(9, 9)
+    strategy = IncrementalStrategy()
+    context = Context()
+    context.strategy = strategy
+    context.grid = nodes
+    context.start, context.end = nodes[0][0], nodes[8][8]
+    context.run()
+    planner = strategy.planner
+
+    path = context.run()
+    x, y = path[3].position.x, path[3].position.y
+    nodes[x][y] = UpHill(position=Position(x, y))
+    strategy.update([(x, y)])
+    collector = SearchStats()
+    path = context.run(stats=collector)
+    expected = AStarStrategy.find_path(nodes, nodes[0][0], nodes[8][8])
+
+    assert strategy.planner is planner
+    assert path[-1] is nodes[8][8]
+    assert math.isclose(
+        total_path_cost(nodes[0][0], path),
+        total_path_cost(nodes[0][0], expected),
+    )
+
+
+def test_result_cache_evicts_least_recently_used():
+    cache = ResultCache(max_size=2)
+    cache.put('a', [Valley()])
+    cache.put('b', [])
+    assert cache.get('a') is not None
+    cache.put('c', [])
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert len(cache) == cache.max_size
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 1)
+
+
+def test_result_cache_expires_entries():
+    now = [0.0]
+    cache = ResultCache(ttl=5, clock=lambda: now[0])
+    path = [Valley()]
+    cache.put('a', path)
+
+    now[0] = 4.0
+    cached = cache.get('a')
+    assert cached == path
+    assert cached is not path
+    now[0] = 5.0
+    assert cache.get('a') is None
+    assert (cache.hits, cache.misses, cache.expirations) == (1, 1, 1)
+
+
+@pytest.mark.parametrize(
+    ('options', 'message'),
+    [
+        ({'max_size': 0}, 'Cache size must be at least 1'),
+        ({'ttl': 0}, 'Cache TTL must be positive'),
+    ],
+)
+def test_result_cache_rejects_bad_options(options, message):
+    with pytest.raises(ValueError, match=message):
+        ResultCache(**options)
+
+
+def test_context_caches_run_results():
+    nodes = create_3_by_3_flat_terrain_grid()
+    strategy = DijkstraStrategy()
+    strategy.find_path = MagicMock(return_value=[nodes[2][2]])
+    cache = ResultCache()
+    context = Context(
+        _strategy=strategy,
+        _grid=nodes,
+        _start=nodes[0][0],
+        _end=nodes[2][2],
+        _cache=cache,
+    )
+
+    assert context.run() == context.run() == [nodes[2][2]]
+    strategy.find_path.assert_called_once()
+    callback = MagicMock()
+    context.run(stats=callback)
+    callback.assert_called_once_with(SearchStats())
+
+    context.end = nodes[1][1]
+    context.run()
+    context.grid = nodes
+    context.end = nodes[2][2]
+    context.run()
+    assert strategy.find_path.call_count == len(range(3))
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_context_cache_keys_on_the_strategy_instance():
+    grid = generate_grid(12, 12, 5)
+    context = Context(_grid=grid, _cache=ResultCache())
+    context.start, context.end = grid.node(0, 0), grid.node(11, 11)
+    context.strategy = AnytimeStrategy(expansion_budget=1)
+    rough = context.run()
+    context.strategy = AnytimeStrategy()
+    exact = context.run()
+
+    assert context.cache.misses == len(range(2))
+    assert exact.bound == 1
+    assert rough.bound > exact.bound
+
+
+def test_context_cache_follows_terrain_grid_content():
+    grid = TerrainGrid(2, 3, bytearray([VALLEY] * 6))
+    context = Context(_strategy=AStarStrategy(), _grid=grid)
+    context.cache = ResultCache()
+    context.start, context.end = grid.node(0, 0), grid.node(1, 2)
+
+    first = context.run()
+    grid.set_node(0, 1, UpHill())
+    grid.codes[4] = UP_HILL
+    grid.invalidate()
+    second = context.run()
+    context.strategy = DijkstraStrategy()
+    context.run()
+
+    assert [node.position for node in first] != [
+        node.position for node in second
+    ]
+    assert context.cache.misses == len(range(3))
+    with pytest.raises(TypeError, match='Cache must be a ResultCache'):
+        context.cache = {}
+
+
+@pytest.mark.parametrize(
+    'strategy',
+    [
+        AStarStrategy(),
+        DijkstraStrategy(),
+        BidirectionalDijkstraStrategy(),
+        JumpPointStrategy(),
+        HierarchicalStrategy(cluster_size=4, entrance_spacing=2),
+        LandmarkStrategy(count=2),
+        IncrementalStrategy(),
+    ],
+)
+def test_find_path_returns_its_cost(strategy: PathfindingStrategy):
+    random.seed(19)
+    nodes = create_grid(12, 9)
+    start, end = nodes[0][0], nodes[11][8]
+
+    for grid in (nodes, TerrainGrid.from_nodes(nodes)):
+        path = strategy.find_path(grid, start, end)
+
+        assert math.isclose(path.cost, total_path_cost(start, path))
+        assert math.isclose(path.cost, compute_path_cost(path, start))
+
+
+def test_unreachable_path_costs_infinity():
+    start = Valley(position=Position(0, 0))
+    end = Valley(position=Position(5, 5))
+
+    path = AStarStrategy.find_path([[start]], start, end)
+
+    assert path == []
+    assert path.cost == math.inf
+
+
+def test_cache_keeps_path_cost():
+    COST = 2.0
+    cache = ResultCache()
+    path = Path([Valley(position=Position(0, 1))], COST)
+
+    cache.put('key', path)
+    path.cost = 5.0
+    cached = cache.get('key')
+
+    assert cached == path
+    assert cached.cost == COST
+
+
+@pytest.mark.parametrize('strategy', [AStarStrategy(), DijkstraStrategy()])
+def test_stream_path_matches_find_path(strategy: PathfindingStrategy):
+    random.seed(20)
+    nodes = create_grid(15, 11)
+    start, end = nodes[0][0], nodes[14][10]
+    expected = strategy.find_path(nodes, start, end)
+
+    stream = strategy.stream_path(nodes, start, end)
+    positions = [(node.position.x, node.position.y) for node in expected]
+
+    assert list(stream) == positions
+    assert list(reversed(stream)) == positions[::-1]
+    assert len(stream) == len(expected)
+    assert math.isclose(stream.cost, expected.cost)
+    assert stream.nodes() == expected
+    assert stream.nodes().cost == stream.cost
+
+
+def test_path_stream_writes_binary_and_ndjson():
+    random.seed(20)
+    grid = TerrainGrid.from_nodes(create_grid(15, 11))
+    stream = DijkstraStrategy.stream_path(
+        grid, grid.node(0, 10), grid.node(14, 0)
+    )
+    binary, text = io.BytesIO(), io.StringIO()
+
+    assert stream.write_binary(binary) == len(stream)
+    assert stream.write_ndjson(text) == len(stream)
+
+    binary.seek(0)
+    cost, positions = read_binary_path(binary)
+    assert cost == stream.cost
+    assert list(positions) == list(stream)
+    lines = text.getvalue().splitlines()
+    assert [tuple(json.loads(line)) for line in lines] == list(stream)
+
+    with pytest.raises(ValueError, match='Not a path stream'):
+        read_binary_path(io.BytesIO(bytes(32)))
+    with pytest.raises(ValueError, match='Truncated path stream'):
+        list(read_binary_path(io.BytesIO(binary.getvalue()[:-1]))[1])
+
+
+def test_path_stream_of_unreached_target_is_empty():
+    grid = TerrainGrid.from_nodes([[Valley(), Valley()]])
+    stream = PathStream(grid, SearchResult(0, 1, math.inf, array('i')))
+    binary = io.BytesIO()
+
+    stream.write_binary(binary)
+    binary.seek(0)
+    cost, positions = read_binary_path(binary)
+
+    assert list(stream) == list(reversed(stream)) == []
+    assert stream.nodes() == []
+    assert cost == math.inf
+    assert list(positions) == []
+
+
+def test_context_stream():
+    random.seed(20)
+    nodes = create_grid(8, 8)
+    context = Context(_strategy=AStarStrategy())
+    context.grid = nodes
+    context.start, context.end = nodes[0][0], nodes[7][7]
+
+    assert context.stream().nodes() == context.run()
+
+    context.strategy = MagicMock(spec=PathfindingStrategy)
+    with pytest.raises(NotImplementedError):
+        context.stream()
+
+
+def test_shared_grid_pool_matches_in_process_search():
+    grid = generate_grid(30, 20, seed=21)
+    queries = [(0, 599), (0, 45), (310, 7), (599, 0), (0, 599), (12, 12)]
+
+    with SharedGridPool(
+        grid, DijkstraStrategy(), processes=2, chunk_size=1
+    ) as pool:
+        first = pool.solve(queries)
+        second = pool.solve(queries[::-1])
+
+    for (source, target), (path, cost) in zip(queries, first):
+        expected = dijkstra_search(
+            grid, source, target, DijkstraStrategy.steps
+        )
+        assert path.dtype == np.int32
+        assert path.tolist() == [
+            list(divmod(cell, grid.m)) for cell in expected.indices()
+        ]
+        assert cost == expected.cost
+    assert [path.tolist() for path, _ in second] == [
+        path.tolist() for path, _ in first[::-1]
+    ]
+    assert first[-1][0].shape == (0, 2)
+    with pytest.raises(ValueError, match='The pool is closed'):
+        pool.solve(queries)
+
+
+def test_shared_grid_pool_rejects_bad_arguments():
+    grid = generate_grid(4, 4, seed=21)
+
+    with pytest.raises(ValueError, match='Chunk size must be at least 1'):
+        SharedGridPool(grid, DijkstraStrategy(), chunk_size=0)
+    with pytest.raises(NotImplementedError):
+        SharedGridPool(grid, MagicMock(spec=PathfindingStrategy))
+
+
+def test_cancel_token_stops_engines():
+    grid = generate_grid(60, 60, seed=22)
+    now = [0.0]
+    token = CancelToken.after(5.0, clock=lambda: now[0])
+
+    token.check()
+    now[0] = 5.0
+    with pytest.raises(SearchCancelled, match='deadline'):
+        token.check()
+
+    cancelled = CancelToken()
+    cancelled.cancel()
+    for search in (AStarStrategy.search, DijkstraStrategy.search):
+        assert search(grid, 0, 3599).found
+        with pytest.raises(SearchCancelled, match='cancelled'):
+            search(grid, 0, 3599, cancel=cancelled)
+
+
+def test_async_pathfinder_coalesces_duplicate_queries():
+    random.seed(22)
+    nodes = create_grid(20, 20)
+    pathfinder = AsyncPathfinder.for_grid(nodes)
+    expected = DijkstraStrategy.find_path(nodes, nodes[0][0], nodes[19][19])
+
+    async def main():
+        return await asyncio.gather(
+            pathfinder.find(nodes[0][0], nodes[19][19]),
+            pathfinder.find(nodes[0][0], nodes[19][19]),
+            pathfinder.find(nodes[19][19], nodes[0][0]),
+        )
+
+    first, second, back = asyncio.run(main())
+
+    assert first == second == expected
+    assert first is not second
+    assert first.cost == expected.cost
+    assert back[-1] == nodes[0][0]
+    assert (pathfinder.searches, pathfinder.coalesced) == (2, 1)
+    assert pathfinder.in_flight == 0
+
+
+def test_async_pathfinder_deadline_cancels_search():
+    grid = generate_grid(300, 300, seed=22)
+    start, end = grid.node(0, 0), grid.node(299, 299)
+    executor = ThreadPoolExecutor(max_workers=1)
+    pathfinder = AsyncPathfinder(grid, executor=executor)
+
+    async def main():
+        waiting = asyncio.create_task(pathfinder.find(start, end))
+        with pytest.raises(asyncio.TimeoutError):
+            await pathfinder.find(start, end, timeout=0.001)
+        # Another caller still awaits the search, so it keeps running
+        path = await waiting
+        with pytest.raises(asyncio.TimeoutError):
+            await pathfinder.find(end, start, timeout=0.001)
+        return path
+
+    path = asyncio.run(main())
+    executor.shutdown(wait=True)
+
+    assert path[-1] == end
+    assert (pathfinder.searches, pathfinder.cancelled) == (2, 1)
+    assert pathfinder.in_flight == 0
+
+
+def test_async_pathfinder_behind_local_server():
+    random.seed(22)
+    nodes = create_grid(15, 15)
+    pathfinder = AsyncPathfinder.for_grid(nodes, AStarStrategy())
+
+    async def handle(reader, writer):
+        sx, sy, ex, ey = map(int, (await reader.readline()).split())
+        path = await pathfinder.find(nodes[sx][sy], nodes[ex][ey])
+        writer.write(f'{len(path)} {path.cost}\n'.encode())
+        await writer.drain()
+        writer.close()
+
+    async def ask(port):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b'0 0 14 14\n')
+        await writer.drain()
+        answer = await reader.readline()
+        writer.close()
+        return answer
+
+    async def main():
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(*(ask(port) for _ in range(4)))
+
+    answers = asyncio.run(main())
+    expected = AStarStrategy.find_path(nodes, nodes[0][0], nodes[14][14])
+
+    assert set(answers) == {f'{len(expected)} {expected.cost}\n'.encode()}
+    assert pathfinder.searches + pathfinder.coalesced == len(answers)
+
+
+@pytest.mark.parametrize('grid', [generate_grid(40, 40, seed=23), None])
+def test_anytime_strategy_without_budget_is_optimal(grid):
+    if grid is None:
+        random.seed(23)
+        grid = create_grid(25, 25)
+    start, end = grid[0][0], grid[len(grid) - 1][len(grid[0]) - 1]
+    expected = AStarStrategy.find_path(grid, start, end)
+    strategy = AnytimeStrategy()
+
+    path = strategy.find_path(grid, start, end)
+
+    assert math.isclose(path.cost, expected.cost)
+    assert path.bound == strategy.bound == 1
+    assert math.isclose(path.cost, total_path_cost(start, path))
+
+
+@pytest.mark.parametrize('budget', [{'expansion_budget': 50}, {}])
+def test_anytime_strategy_reports_bound(budget):
+    INFLATION = 2.5
+    grid = generate_grid(80, 80, seed=24)
+    start, end = grid.node(0, 0), grid.node(79, 79)
+    astar_stats, stats = SearchStats(), SearchStats()
+    optimal = AStarStrategy.find_path(grid, start, end, astar_stats).cost
+
+    path = AnytimeStrategy(INFLATION, 0.5, **budget).find_path(
+        grid, start, end, stats
+    )
+
+    assert path[-1] == end
+    assert 1 <= path.bound <= INFLATION
+    assert optimal <= path.cost <= path.bound * optimal + 1e-9
+    assert math.isclose(path.cost, total_path_cost(start, path))
+    if budget:
+        assert stats.expanded < astar_stats.expanded
+        assert path.bound > 1
+    copied = path.copy()
+    assert (copied, copied.cost, copied.bound) == (
+        path,
+        path.cost,
+        path.bound,
+    )
+
+
+def test_anytime_strategy_rejects_bad_arguments():
+    with pytest.raises(ValueError, match='Inflation must be at least 1'):
+        AnytimeStrategy(inflation=0.5)
+    with pytest.raises(ValueError, match='Inflation step must be positive'):
+        AnytimeStrategy(step=0)
+    with pytest.raises(ValueError, match='Time budget must be positive'):
+        AnytimeStrategy(time_budget=0)
+    with pytest.raises(ValueError, match='Expansion budget must be at'):
+        AnytimeStrategy(expansion_budget=0)
+
+
+@pytest.mark.parametrize('strategy', [AStarStrategy(), DijkstraStrategy()])
+def test_node_grid_heaps_never_compare_nodes(
+    strategy: PathfindingStrategy, monkeypatch
+):
+    nodes = [
+        [Valley(position=Position(x, y)) for y in range(6)] for x in range(6)
+    ]
+
+    def compare(self, other):
+        raise AssertionError('Nodes were compared')
+
+    monkeypatch.setattr(Valley, '__lt__', compare)
+    monkeypatch.setattr(Valley, '__gt__', compare)
+    path = strategy.find_path(nodes, nodes[0][0], nodes[5][5])
+
+    assert path[-1] == nodes[5][5]
+
+
+def test_astar_breaks_ties_towards_larger_cost_so_far():
+    SIZE = 30
+    flat = TerrainGrid(SIZE, SIZE, array('B', bytes(SIZE * SIZE)))
+    nodes = flat.to_nodes()
+    target = SIZE * SIZE - 1
+
+    result = astar_search(flat, 0, target, AStarStrategy.steps)
+    stats = SearchStats()
+    path = AStarStrategy.find_path(
+        nodes,
+        nodes[0][0],
+        nodes[-1][-1],
+        stats,
+        Heuristic.for_grid(nodes, AStarStrategy.steps),
+    )
+
+    # Only the cells of the path are expanded on a plateau of equal f
+    assert result.stats.expanded == len(result.indices()) == 2 * SIZE - 2
+    assert stats.expanded == len(path) == 2 * SIZE - 2
+    assert (
+        result.indices()
+        == astar_search(flat, 0, target, AStarStrategy.steps).indices()
+    )
+    assert [flat.index(node.position.x, node.position.y) for node in path] == (
+        result.indices()
+    )
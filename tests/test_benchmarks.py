@@ -0,0 +1,28 @@
+import json
+
+from benchmarks.run import ENGINES, Config, compare, main, run_benchmarks
+
+
+def test_run_benchmarks_records_every_engine():
+    SIZE = 20
+    cases = run_benchmarks(Config(sizes=[SIZE], pairs=2, memory=False))
+
+    assert {case.engine for case in cases} == set(ENGINES)
+    assert all(case.size == SIZE for case in cases)
+    assert all(case.cost > 0 for case in cases)
+    assert all(case.expanded and case.pushes for case in cases)
+
+
+def test_benchmarks_compare_against_baseline(tmp_path):
+    output = tmp_path / 'bench.json'
+
+    assert (
+        main(['--sizes', '15', '--pairs', '1', '--output', str(output)]) == 0
+    )
+    baseline = json.loads(output.read_text())['cases']
+    cases = run_benchmarks(Config(sizes=[15], pairs=1, memory=False))
+
+    assert compare(cases, baseline, max_slowdown=1e9) == []
+    for case in baseline:
+        case['cost'] += 1
+    assert len(compare(cases, baseline, max_slowdown=1e9)) == len(cases)
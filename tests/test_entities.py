@@ -1,4 +1,5 @@
 import sys
+from array import array
 from dataclasses import dataclass, field
 from typing import TypeVar
 
@@ -8,6 +9,14 @@ from pathfinding_challenge.entities.down_hill import DownHill
 from pathfinding_challenge.entities.node import Node
 from pathfinding_challenge.entities.plateau import Plateau
 from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import (
+    DOWN_HILL,
+    PLATEAU,
+    TERRAIN_TYPES,
+    UP_HILL,
+    VALLEY,
+    TerrainGrid,
+)
 from pathfinding_challenge.entities.up_hill import UpHill
 from pathfinding_challenge.entities.valley import Valley
 
@@ -271,3 +280,117 @@ def test_comparisons():
     assert node2 == node6
     assert node2 != node1
     assert node7 > node6
+
+
+def test_terrain_grid_from_nodes_round_trip():
+    nodes = [
+        [Valley(position=Position(0, 0)), UpHill(position=Position(0, 1))],
+        [DownHill(position=Position(1, 0)), Plateau(position=Position(1, 1))],
+    ]
+    grid = TerrainGrid.from_nodes(nodes)
+
+    assert list(grid.codes) == [VALLEY, UP_HILL, DOWN_HILL, PLATEAU]
+    assert grid.to_nodes() == nodes
+    assert [type(node) for row in grid.to_nodes() for node in row] == [
+        Valley,
+        UpHill,
+        DownHill,
+        Plateau,
+    ]
+    assert grid.weight(1, 0) == float(0.5)
+
+
+def test_terrain_grid_custom_weight_palette():
+    nodes = [[UpHill(weight=3, position=Position(0, 0)), UpHill()]]
+    grid = TerrainGrid.from_nodes(nodes)
+
+    assert len(grid.terrains) == len(TERRAIN_TYPES) + 1
+    assert grid.node(0, 0).weight == float(3)
+    assert grid.node(0, 1).weight == float(2)
+
+
+def test_terrain_grid_lazy_rows():
+    ROWS = 2
+    COLUMNS = 3
+    grid = TerrainGrid(ROWS, COLUMNS, array('B', [VALLEY] * ROWS * COLUMNS))
+
+    assert len(grid) == ROWS
+    assert len(grid[0]) == COLUMNS
+    assert grid[1][2] == Valley(position=Position(1, 2))
+    with pytest.raises(IndexError):
+        grid[2]
+    with pytest.raises(IndexError):
+        grid[0][3]
+
+
+def test_terrain_grid_invalid_size():
+    with pytest.raises(ValueError, match='Expected 4 terrain codes'):
+        TerrainGrid(2, 2, array('B', [VALLEY] * 3))
+
+
+def test_terrain_grid_as_array_is_a_view():
+    grid = TerrainGrid(2, 2, array('B', [VALLEY, UP_HILL, DOWN_HILL, PLATEAU]))
+
+    plane = grid.as_array()
+    grid.codes[0] = PLATEAU
+
+    assert plane.shape == (2, 2)
+    assert plane[0, 0] == PLATEAU
+    assert grid.weight_array()[plane].tolist() == [[1.0, 2.0], [0.5, 1.0]]
+
+
+def test_terrain_grid_min_weight_ignores_unused_codes():
+    grid = TerrainGrid(1, 3, array('B', [VALLEY, UP_HILL, VALLEY]))
+
+    assert grid.terrain_counts().tolist() == [2, 1, 0, 0]
+    assert grid.min_weight() == Valley().weight
+    assert TerrainGrid(0, 0, array('B')).min_weight() == 0
+
+
+def test_terrain_grid_min_weight_is_cached_until_the_grid_changes():
+    grid = TerrainGrid(1, 2, array('B', [UP_HILL, UP_HILL]))
+    assert grid.min_weight() == UpHill().weight
+
+    grid.codes[0] = VALLEY
+    assert grid.min_weight() == UpHill().weight
+    grid.invalidate()
+    assert grid.min_weight() == Valley().weight
+    grid.set_node(0, 1, DownHill())
+    assert grid.min_weight() == DownHill().weight
+
+
+def test_terrain_grid_checksum_follows_content():
+    grid = TerrainGrid(2, 2, array('B', [VALLEY, UP_HILL, VALLEY, VALLEY]))
+    checksum = grid.checksum()
+
+    assert TerrainGrid(2, 2, array('B', grid.codes)).checksum() == checksum
+    grid.codes[3] = UP_HILL
+    assert grid.checksum() != checksum
+    grid.codes[3] = VALLEY
+    grid.weights[UP_HILL] += 1
+    assert grid.checksum() != checksum
+
+
+def test_terrain_grid_set_node_reuses_or_adds_palette_codes():
+    grid = TerrainGrid(1, 2, array('B', [VALLEY, VALLEY]))
+
+    grid.set_node(0, 1, UpHill())
+    assert grid.codes[1] == UP_HILL
+    heavy = UpHill(weight=7)
+    grid.set_node(0, 0, heavy)
+    assert grid.codes[0] == len(TERRAIN_TYPES)
+    assert grid.weight(0, 0) == heavy.weight
+    assert isinstance(grid.node(0, 0), UpHill)
+
+
+def test_terrain_grid_nodes_own_their_positions():
+    grid = TerrainGrid.from_nodes([
+        [Valley(), UpHill()],
+        [Plateau(), Valley()],
+    ])
+
+    node = grid.node(1, 0)
+    node.position.y += 1
+    assert grid.node(1, 0).position == grid.position(2) == Position(1, 0)
+    assert grid.position(3) == Position(1, 1)
+    assert grid.nodes([0, 3]) == [grid.node(0, 0), grid.node(1, 1)]
@@ -1,11 +1,21 @@
+import random
+
 import pytest
 
 from pathfinding_challenge import InvalidComparisonError, MissingAttrError
+from pathfinding_challenge.algorithms.cache import ResultCache
 from pathfinding_challenge.algorithms.context import Context
 from pathfinding_challenge.entities.down_hill import DownHill
 from pathfinding_challenge.entities.node import Node
 from pathfinding_challenge.entities.plateau import Plateau
 from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import (
+    DOWN_HILL,
+    PLATEAU,
+    UP_HILL,
+    VALLEY,
+    TerrainGrid,
+)
 from pathfinding_challenge.entities.up_hill import UpHill
 from pathfinding_challenge.entities.valley import Valley
 
@@ -146,3 +156,78 @@ def test_context_validate_grid():
     valid_grid = [[Valley(), Plateau()], [UpHill(), DownHill()]]
 
     context._validate_grid(grid=valid_grid)
+
+
+def _validate_pairwise(grid):
+    for i, row in enumerate(grid):
+        for j, node in enumerate(row):
+            if j < len(row) - 1:
+                Context._validate_adjacent_nodes(node, row[j + 1])
+            if i < len(grid) - 1:
+                Context._validate_adjacent_nodes(node, grid[i + 1][j])
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_context_validate_grid_matches_pairwise_checks(seed: int):
+    rng = random.Random(seed)
+    terrains = [Valley, UpHill, DownHill, Plateau]
+    grid = [[rng.choice(terrains)() for _ in range(4)] for _ in range(3)]
+    context = Context()
+
+    try:
+        _validate_pairwise(grid)
+    except ValueError as error:
+        with pytest.raises(ValueError, match=str(error)):
+            context._validate_grid(grid)
+    else:
+        context._validate_grid(grid)
+
+
+def test_context_validates_grid_on_assignment():
+    context = Context()
+    assert context.validation is True
+    valid_grid = [[Valley(), Plateau()], [UpHill(), DownHill()]]
+    context.grid = valid_grid
+
+    with pytest.raises(
+        ValueError, match='UpHill cannot be adjacent to Valley'
+    ):
+        context.grid = [[UpHill(), Plateau()], [Valley(), DownHill()]]
+    with pytest.raises(
+        ValueError, match='DownHill cannot be adjacent to Plateau'
+    ):
+        context.grid = TerrainGrid(2, 2, bytearray([DOWN_HILL, PLATEAU] * 2))
+    assert context.grid is valid_grid
+
+    context.validation = False
+    context.grid = [[UpHill(), Valley()]]
+    assert context.validation is False
+
+
+def test_context_revalidates_edited_cells():
+    grid = [[Valley(), Plateau(), Valley()], [Plateau(), Valley(), Valley()]]
+    context = Context(_grid=grid, _cache=ResultCache())
+    context.cache.put('query', [])
+    compact = context._compact_grid()
+
+    grid[0][1] = UpHill()
+    with pytest.raises(
+        ValueError, match='UpHill cannot be adjacent to Valley'
+    ):
+        context.revalidate([(0, 1)])
+    assert compact.codes[1] == UP_HILL
+    assert len(context.cache) == 0
+
+    grid[0][1] = DownHill()
+    grid[0][2] = DownHill()
+    context.revalidate([(0, 1), (0, 2)])
+    assert compact.codes[2] == DOWN_HILL
+
+    context.grid = TerrainGrid(1, 3, bytearray([VALLEY] * 3))
+    context.grid.codes[0] = DOWN_HILL
+    context.revalidate([(0, 0)])
+    context.grid.codes[1] = PLATEAU
+    with pytest.raises(
+        ValueError, match='DownHill cannot be adjacent to Plateau'
+    ):
+        context.revalidate([(0, 1)])
@@ -0,0 +1,209 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from pathfinding_challenge.algorithms.context import Context
+from pathfinding_challenge.algorithms.dijkstra import DijkstraStrategy
+from pathfinding_challenge.entities.down_hill import DownHill
+from pathfinding_challenge.entities.plateau import Plateau
+from pathfinding_challenge.entities.position import Position
+from pathfinding_challenge.entities.terrain_grid import (
+    DOWN_HILL,
+    PLATEAU,
+    UP_HILL,
+    VALLEY,
+    TerrainGrid,
+)
+from pathfinding_challenge.entities.up_hill import UpHill
+from pathfinding_challenge.entities.valley import Valley
+from pathfinding_challenge.utils import (
+    compute_path_cost,
+    compute_path_costs,
+    create_grid,
+    generate_terrain,
+)
+from pathfinding_challenge.utils.generator import (
+    generate_codes,
+    generate_grid,
+    write_generated_grid,
+)
+from pathfinding_challenge.utils.grid_io import load_grid, write_grid
+
+
+def test_write_and_load_grid(tmp_path):
+    random.seed(2)
+    nodes = create_grid(20, 15)
+    nodes[4][4] = UpHill(weight=3, position=Position(4, 4))
+    path = str(tmp_path / 'map.grid')
+    CONNECTIVITY = 4
+
+    write_grid(path, nodes, connectivity=CONNECTIVITY)
+    grid = load_grid(path)
+
+    assert isinstance(grid.codes, memoryview)
+    assert grid.connectivity == CONNECTIVITY
+    assert grid.to_nodes() == nodes
+    assert grid.node(4, 4).weight == float(3)
+    assert DijkstraStrategy.find_path(
+        grid, nodes[0][0], nodes[19][14]
+    ) == DijkstraStrategy.find_path(
+        TerrainGrid.from_nodes(nodes), nodes[0][0], nodes[19][14]
+    )
+
+
+def test_load_grid_writable_copy_on_write(tmp_path):
+    path = str(tmp_path / 'map.grid')
+    write_grid(path, [[Valley(), Valley()]])
+
+    with pytest.raises(TypeError):
+        load_grid(path).codes[0] = 1
+
+    grid = load_grid(path, writable=True)
+    grid.codes[0] = 1
+
+    assert isinstance(grid.node(0, 0), UpHill)
+    assert isinstance(load_grid(path).node(0, 0), Valley)
+
+
+def test_load_grid_rejects_other_files(tmp_path):
+    path = tmp_path / 'map.grid'
+    path.write_bytes(b'not a grid file at all')
+
+    with pytest.raises(ValueError, match='Not a grid file'):
+        load_grid(str(path))
+
+
+def test_load_grid_rejects_truncated_files(tmp_path):
+    path = tmp_path / 'map.grid'
+    write_grid(str(path), [[Valley(), Valley()]])
+    path.write_bytes(path.read_bytes()[:-1])
+
+    with pytest.raises(ValueError, match='Truncated grid file'):
+        load_grid(str(path))
+
+
+def test_write_grid_invalid_connectivity(tmp_path):
+    with pytest.raises(ValueError, match='Connectivity must be 4 or 8'):
+        write_grid(str(tmp_path / 'map.grid'), [[Valley()]], connectivity=6)
+
+
+def assert_continuity_rules(codes: np.ndarray):
+    pairs = (
+        (codes[:, :-1], codes[:, 1:]),
+        (codes[:-1], codes[1:]),
+    )
+    for previous, current in pairs:
+        assert not np.any((previous == UP_HILL) & (current == VALLEY))
+        assert not np.any((previous == DOWN_HILL) & (current == PLATEAU))
+
+
+@pytest.mark.parametrize('block_rows', [None, 1, 7])
+def test_generate_codes_continuity_rules(block_rows):
+    ROWS = 40
+    COLUMNS = 30
+    blocks = list(generate_codes(ROWS, COLUMNS, seed=4, block_rows=block_rows))
+    codes = np.concatenate(blocks)
+
+    assert codes.shape == (ROWS, COLUMNS)
+    assert codes.dtype == np.uint8
+    assert set(np.unique(codes)) == {VALLEY, UP_HILL, DOWN_HILL, PLATEAU}
+    # The rules apply along rows and columns, across block boundaries
+    assert_continuity_rules(codes)
+
+
+def test_generate_grid_is_seeded():
+    first = generate_grid(25, 25, seed=9)
+    second = generate_grid(25, 25, seed=9)
+
+    assert first.codes == second.codes
+    assert first.codes != generate_grid(25, 25, seed=10).codes
+
+
+def test_create_grid_follows_random_seed():
+    random.seed(1)
+    first = create_grid(6, 5)
+    random.seed(1)
+    second = create_grid(6, 5)
+
+    assert first == second
+    assert [[node.position for node in row] for row in first] == [
+        [Position(x, y) for y in range(5)] for x in range(6)
+    ]
+    assert_continuity_rules(TerrainGrid.from_nodes(first).as_array())
+
+
+def test_generated_grids_pass_context_validation():
+    random.seed(2)
+    context = Context()
+
+    context.grid = create_grid(30, 30)
+    context.grid = generate_grid(50, 40, seed=2)
+
+
+@pytest.mark.parametrize(
+    ('prev_terrain', 'above_terrain', 'forbidden'),
+    [
+        (UpHill, None, {Valley}),
+        (None, DownHill, {Plateau}),
+        (UpHill, DownHill, {Valley, Plateau}),
+    ],
+)
+def test_generate_terrain_checks_both_neighbors(
+    prev_terrain, above_terrain, forbidden
+):
+    random.seed(3)
+    drawn = {
+        generate_terrain(prev_terrain, above_terrain) for _ in range(200)
+    }
+
+    assert drawn == {Valley, UpHill, DownHill, Plateau} - forbidden
+
+
+def test_write_generated_grid_streams_blocks(tmp_path):
+    path = str(tmp_path / 'generated.grid')
+
+    write_generated_grid(path, 33, 12, seed=6, block_rows=5)
+    grid = load_grid(path)
+
+    assert (grid.n, grid.m) == (33, 12)
+    assert bytes(grid.codes) == bytes(
+        np.concatenate(list(generate_codes(33, 12, seed=6, block_rows=5)))
+    )
+
+
+def test_compute_path_cost_accumulates_every_edge():
+    start = Valley(position=Position(0, 0))
+    path = [
+        UpHill(weight=3, position=Position(0, 1)),
+        Valley(weight=1, position=Position(1, 2)),
+    ]
+    first, second = 1 + 3, math.sqrt(2) + 1
+
+    assert math.isclose(compute_path_cost(path), second)
+    assert math.isclose(compute_path_cost(path, start), first + second)
+    assert compute_path_cost([]) == 0
+    assert compute_path_cost([], start) == 0
+
+
+def test_compute_path_costs_matches_single_paths():
+    random.seed(5)
+    nodes = create_grid(10, 10)
+    starts = [nodes[0][0], nodes[9][9], nodes[3][4]]
+    paths = [
+        DijkstraStrategy.find_path(nodes, starts[0], nodes[9][9]),
+        [],
+        DijkstraStrategy.find_path(nodes, starts[2], nodes[0][7]),
+    ]
+
+    costs = compute_path_costs(paths, starts)
+
+    assert np.allclose(
+        costs,
+        [compute_path_cost(path, start) for start, path in zip(starts, paths)],
+    )
+    assert np.allclose(costs, [paths[0].cost, 0, paths[2].cost])
+    assert np.allclose(
+        compute_path_costs(paths), [compute_path_cost(p) for p in paths]
+    )